@@ -1,20 +1,16 @@
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from alembic import context
 import os
 import sys
-from dotenv import load_dotenv
 
 # Agregar el directorio raíz al path para importar los módulos
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-# Cargar variables de entorno
-load_dotenv()
-
-# Importar los modelos y la configuración de la base de datos
+# Importar los modelos y la configuración de la base de datos (el paquete backend carga el .env)
 try:
     from backend.db import Base, DATABASE_URL
+    from backend.conexion import crear_engine
     from backend import modelos
 except ImportError as e:
     print(f"Error importando módulos: {e}")
@@ -65,13 +61,8 @@ def run_migrations_offline() -> None:
 
 
 def run_migrations_online() -> None:
-    configuration = config.get_section(config.config_ini_section)
-    configuration["sqlalchemy.url"] = get_url()
-    connectable = engine_from_config(
-        configuration,
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
+    # Mismo factory que la aplicación; las migraciones no necesitan pool
+    connectable = crear_engine(get_url(), poolclass=pool.NullPool)
 
     with connectable.connect() as connection:
         context.configure(
@@ -0,0 +1,46 @@
+"""indices para paginacion y filtros
+
+Revision ID: 3f1c9a7e2b41
+Revises: 69bf7d8c5adf
+Create Date: 2025-09-20 16:42:10.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7e2b41'
+down_revision = '69bf7d8c5adf'
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas): índices compuestos (filtro, id) para la paginación keyset
+INDICES = [
+    ('ix_alumnos_cohorte_id', 'alumnos', ['cohorte', 'id']),
+    ('ix_alumnos_estado_id', 'alumnos', ['estado', 'id']),
+    ('ix_alumnos_al_dia_id', 'alumnos', ['al_dia', 'id']),
+    ('ix_alumnos_carrera_id_id', 'alumnos', ['carrera_id', 'id']),
+    ('ix_materias_estado_id', 'materias', ['estado', 'id']),
+    ('ix_materias_anio_perteneciente_id', 'materias', ['anio_perteneciente', 'id']),
+    ('ix_profesores_estado_id', 'profesores', ['estado', 'id']),
+    ('ix_profesores_especialidad_id', 'profesores', ['especialidad', 'id']),
+    ('ix_materiales_materia_id_id', 'materiales', ['materia_id', 'id']),
+    ('ix_materiales_profesor_id_id', 'materiales', ['profesor_id', 'id']),
+    ('ix_materiales_tipo_id', 'materiales', ['tipo', 'id']),
+    ('ix_materiales_estado_id', 'materiales', ['estado', 'id']),
+    ('ix_tareas_materia_id_id', 'tareas', ['materia_id', 'id']),
+    ('ix_tareas_profesor_id_id', 'tareas', ['profesor_id', 'id']),
+    ('ix_tareas_tipo_id', 'tareas', ['tipo', 'id']),
+    ('ix_tareas_estado_id', 'tareas', ['estado', 'id']),
+]
+
+
+def upgrade() -> None:
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas, unique=False)
+
+
+def downgrade() -> None:
+    for nombre, tabla, _ in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla)
@@ -0,0 +1,50 @@
+"""versiones de tablas para etags
+
+Revision ID: 5a7c3e9d2f18
+Revises: 8d2e4b6a1c37
+Create Date: 2025-10-03 09:51:26.730442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a7c3e9d2f18'
+down_revision = '8d2e4b6a1c37'
+branch_labels = None
+depends_on = None
+
+TABLAS = ['alumnos', 'materias', 'profesores', 'materiales', 'tareas', 'materia_alumno', 'materia_profesor']
+
+
+def upgrade() -> None:
+    op.create_table('versiones_tablas',
+    sa.Column('tabla', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+    sa.PrimaryKeyConstraint('tabla')
+    )
+    # Trigger por sentencia: una escritura masiva incrementa la versión una sola vez
+    op.execute("""
+        CREATE FUNCTION incrementar_version_tabla() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO versiones_tablas (tabla, version) VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (tabla) DO UPDATE SET version = versiones_tablas.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for tabla in TABLAS:
+        op.execute(f"INSERT INTO versiones_tablas (tabla, version) VALUES ('{tabla}', 1)")
+        op.execute(f"""
+            CREATE TRIGGER trg_version_{tabla}
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {tabla}
+            FOR EACH STATEMENT EXECUTE PROCEDURE incrementar_version_tabla()
+        """)
+
+
+def downgrade() -> None:
+    for tabla in reversed(TABLAS):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_version_{tabla} ON {tabla}")
+    op.execute("DROP FUNCTION IF EXISTS incrementar_version_tabla()")
+    op.drop_table('versiones_tablas')
@@ -0,0 +1,31 @@
+"""archivos de materiales
+
+Revision ID: 7b9d2f4e6a18
+Revises: e1f3b5d7a924
+Create Date: 2025-10-10 10:42:17.238614
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b9d2f4e6a18'
+down_revision = 'e1f3b5d7a924'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # sha256 del contenido guardado en el almacén; varios materiales pueden compartirlo
+    op.add_column('materiales', sa.Column('hash_archivo', sa.String(length=64), nullable=True))
+    op.add_column('materiales', sa.Column('nombre_archivo', sa.String(), nullable=True))
+    op.add_column('materiales', sa.Column('tipo_contenido', sa.String(), nullable=True))
+    op.create_index('ix_materiales_hash_archivo', 'materiales', ['hash_archivo'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_materiales_hash_archivo', table_name='materiales')
+    op.drop_column('materiales', 'tipo_contenido')
+    op.drop_column('materiales', 'nombre_archivo')
+    op.drop_column('materiales', 'hash_archivo')
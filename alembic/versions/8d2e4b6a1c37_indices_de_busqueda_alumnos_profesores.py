@@ -0,0 +1,43 @@
+"""indices de busqueda alumnos profesores
+
+Revision ID: 8d2e4b6a1c37
+Revises: 3f1c9a7e2b41
+Create Date: 2025-09-24 11:07:53.402167
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e4b6a1c37'
+down_revision = '3f1c9a7e2b41'
+branch_labels = None
+depends_on = None
+
+# Mismas expresiones que usa connections/buscar.py. Son índices sobre
+# expresiones, así que no se declaran en modelos.py (autogenerate no los detecta).
+TEXTO_ALUMNO = (
+    "(coalesce(nombre, '') || ' ' || coalesce(apellido, '') || ' ' || "
+    "coalesce(mail, '') || ' ' || coalesce(nro_doc, ''))"
+)
+TEXTO_PROFESOR = (
+    "(coalesce(nombre, '') || ' ' || coalesce(apellido, '') || ' ' || "
+    "coalesce(legajo::text, '') || ' ' || coalesce(especialidad, ''))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(f"CREATE INDEX ix_alumnos_busqueda_trgm ON alumnos USING gin ({TEXTO_ALUMNO} gin_trgm_ops)")
+    op.execute(f"CREATE INDEX ix_alumnos_busqueda_tsv ON alumnos USING gin (to_tsvector('simple', {TEXTO_ALUMNO}))")
+    op.execute(f"CREATE INDEX ix_profesores_busqueda_trgm ON profesores USING gin ({TEXTO_PROFESOR} gin_trgm_ops)")
+    op.execute(f"CREATE INDEX ix_profesores_busqueda_tsv ON profesores USING gin (to_tsvector('simple', {TEXTO_PROFESOR}))")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_profesores_busqueda_tsv', table_name='profesores')
+    op.drop_index('ix_profesores_busqueda_trgm', table_name='profesores')
+    op.drop_index('ix_alumnos_busqueda_tsv', table_name='alumnos')
+    op.drop_index('ix_alumnos_busqueda_trgm', table_name='alumnos')
+    # La extensión pg_trgm se deja instalada: puede estar en uso por otros objetos
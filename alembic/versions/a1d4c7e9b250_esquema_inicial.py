@@ -0,0 +1,102 @@
+"""esquema inicial
+
+Revision ID: a1d4c7e9b250
+Revises:
+Create Date: 2025-08-01 10:00:00.000000
+
+Las tablas tal como estaban antes de b2bedf291c4a, que las da por
+existentes (las creaba backend/crear_tablas.py). Con esta revisión
+`alembic upgrade head` arma el esquema completo sobre una base vacía; en
+las bases que ya estaban migradas no se ejecuta.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1d4c7e9b250'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('alumnos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('documento', sa.String(), server_default='DNI', nullable=False),
+    sa.Column('nro_doc', sa.String(), nullable=True),
+    sa.Column('nombre', sa.String(), nullable=False),
+    sa.Column('apellido', sa.String(), nullable=False),
+    sa.Column('nacimiento', sa.String(), nullable=True),
+    sa.Column('mail', sa.String(), nullable=False),
+    sa.Column('telefono', sa.String(), nullable=True),
+    sa.Column('direccion', sa.String(), nullable=True),
+    sa.Column('cohorte', sa.String(), nullable=True),
+    sa.Column('estado', sa.String(), nullable=True),
+    sa.Column('al_dia', sa.Boolean(), nullable=True),
+    sa.Column('carrera_id', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('mail'),
+    sa.UniqueConstraint('nro_doc')
+    )
+    op.create_index(op.f('ix_alumnos_id'), 'alumnos', ['id'], unique=False)
+    op.create_table('materias',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nombre', sa.String(), nullable=False),
+    sa.Column('codigo', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('codigo')
+    )
+    op.create_index(op.f('ix_materias_id'), 'materias', ['id'], unique=False)
+    op.create_table('profesores',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nombre', sa.String(), nullable=False),
+    sa.Column('apellido', sa.String(), nullable=False),
+    sa.Column('legajo', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('legajo', name='profesores_legajo_key')
+    )
+    op.create_index(op.f('ix_profesores_id'), 'profesores', ['id'], unique=False)
+    op.create_table('materiales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('titulo', sa.String(), nullable=False),
+    sa.Column('descripcion', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('tareas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('titulo', sa.String(), nullable=False),
+    sa.Column('descripcion', sa.String(), nullable=True),
+    sa.Column('materia_id', sa.Integer(), nullable=False),
+    sa.Column('entregado', sa.Boolean(), server_default=sa.text('false'), nullable=True),
+    sa.Column('apartado', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id']),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('materia_alumno',
+    sa.Column('materia_id', sa.Integer(), nullable=False),
+    sa.Column('alumno_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['alumno_id'], ['alumnos.id']),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id']),
+    sa.PrimaryKeyConstraint('materia_id', 'alumno_id')
+    )
+    op.create_table('materia_profesor',
+    sa.Column('materia_id', sa.Integer(), nullable=False),
+    sa.Column('profesor_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['materia_id'], ['materias.id']),
+    sa.ForeignKeyConstraint(['profesor_id'], ['profesores.id']),
+    sa.PrimaryKeyConstraint('materia_id', 'profesor_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('materia_profesor')
+    op.drop_table('materia_alumno')
+    op.drop_table('tareas')
+    op.drop_table('materiales')
+    op.drop_index(op.f('ix_profesores_id'), table_name='profesores')
+    op.drop_table('profesores')
+    op.drop_index(op.f('ix_materias_id'), table_name='materias')
+    op.drop_table('materias')
+    op.drop_index(op.f('ix_alumnos_id'), table_name='alumnos')
+    op.drop_table('alumnos')
@@ -1,7 +1,7 @@
 """Permitir nulos en anio_perteneciente
 
 Revision ID: b2bedf291c4a
-Revises: 
+Revises: a1d4c7e9b250
 Create Date: 2025-08-08 01:30:45.816317
 
 """
@@ -11,7 +11,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = 'b2bedf291c4a'
-down_revision = None
+down_revision = 'a1d4c7e9b250'
 branch_labels = None
 depends_on = None
 
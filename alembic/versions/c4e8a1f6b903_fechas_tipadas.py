@@ -0,0 +1,145 @@
+"""fechas tipadas
+
+Revision ID: c4e8a1f6b903
+Revises: 5a7c3e9d2f18
+Create Date: 2025-10-06 11:18:52.402117
+
+"""
+from alembic import op
+import logging
+import sqlalchemy as sa
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8a1f6b903'
+down_revision = '5a7c3e9d2f18'
+branch_labels = None
+depends_on = None
+
+# (tabla, columna): columnas String que pasan a DATE
+COLUMNAS = [
+    ('alumnos', 'nacimiento'),
+    ('profesores', 'fecha_alta'),
+    ('materiales', 'fecha_subida'),
+    ('tareas', 'fecha_publicacion'),
+    ('tareas', 'fecha_entrega'),
+]
+
+# (nombre, tabla, columnas): índices para las consultas por rango de fechas
+INDICES = [
+    ('ix_tareas_fecha_entrega_id', 'tareas', ['fecha_entrega', 'id']),
+    ('ix_tareas_materia_id_fecha_entrega', 'tareas', ['materia_id', 'fecha_entrega', 'id']),
+]
+
+# Filas por UPDATE al copiar los valores; cada lote se confirma por separado
+TAMANIO_LOTE = 5000
+
+
+def _tablas():
+    tablas = {}
+    for tabla, columna in COLUMNAS:
+        tablas.setdefault(tabla, []).append(columna)
+    return tablas
+
+
+def _rellenar(conn, tabla, columna):
+    minimo, maximo = conn.execute(sa.text(f"SELECT min(id), max(id) FROM {tabla}")).one()
+    if minimo is None:
+        return
+    for desde in range(minimo, maximo + 1, TAMANIO_LOTE):
+        conn.execute(sa.text(f"""
+            UPDATE {tabla} SET {columna}_nueva = texto_a_fecha({columna})
+            WHERE id >= :desde AND id < :hasta AND {columna} IS NOT NULL
+        """), {"desde": desde, "hasta": desde + TAMANIO_LOTE})
+
+
+def _sin_convertir(conn, tabla, columna):
+    """Filas con fecha en el texto original que no se pudo interpretar (los vacíos no cuentan)."""
+    return conn.execute(sa.text(f"""
+        SELECT count(*), array_agg(DISTINCT {columna}) FILTER (WHERE {columna} IS NOT NULL)
+        FROM (
+            SELECT {columna} FROM {tabla}
+            WHERE nullif(trim({columna}), '') IS NOT NULL AND {columna}_nueva IS NULL
+        ) AS fallidas
+    """)).one()
+
+
+def upgrade() -> None:
+    # Acepta 'AAAA-MM-DD' y 'DD/MM/AAAA'; lo que no se puede interpretar queda en NULL
+    op.execute("""
+        CREATE FUNCTION texto_a_fecha(valor text) RETURNS date AS $$
+        BEGIN
+            RETURN nullif(trim(valor), '')::date;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql IMMUTABLE SET datestyle = 'ISO, DMY'
+    """)
+    for tabla, columna in COLUMNAS:
+        op.add_column(tabla, sa.Column(f'{columna}_nueva', sa.Date(), nullable=True))
+
+    # Mientras se copia, un trigger mantiene al día las columnas nuevas con lo
+    # que sigan escribiendo los workers en las viejas
+    for tabla, columnas in _tablas().items():
+        asignaciones = " ".join(f"NEW.{c}_nueva := texto_a_fecha(NEW.{c});" for c in columnas)
+        op.execute(f"""
+            CREATE FUNCTION fechas_tipadas_{tabla}() RETURNS trigger AS $$
+            BEGIN {asignaciones} RETURN NEW; END;
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"""
+            CREATE TRIGGER fechas_tipadas BEFORE INSERT OR UPDATE ON {tabla}
+            FOR EACH ROW EXECUTE FUNCTION fechas_tipadas_{tabla}()
+        """)
+
+    # Copia por lotes fuera de la transacción de la migración para no bloquear
+    # las tablas enteras mientras se recorren (al entrar se confirma lo anterior,
+    # así el trigger ya está activo)
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        for tabla, columna in COLUMNAS:
+            _rellenar(conn, tabla, columna)
+
+    conn = op.get_bind()
+    for tabla, columnas in _tablas().items():
+        # Desde acá nadie más escribe en la tabla hasta el final de la migración
+        op.execute(f"LOCK TABLE {tabla} IN ACCESS EXCLUSIVE MODE")
+        op.execute(f"DROP TRIGGER fechas_tipadas ON {tabla}")
+        op.execute(f"DROP FUNCTION fechas_tipadas_{tabla}()")
+        for columna in columnas:
+            fallidas, ejemplos = _sin_convertir(conn, tabla, columna)
+            if fallidas:
+                # No se pierde nada: el texto original queda en <columna>_texto
+                # para corregirlo a mano (la aplicación no la usa)
+                logger.warning(
+                    f"{tabla}.{columna}: {fallidas} filas con fechas que no se pudieron convertir "
+                    f"(por ejemplo {', '.join(repr(e) for e in ejemplos[:5])}); "
+                    f"el valor original queda en {tabla}.{columna}_texto"
+                )
+                op.alter_column(tabla, columna, new_column_name=f'{columna}_texto')
+            else:
+                op.drop_column(tabla, columna)
+            op.alter_column(tabla, f'{columna}_nueva', new_column_name=columna)
+    op.execute("DROP FUNCTION texto_a_fecha(text)")
+
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas, unique=False)
+
+
+def downgrade() -> None:
+    for nombre, tabla, _ in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla)
+    for tabla, columna in reversed(COLUMNAS):
+        op.alter_column(tabla, columna, type_=sa.String(), postgresql_using=f"to_char({columna}, 'YYYY-MM-DD')")
+        # Los textos que upgrade() no pudo convertir vuelven a su columna
+        op.execute(f"""
+            DO $$ BEGIN
+                IF EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = '{tabla}' AND column_name = '{columna}_texto') THEN
+                    UPDATE {tabla} SET {columna} = {columna}_texto WHERE {columna} IS NULL;
+                    ALTER TABLE {tabla} DROP COLUMN {columna}_texto;
+                END IF;
+            END $$
+        """)
@@ -0,0 +1,63 @@
+"""ranuras de versiones de tablas
+
+Revision ID: d3a6f8b2c517
+Revises: 7b9d2f4e6a18
+Create Date: 2025-10-13 09:12:40.118352
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a6f8b2c517'
+down_revision = '7b9d2f4e6a18'
+branch_labels = None
+depends_on = None
+
+# Filas por tabla. Cada conexión incrementa la de pg_backend_pid() % RANURAS,
+# así dos transacciones que escriben en la misma tabla solo esperan una a la
+# otra si les toca la misma ranura; la versión de la tabla es la suma
+RANURAS = 64
+
+
+def upgrade() -> None:
+    op.add_column('versiones_tablas', sa.Column('ranura', sa.SmallInteger(), nullable=False, server_default='0'))
+    op.drop_constraint('versiones_tablas_pkey', 'versiones_tablas', type_='primary')
+    op.create_primary_key('versiones_tablas_pkey', 'versiones_tablas', ['tabla', 'ranura'])
+    # La versión actual queda en la ranura 0: la suma, y con ella los ETags, no cambia
+    op.execute(f"""
+        INSERT INTO versiones_tablas (tabla, ranura, version)
+        SELECT tabla, n, 0 FROM versiones_tablas, generate_series(1, {RANURAS - 1}) AS n
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION incrementar_version_tabla() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO versiones_tablas (tabla, ranura, version)
+            VALUES (TG_TABLE_NAME, pg_backend_pid() % {RANURAS}, 1)
+            ON CONFLICT (tabla, ranura) DO UPDATE SET version = versiones_tablas.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION incrementar_version_tabla() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO versiones_tablas (tabla, version) VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (tabla) DO UPDATE SET version = versiones_tablas.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        UPDATE versiones_tablas AS v SET version = s.total
+        FROM (SELECT tabla, sum(version) AS total FROM versiones_tablas GROUP BY tabla) AS s
+        WHERE v.tabla = s.tabla AND v.ranura = 0
+    """)
+    op.execute("DELETE FROM versiones_tablas WHERE ranura <> 0")
+    op.drop_constraint('versiones_tablas_pkey', 'versiones_tablas', type_='primary')
+    op.create_primary_key('versiones_tablas_pkey', 'versiones_tablas', ['tabla'])
+    op.drop_column('versiones_tablas', 'ranura')
@@ -0,0 +1,39 @@
+"""indices de claves foraneas
+
+Revision ID: e1f3b5d7a924
+Revises: c4e8a1f6b903
+Create Date: 2025-10-08 17:03:44.915370
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f3b5d7a924'
+down_revision = 'c4e8a1f6b903'
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas). tareas y materiales ya tienen (materia_id, id) y
+# (profesor_id, id) desde 3f1c9a7e2b41; acá van las claves foráneas que faltaban
+# y el lado inverso de las tablas de asociación (su PK empieza por materia_id).
+INDICES = [
+    ('ix_profesores_usuario_id', 'profesores', ['usuario_id']),
+    ('ix_materias_materia_previa_id', 'materias', ['materia_previa_id']),
+    ('ix_materia_alumno_alumno_id', 'materia_alumno', ['alumno_id', 'materia_id']),
+    ('ix_materia_profesor_profesor_id', 'materia_profesor', ['profesor_id', 'materia_id']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY no bloquea las escrituras, pero no puede correr dentro de una transacción
+    with op.get_context().autocommit_block():
+        for nombre, tabla, columnas in INDICES:
+            op.create_index(nombre, tabla, columnas, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for nombre, tabla, _ in reversed(INDICES):
+            op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True, if_exists=True)
@@ -1,3 +1,5 @@
+# Primero el entorno: el .env se carga una sola vez, antes que cualquier módulo lo lea
+from . import config
 # Importar los modelos para que Alembic los detecte
 from .modelos import (
     UsuarioDB,
@@ -6,6 +8,7 @@ from .modelos import (
     ProfesorDB,
     MaterialDB,
     TareaDB,
+    VersionTablaDB,
     materia_alumno,
     materia_profesor
 )
@@ -17,6 +20,7 @@ __all__ = [
     'ProfesorDB',
     'MaterialDB',
     'TareaDB',
+    'VersionTablaDB',
     'materia_alumno',
     'materia_profesor'
 ] 
\ No newline at end of file
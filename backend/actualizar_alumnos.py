@@ -1,22 +1,10 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool
+from .conexion import crear_engine
+from .db import DATABASE_URL
 
-# Cargar variables de entorno desde el archivo .env
-load_dotenv()
-
-# Configuración de la conexión desde variables de entorno
-POSTGRES_USER = os.getenv('POSTGRES_USER')
-POSTGRES_PASSWORD = os.getenv('POSTGRES_PASSWORD')
-POSTGRES_DB = os.getenv('POSTGRES_DB')
-POSTGRES_HOST = os.getenv('POSTGRES_HOST')
-POSTGRES_PORT = os.getenv('POSTGRES_PORT')
-
-DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Script de una sola conexión: no necesita pool
+engine = crear_engine(DATABASE_URL, poolclass=NullPool)
 
 def actualizar_tabla_alumnos():
     """Actualiza la tabla alumnos con los nuevos campos"""
@@ -0,0 +1,235 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from fastapi import Response
+from fastapi.responses import FileResponse
+from functools import lru_cache
+from python_multipart.multipart import MultipartParser, parse_options_header
+from urllib.parse import quote
+import asyncio
+import hashlib
+import importlib
+import os
+import tempfile
+
+# Tope por archivo subido; lo que lo supera se corta sin terminar de leerlo
+MAX_ARCHIVO_MB = int(os.getenv("MAX_ARCHIVO_MB", "100"))
+
+class ArchivoInvalido(ValueError):
+    """El cuerpo no es un multipart/form-data con el campo del archivo."""
+
+class ArchivoDemasiadoGrande(ValueError):
+    """El archivo supera MAX_ARCHIVO_MB."""
+
+class ArchivoMultipart:
+    """Lee el campo de archivo de un multipart/form-data a medida que llega.
+
+    Se itera con `async for` y entrega los bytes del campo en los mismos
+    trozos en que llegan del cliente, sin armar el archivo en memoria. El
+    nombre y el tipo de contenido declarados quedan en `nombre` y `tipo` en
+    cuanto se leen los encabezados de la parte; el resto de los campos se
+    ignora.
+    """
+
+    def __init__(self, request, campo: str = "archivo", max_bytes: int = MAX_ARCHIVO_MB * 1024 * 1024):
+        tipo, opciones = parse_options_header(request.headers.get("content-type", ""))
+        if tipo != b"multipart/form-data" or b"boundary" not in opciones:
+            raise ArchivoInvalido("Se esperaba multipart/form-data")
+        self._request = request
+        self._campo = campo.encode()
+        self._boundary = opciones[b"boundary"]
+        self._max_bytes = max_bytes
+        self.nombre = None
+        self.tipo = None
+
+    async def __aiter__(self):
+        encabezados = {}
+        estado = {"campo": None, "encontrado": False, "terminado": False, "leidos": 0, "cabecera": b"", "valor": b""}
+        trozos = []
+
+        def on_header_field(data, start, end):
+            estado["cabecera"] += data[start:end]
+
+        def on_header_value(data, start, end):
+            estado["valor"] += data[start:end]
+
+        def on_header_end():
+            encabezados[estado["cabecera"].lower()] = estado["valor"]
+            estado["cabecera"] = estado["valor"] = b""
+
+        def on_headers_finished():
+            _, opciones = parse_options_header(encabezados.get(b"content-disposition", b""))
+            es_archivo = opciones.get(b"name") == self._campo and not estado["encontrado"]
+            estado["campo"] = es_archivo
+            if es_archivo:
+                estado["encontrado"] = True
+                self.nombre = opciones.get(b"filename", b"").decode("utf-8", "replace") or None
+                self.tipo = encabezados.get(b"content-type", b"").decode("latin-1") or None
+
+        def on_part_data(data, start, end):
+            if estado["campo"]:
+                estado["leidos"] += end - start
+                if estado["leidos"] > self._max_bytes:
+                    raise ArchivoDemasiadoGrande(f"El archivo supera {MAX_ARCHIVO_MB} MB")
+                trozos.append(data[start:end])
+
+        def on_part_begin():
+            encabezados.clear()
+            estado["campo"] = None
+
+        def on_end():
+            estado["terminado"] = True
+
+        parser = MultipartParser(self._boundary, {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_end": on_end,
+        })
+        async for chunk in self._request.stream():
+            try:
+                parser.write(chunk)
+            except ArchivoDemasiadoGrande:
+                raise
+            except Exception as e:
+                raise ArchivoInvalido(f"multipart mal formado: {e}")
+            if trozos:
+                # Lo que generó este chunk de red, todo junto en una sola escritura
+                yield b"".join(trozos)
+                trozos.clear()
+        try:
+            parser.finalize()
+        except Exception as e:
+            raise ArchivoInvalido(f"multipart mal formado: {e}")
+        # finalize() no verifica que haya llegado el boundary de cierre: un
+        # cuerpo cortado a mitad del archivo se rechaza acá
+        if not estado["terminado"]:
+            raise ArchivoInvalido("multipart incompleto: falta el boundary de cierre")
+        if not estado["encontrado"]:
+            raise ArchivoInvalido(f"Falta el campo '{self._campo.decode()}'")
+
+@dataclass
+class ArchivoRecibido:
+    """Subida ya leída y hasheada, todavía fuera de su lugar definitivo."""
+    hash: str
+    tamanio: int
+    temporal: str
+
+class AlmacenArchivos(ABC):
+    """Interfaz del almacenamiento de archivos de materiales.
+
+    Los archivos se guardan direccionados por contenido: la clave es el
+    sha256 de los bytes, así que subir el mismo PDF a varias materias lo
+    guarda una sola vez. Qué materiales apuntan a cada archivo lo sabe la
+    base (`materiales.hash_archivo`); `eliminar` se llama cuando ya no queda
+    ninguno.
+
+    La subida va en dos pasos: `recibir` lee el contenido a un temporal y
+    calcula el hash, y `confirmar` lo deja en su lugar. Entre uno y otro el
+    router toma el lock del hash en la base, el mismo que toma antes de
+    `eliminar`, para que una baja no borre un contenido que otra subida está
+    por referenciar.
+    """
+
+    @abstractmethod
+    async def recibir(self, trozos) -> ArchivoRecibido:
+        """Consume un iterable async de bytes y lo guarda en un temporal."""
+
+    @abstractmethod
+    async def confirmar(self, recibido: ArchivoRecibido):
+        """Mueve el temporal a su lugar, o lo descarta si ese contenido ya estaba."""
+
+    @abstractmethod
+    async def descartar(self, recibido: ArchivoRecibido):
+        """Borra el temporal si todavía existe (sin efecto después de `confirmar`)."""
+
+    @abstractmethod
+    async def eliminar(self, hash_archivo: str):
+        ...
+
+    @abstractmethod
+    async def descargar(self, hash_archivo: str, nombre: str | None, tipo: str | None, headers: dict) -> Response:
+        """Respuesta con el contenido; tiene que respetar `Range` si el backend puede."""
+
+class AlmacenLocal(AlmacenArchivos):
+    """Archivos en disco local bajo `<directorio>/<ab>/<cd>/<sha256>`.
+
+    La subida se escribe por trozos a un temporal del mismo directorio
+    mientras se calcula el hash, y al confirmarla se mueve a su lugar con un
+    rename atómico (o se descarta si ese contenido ya estaba). La descarga es
+    un FileResponse: maneja `Range`/`If-Range` y, si el servidor ASGI soporta
+    la extensión `http.response.pathsend`, le pasa la ruta para que la envíe
+    con sendfile. Detrás de nginx, con `prefijo_x_accel` la respuesta es
+    solo un `X-Accel-Redirect` y el archivo lo sirve nginx.
+    """
+
+    def __init__(self, directorio: str, prefijo_x_accel: str | None = None):
+        self.directorio = os.path.abspath(directorio)
+        self.prefijo_x_accel = prefijo_x_accel
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _relativa(self, hash_archivo: str) -> str:
+        return os.path.join(hash_archivo[:2], hash_archivo[2:4], hash_archivo)
+
+    def ruta(self, hash_archivo: str) -> str:
+        return os.path.join(self.directorio, self._relativa(hash_archivo))
+
+    async def recibir(self, trozos) -> ArchivoRecibido:
+        sha = hashlib.sha256()
+        tamanio = 0
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, prefix=".subida-")
+        try:
+            with os.fdopen(descriptor, "wb") as destino:
+                async for trozo in trozos:
+                    sha.update(trozo)
+                    tamanio += len(trozo)
+                    await asyncio.to_thread(destino.write, trozo)
+        except BaseException:
+            os.remove(temporal)
+            raise
+        return ArchivoRecibido(sha.hexdigest(), tamanio, temporal)
+
+    async def confirmar(self, recibido: ArchivoRecibido):
+        final = self.ruta(recibido.hash)
+        if os.path.exists(final):
+            os.remove(recibido.temporal)
+        else:
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            os.replace(recibido.temporal, final)
+
+    async def descartar(self, recibido: ArchivoRecibido):
+        try:
+            os.remove(recibido.temporal)
+        except FileNotFoundError:
+            pass
+
+    async def eliminar(self, hash_archivo: str):
+        try:
+            os.remove(self.ruta(hash_archivo))
+        except FileNotFoundError:
+            pass
+
+    async def descargar(self, hash_archivo: str, nombre: str | None, tipo: str | None, headers: dict) -> Response:
+        tipo = tipo or "application/octet-stream"
+        if self.prefijo_x_accel:
+            headers = {**headers, "X-Accel-Redirect": self.prefijo_x_accel.rstrip("/") + "/" + self._relativa(hash_archivo)}
+            if nombre:
+                headers["Content-Disposition"] = f"inline; filename*=utf-8''{quote(nombre)}"
+            return Response(media_type=tipo, headers=headers)
+        return FileResponse(self.ruta(hash_archivo), media_type=tipo, filename=nombre,
+                            content_disposition_type="inline", headers=headers)
+
+@lru_cache(maxsize=1)
+def almacen() -> AlmacenArchivos:
+    """Backend de ALMACEN_ARCHIVOS ("local" o "modulo:Clase"), creado en el primer uso.
+
+    Como los motores de la base, no se crea al importar: el almacén local
+    crea su carpeta y otros backends pueden abrir conexiones.
+    """
+    backend = os.getenv("ALMACEN_ARCHIVOS", "local")
+    if backend == "local":
+        return AlmacenLocal(os.getenv("ARCHIVOS_DIR", "archivos"), os.getenv("ARCHIVOS_X_ACCEL") or None)
+    modulo, clase = backend.split(":")
+    return getattr(importlib.import_module(modulo), clase)()
@@ -1,32 +1,64 @@
 from datetime import timedelta, datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import asyncio
 import email
+import hashlib
+import time
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from starlette import status
-from backend.db import SessionLocal
+from backend.db import async_db_dependency
 from backend.modelos import UsuarioDB
+from backend.cache import CacheLRU
+from backend import metricas
+from backend.revocaciones import revocaciones
+from backend.perfilado import RutaPerfilada
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from jose import jwt, JWTError
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
-
 router = APIRouter(
     prefix="/auth",
     tags=["auth"],
+    route_class=RutaPerfilada,
 )
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))  
 
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Costo de bcrypt. Si cambia, los hashes viejos se regeneran en el siguiente login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+bcrypt_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+# bcrypt tarda cientos de ms por llamada: se ejecuta fuera del event loop.
+# Con "thread" alcanza porque bcrypt libera el GIL; "process" aísla del todo la CPU.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+HASH_EXECUTOR = os.getenv("HASH_EXECUTOR", "thread")
+if HASH_EXECUTOR == "process":
+    hash_executor = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+else:
+    hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+# Tokens ya verificados (por digest), para no validar la firma en cada petición.
+# La revocación se chequea igual en cada petición.
+cache_tokens = CacheLRU(
+    max_entradas=int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+    ttl_segundos=float(os.getenv("TOKEN_CACHE_TTL", "300")),
+    nombre="tokens",
+)
+
 class CreateUserRequest(BaseModel):
     username: str
     password: str
@@ -36,56 +68,95 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
-def get_db(): 
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Funciones de módulo para que también se puedan enviar a un ProcessPoolExecutor
+def _hashear(password: str) -> str:
+    return bcrypt_context.hash(password)
+
+def _verificar_y_actualizar(password: str, hashed_password: str):
+    return bcrypt_context.verify_and_update(password, hashed_password)
 
-db_dependency = Annotated[Session, Depends(get_db)]  
+async def hashear_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    with metricas.bcrypt_segundos.labels("hashear").time():
+        return await loop.run_in_executor(hash_executor, _hashear, password)
+
+async def verificar_password(password: str, hashed_password: str):
+    """Devuelve (valida, nuevo_hash); nuevo_hash no es None si el costo configurado cambió."""
+    loop = asyncio.get_running_loop()
+    with metricas.bcrypt_segundos.labels("verificar").time():
+        return await loop.run_in_executor(hash_executor, _verificar_y_actualizar, password, hashed_password)
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_user(db: db_dependency, create_user_request: CreateUserRequest):
+async def create_user(db: async_db_dependency, create_user_request: CreateUserRequest):
     create_user_model = UsuarioDB(
         username=create_user_request.username,
         email=create_user_request.email,
-        hashed_password=bcrypt_context.hash(create_user_request.password),
+        hashed_password=await hashear_password(create_user_request.password),
     )
     db.add(create_user_model)
-    db.commit()
+    await db.commit()
     return {"message": "Usuario creado con exito"}
 
 @router.post("/token", response_model=Token)
 async def logic_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], 
-                                db: db_dependency):
-    user = authenticate_user(form_data.username, form_data.password, db)
+                                db: async_db_dependency):
+    user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales invalidas")
     token = create_access_token(user.username, user.id, timedelta(minutes=20))
     return {"access_token": token, "token_type": "bearer"}
 
-def authenticate_user(username: str, password: str, db):  
-    user = db.query(UsuarioDB).filter(UsuarioDB.email == username).first()
-    if not user:
+async def authenticate_user(username: str, password: str, db):  
+    user = await db.scalar(select(UsuarioDB).where(UsuarioDB.email == username).limit(1))
+    if not user or user.is_active is False:
         return False 
-    if not bcrypt_context.verify(password, user.hashed_password):
+    valida, nuevo_hash = await verificar_password(password, user.hashed_password)
+    if not valida:
         return False  
+    if nuevo_hash:
+        # Rehash transparente al nuevo BCRYPT_ROUNDS
+        user.hashed_password = nuevo_hash
+        await db.commit()
     return user
 
 def create_access_token(username: str, user_id: int, expires_delta: timedelta):
-    encode = {'sub': username, 'id': user_id}
+    encode = {'sub': username, 'id': user_id, 'iat': int(time.time())}
     expires = datetime.utcnow() + expires_delta
     encode.update({'exp': expires})
     return jwt.encode(encode, SECRET_KEY, algorithm=ALGORITHM)
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]):
+def digest_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def verificar_token(token: str, digest: str) -> dict:
+    datos = cache_tokens.obtener(digest)
+    if datos is not None:
+        return datos
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get('sub')
-        user_id: int = payload.get('id')
-        if username is None or user_id is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales invalidas")
-        return {'username': username, 'id': user_id}
     except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No se puede validar el usuario")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No se puede validar el usuario")
+    username: str = payload.get('sub')
+    user_id: int = payload.get('id')
+    if username is None or user_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales invalidas")
+    datos = {'username': username, 'id': user_id, 'iat': payload.get('iat', 0), 'exp': payload['exp']}
+    # Nunca más allá del vencimiento del token
+    cache_tokens.guardar(digest, datos, ttl_segundos=payload['exp'] - time.time())
+    return datos
+
+async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]):
+    digest = digest_token(token)
+    datos = verificar_token(token, digest)
+    if revocaciones.esta_revocado(digest, datos['id'], datos['iat']):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revocado")
+    return {'username': datos['username'], 'id': datos['id']}
+
+@router.post("/logout")
+async def logout(token: Annotated[str, Depends(oauth2_bearer)],
+                 user: Annotated[dict, Depends(get_current_user)]):
+    digest = digest_token(token)
+    datos = verificar_token(token, digest)
+    revocaciones.revocar_token(digest, datos['exp'])
+    cache_tokens.invalidar(digest)
+    return {"message": "Sesion cerrada"}
\ No newline at end of file
@@ -0,0 +1,240 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from . import metricas
+import importlib
+import json
+import os
+import threading
+import time
+
+class CacheTTL:
+    """Cache en memoria del proceso con expiración por tiempo.
+
+    Cada worker de uvicorn tiene su propia copia: la invalidación explícita
+    solo alcanza al proceso que hizo la escritura y el TTL acota cuánto
+    pueden tardar en enterarse los demás. Con `nombre` cuenta aciertos y
+    fallos en /metrics.
+    """
+
+    def __init__(self, ttl_segundos: float, nombre: str | None = None):
+        self.ttl_segundos = ttl_segundos
+        self.nombre = nombre
+        self._datos = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None and entrada[1] <= time.monotonic():
+                del self._datos[clave]
+                entrada = None
+        if self.nombre:
+            metricas.registrar_cache(self.nombre, entrada is not None)
+        return None if entrada is None else entrada[0]
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic() + self.ttl_segundos)
+
+    def invalidar(self, clave=None):
+        with self._lock:
+            if clave is None:
+                self._datos.clear()
+            else:
+                self._datos.pop(clave, None)
+
+class CacheLRU:
+    """Cache en memoria con expiración por tiempo y tope de entradas.
+
+    Al llenarse descarta la entrada usada hace más tiempo. Lleva contadores
+    de aciertos, fallos y desalojos; con `nombre` también los cuenta en /metrics.
+    """
+
+    def __init__(self, max_entradas: int, ttl_segundos: float, nombre: str | None = None):
+        self.max_entradas = max_entradas
+        self.nombre = nombre
+        self.ttl_segundos = ttl_segundos
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, clave):
+        valor = None
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None:
+                if entrada[1] > time.monotonic():
+                    self._datos.move_to_end(clave)
+                    valor = entrada[0]
+                else:
+                    del self._datos[clave]
+            if valor is None:
+                self.fallos += 1
+            else:
+                self.aciertos += 1
+        if self.nombre:
+            metricas.registrar_cache(self.nombre, valor is not None)
+        return valor
+
+    def guardar(self, clave, valor, ttl_segundos: float | None = None):
+        ttl = self.ttl_segundos if ttl_segundos is None else min(ttl_segundos, self.ttl_segundos)
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic() + ttl)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+
+    def invalidar(self, clave=None):
+        with self._lock:
+            if clave is None:
+                self._datos.clear()
+            else:
+                self._datos.pop(clave, None)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._datos),
+                "max_entradas": self.max_entradas,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "ratio_aciertos": self.aciertos / consultas if consultas else 0.0,
+            }
+
+# Cache del resumen del dashboard; lo invalidan las escrituras de los routers
+cache_dashboard = CacheTTL(float(os.getenv("DASHBOARD_CACHE_TTL", "30")), nombre="dashboard")
+
+class TierCompartido(ABC):
+    """Interfaz del tier compartido entre workers (por ejemplo Redis).
+
+    Guarda bytes; `invalidar_prefijo` borra todas las claves de un recurso.
+    """
+
+    @abstractmethod
+    async def obtener(self, clave: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    async def guardar(self, clave: str, valor: bytes, ttl_segundos: float):
+        ...
+
+    @abstractmethod
+    async def invalidar_prefijo(self, prefijo: str):
+        ...
+
+class TierCompartidoEnMemoria(TierCompartido):
+    """Reemplazo local del tier compartido, para desarrollo y pruebas."""
+
+    def __init__(self):
+        self._datos = {}
+        self._lock = threading.Lock()
+
+    async def obtener(self, clave: str) -> bytes | None:
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None or entrada[1] <= time.monotonic():
+                self._datos.pop(clave, None)
+                return None
+            return entrada[0]
+
+    async def guardar(self, clave: str, valor: bytes, ttl_segundos: float):
+        with self._lock:
+            self._datos[clave] = (valor, time.monotonic() + ttl_segundos)
+
+    async def invalidar_prefijo(self, prefijo: str):
+        with self._lock:
+            for clave in [c for c in self._datos if c.startswith(prefijo)]:
+                del self._datos[clave]
+
+def cargar_tier_compartido() -> TierCompartido | None:
+    """Instancia RESPUESTAS_CACHE_COMPARTIDO ("", "memoria" o "modulo:Clase")."""
+    backend = os.getenv("RESPUESTAS_CACHE_COMPARTIDO", "")
+    if not backend:
+        return None
+    if backend == "memoria":
+        return TierCompartidoEnMemoria()
+    modulo, clase = backend.split(":")
+    return getattr(importlib.import_module(modulo), clase)()
+
+class CacheRespuestas:
+    """Cache read-through de respuestas GET, con un tier LRU local por recurso
+    y un tier compartido opcional.
+
+    La clave es el ETag de la petición cuando existe (ver backend/versiones.py):
+    incluye la versión de la tabla, así que una escritura desde cualquier worker
+    deja de acertar en todos. Los POST/PUT/DELETE además invalidan el recurso
+    para liberar memoria enseguida.
+    """
+
+    def __init__(self, max_entradas: int, ttl_segundos: float, compartido: TierCompartido | None = None):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self.compartido = compartido
+        self._locales = {}
+        self.aciertos_compartido = 0
+        self.fallos_compartido = 0
+
+    def _local(self, recurso: str) -> CacheLRU:
+        if recurso not in self._locales:
+            self._locales[recurso] = CacheLRU(self.max_entradas, self.ttl_segundos, nombre=f"respuestas:{recurso}")
+        return self._locales[recurso]
+
+    async def leer(self, recurso: str, request, response, calcular):
+        """Devuelve la respuesta cacheada o ejecuta `calcular()` y la guarda.
+
+        `calcular` es una corrutina que devuelve datos serializables a JSON;
+        los headers que deje en `response` (por ejemplo el cursor) se guardan
+        junto con los datos.
+        """
+        clave = getattr(request.state, "etag", None) or f"{request.url.path}?{request.url.query}"
+        local = self._local(recurso)
+        entrada = local.obtener(clave)
+        if entrada is None and self.compartido is not None:
+            crudo = await self.compartido.obtener(f"{recurso}:{clave}")
+            metricas.registrar_cache("respuestas:compartido", crudo is not None)
+            if crudo is None:
+                self.fallos_compartido += 1
+            else:
+                self.aciertos_compartido += 1
+                entrada = json.loads(crudo)
+                local.guardar(clave, entrada)
+        if entrada is not None:
+            response.headers.update(entrada["headers"])
+            return entrada["datos"]
+
+        antes = set(response.headers.keys())
+        datos = await calcular()
+        entrada = {
+            "datos": datos,
+            "headers": {k: v for k, v in response.headers.items() if k not in antes},
+        }
+        local.guardar(clave, entrada)
+        if self.compartido is not None:
+            await self.compartido.guardar(f"{recurso}:{clave}", json.dumps(entrada, default=str).encode(), self.ttl_segundos)
+        return datos
+
+    async def invalidar(self, recurso: str):
+        self._local(recurso).invalidar()
+        if self.compartido is not None:
+            await self.compartido.invalidar_prefijo(f"{recurso}:")
+
+    def estadisticas(self) -> dict:
+        return {
+            "local": {recurso: cache.estadisticas() for recurso, cache in self._locales.items()},
+            "compartido": None if self.compartido is None else {
+                "aciertos": self.aciertos_compartido,
+                "fallos": self.fallos_compartido,
+            },
+        }
+
+# Cache de respuestas GET (materias, profesores y GETs por id)
+cache_respuestas = CacheRespuestas(
+    max_entradas=int(os.getenv("RESPUESTAS_CACHE_SIZE", "1000")),
+    ttl_segundos=float(os.getenv("RESPUESTAS_CACHE_TTL", "60")),
+    compartido=cargar_tier_compartido(),
+)
@@ -0,0 +1,134 @@
+import codecs
+import csv
+import json
+import os
+import re
+
+# Tope del texto retenido mientras se espera el final de una fila: un elemento
+# JSON o un registro CSV que no termina nunca no puede crecer sin límite
+CARGA_FILA_MAX_CARACTERES = int(os.getenv("CARGA_FILA_MAX_CARACTERES", str(1024 * 1024)))
+
+# Texto que, cortado al final del buffer, todavía puede ser el comienzo de un
+# token válido: un número, true/false/null o un escape \uXXXX a medias
+PREFIJO_INCOMPLETO = re.compile(r"(-?\d*(\.\d*)?([eE][+-]?\d*)?|t(r(ue?)?)?|f(a(l(se?)?)?)?|n(u(ll?)?)?|u[0-9a-fA-F]{0,3})\Z")
+
+class FormatoInvalido(ValueError):
+    """El cuerpo de la carga masiva no es un CSV o un array JSON válido."""
+
+class FilaInvalida:
+    """Fila que no se pudo leer; se reporta como inválida sin cortar la carga."""
+
+    def __init__(self, error: str):
+        self.error = error
+
+def _incompleto(buffer: str, error: json.JSONDecodeError) -> bool:
+    """True si el error se debe solo a que el texto se corta (puede completarlo otro chunk)."""
+    return error.msg.startswith("Unterminated string") or bool(PREFIJO_INCOMPLETO.match(buffer, error.pos))
+
+def _controlar_tamanio(caracteres: int):
+    if caracteres > CARGA_FILA_MAX_CARACTERES:
+        raise FormatoInvalido(f"Una fila supera los {CARGA_FILA_MAX_CARACTERES} caracteres")
+
+async def leer_filas_json(stream):
+    """Lee un array JSON de objetos desde un stream de bytes, objeto por objeto.
+
+    No arma el array completo en memoria: decodifica cada elemento apenas llega
+    entero, es decir, cuando ya se ve la coma o el `]` que lo sigue (así un
+    número partido entre dos chunks no se lee por la mitad), y descarta lo ya
+    procesado del buffer. Lo que está mal formado falla en cuanto se ve, sin
+    esperar más datos; un elemento más largo que CARGA_FILA_MAX_CARACTERES
+    también, aunque todavía no haya terminado de llegar.
+    """
+    decoder = json.JSONDecoder()
+    texto = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    # Lo que se espera a continuación: "[", un elemento (o "]" si el array está vacío), "," o "]"
+    esperado = "["
+    async for chunk in stream:
+        buffer += texto.decode(chunk)
+        pos = 0
+        while esperado is not None:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos == len(buffer):
+                break
+            caracter = buffer[pos]
+            if esperado == "[":
+                if caracter != "[":
+                    raise FormatoInvalido("Se esperaba un array JSON")
+                esperado, pos = "primero", pos + 1
+            elif esperado in ("primero", "elemento"):
+                if esperado == "primero" and caracter == "]":
+                    esperado, pos = None, pos + 1
+                    break
+                try:
+                    fila, fin = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    if _incompleto(buffer, e):
+                        break
+                    raise FormatoInvalido(f"JSON mal formado: {e.msg}")
+                _controlar_tamanio(fin - pos)
+                # Un número o literal que llega hasta el final del buffer puede seguir en el próximo chunk
+                siguiente = fin
+                while siguiente < len(buffer) and buffer[siguiente].isspace():
+                    siguiente += 1
+                if siguiente == len(buffer) or (buffer[siguiente] not in ",]" and PREFIJO_INCOMPLETO.match(buffer, pos)):
+                    break
+                if buffer[siguiente] not in ",]":
+                    raise FormatoInvalido("Se esperaba ',' o ']' después de una fila")
+                yield fila
+                esperado, pos = "separador", fin
+            else:
+                if caracter not in ",]":
+                    raise FormatoInvalido("Se esperaba ',' o ']' después de una fila")
+                esperado = "elemento" if caracter == "," else None
+                pos += 1
+        buffer = buffer[pos:]
+        _controlar_tamanio(len(buffer))
+    buffer += texto.decode(b"", final=True)
+    if esperado is not None or buffer.strip():
+        raise FormatoInvalido("Array JSON incompleto o mal formado")
+
+async def leer_filas_csv(stream):
+    """Lee un CSV con encabezado desde un stream de bytes y devuelve un dict por fila.
+
+    Las celdas vacías se omiten para que apliquen los valores por defecto del esquema.
+    """
+    texto = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    pendiente = ""
+    encabezado = None
+
+    def registros(lineas):
+        nonlocal pendiente
+        for linea in lineas:
+            pendiente += linea
+            # Una comilla sin cerrar significa que el campo sigue en la línea siguiente
+            if pendiente.count('"') % 2:
+                continue
+            registro, pendiente = pendiente, ""
+            if registro.strip():
+                yield next(csv.reader([registro]))
+
+    def a_fila(valores):
+        if len(valores) != len(encabezado):
+            return FilaInvalida(f"Se esperaban {len(encabezado)} columnas y hay {len(valores)}")
+        return {clave: valor for clave, valor in zip(encabezado, valores) if valor != ""}
+
+    async for chunk in stream:
+        buffer += texto.decode(chunk)
+        *lineas, buffer = buffer.split("\n")
+        for valores in registros(linea + "\n" for linea in lineas):
+            if encabezado is None:
+                encabezado = [columna.strip() for columna in valores]
+                continue
+            yield a_fila(valores)
+        _controlar_tamanio(len(buffer) + len(pendiente))
+    buffer += texto.decode(b"", final=True)
+    for valores in registros([buffer]):
+        if encabezado is None:
+            encabezado = [columna.strip() for columna in valores]
+            continue
+        yield a_fila(valores)
+    if pendiente:
+        raise FormatoInvalido("CSV con comillas sin cerrar")
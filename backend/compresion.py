@@ -0,0 +1,174 @@
+from fastapi import Depends, Request
+from starlette.datastructures import Headers, MutableHeaders
+import asyncio
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # sin brotli se negocia solo gzip (y zstd si está)
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # opcional: pip install zstandard
+    zstandard = None
+
+# Codificaciones que sabe producir el servidor, en orden de preferencia.
+# Para los estáticos, que se comprimen una sola vez, gana la que más achica;
+# para las respuestas de la API, que se comprimen en cada petición, la más barata.
+CODIFICACIONES = ["br"] * bool(brotli) + ["zstd"] * bool(zstandard) + ["gzip"]
+CODIFICACIONES_DINAMICAS = ["zstd"] * bool(zstandard) + ["br"] * bool(brotli) + ["gzip"]
+
+# Niveles de cada algoritmo por perfil; "ninguno" deja la respuesta sin comprimir
+PERFILES = {
+    "rapido": {"gzip": 1, "br": 1, "zstd": 1},
+    "normal": {"gzip": 6, "br": 4, "zstd": 3},
+    "maximo": {"gzip": 9, "br": 9, "zstd": 12},
+}
+
+# Respuestas más chicas que esto no se comprimen: el ahorro no paga los headers y la CPU
+COMPRESION_MIN_BYTES = int(os.getenv("COMPRESION_MIN_BYTES", "1024"))
+COMPRESION_PERFIL = os.getenv("COMPRESION_PERFIL", "normal")
+
+# Cuerpos desde este tamaño se comprimen en un thread para no frenar el event loop
+BYTES_EN_THREAD = 256 * 1024
+
+TIPOS_COMPRIMIBLES = ("text/", "application/json", "application/javascript", "application/xml",
+                      "application/x-ndjson", "image/svg+xml")
+
+def comprimir(datos: bytes, codificacion: str, nivel: int | None = None) -> bytes:
+    """Comprime `datos` en `codificacion`; sin `nivel` usa el máximo de cada algoritmo."""
+    if codificacion == "gzip":
+        return gzip.compress(datos, compresslevel=9 if nivel is None else nivel, mtime=0)
+    if codificacion == "br":
+        return brotli.compress(datos, quality=11 if nivel is None else nivel)
+    if codificacion == "zstd":
+        return zstandard.ZstdCompressor(level=19 if nivel is None else nivel).compress(datos)
+    raise ValueError(f"Codificación no soportada: {codificacion}")
+
+def negociar(accept_encoding: str, disponibles) -> str | None:
+    """Elige la codificación para la respuesta según el header `Accept-Encoding`.
+
+    Respeta los pesos `q` (q=0 excluye) y el comodín `*`; a igual peso gana
+    el orden de `disponibles`. Devuelve None si corresponde mandar el
+    contenido sin comprimir.
+    """
+    pesos = {}
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        if not nombre:
+            continue
+        peso = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                peso = float(parametro[2:])
+            except ValueError:
+                peso = 0.0
+        pesos[nombre.strip()] = peso
+
+    elegida, mejor = None, 0.0
+    for codificacion in disponibles:
+        peso = pesos.get(codificacion, pesos.get("*", 0.0))
+        if peso > mejor:
+            elegida, mejor = codificacion, peso
+    return elegida
+
+def perfil_compresion(perfil: str):
+    """Dependencia para fijar el perfil de compresión de una ruta.
+
+    Se usa como `dependencies=[perfil_compresion("rapido")]`; las rutas que
+    no la declaran usan COMPRESION_PERFIL.
+    """
+    if perfil != "ninguno" and perfil not in PERFILES:
+        raise ValueError(f"Perfil de compresión desconocido: {perfil}")
+
+    def fijar(request: Request):
+        request.state.perfil_compresion = perfil
+
+    return Depends(fijar)
+
+def _comprimible(headers: Headers, status: int) -> bool:
+    if status in (204, 206, 304) or "content-encoding" in headers or "content-range" in headers:
+        return False
+    # Descargas de archivos (ya vienen comprimidos o son binarios)
+    if "content-disposition" in headers:
+        return False
+    return headers.get("content-type", "").startswith(TIPOS_COMPRIMIBLES)
+
+def agregar_vary(headers: MutableHeaders, valor: str):
+    """Como `add_vary_header`, sin repetir un valor que la respuesta ya trae."""
+    actuales = [v.strip().lower() for v in headers.get("vary", "").split(",")]
+    if valor.lower() not in actuales:
+        headers.add_vary_header(valor)
+
+class MiddlewareCompresion:
+    """Comprime las respuestas de la API según `Accept-Encoding`.
+
+    Negocia zstd, brotli o gzip (los que estén instalados) y comprime solo
+    respuestas completas de un tipo de texto de al menos
+    COMPRESION_MIN_BYTES. Deja pasar sin tocar las respuestas en streaming
+    (exportaciones), las que ya traen `Content-Encoding`, las de perfil
+    "ninguno" (los estáticos de backend/estaticos.py, que negocian con sus
+    variantes precomprimidas), las descargas con `Content-Disposition` y
+    los rangos.
+    Al comprimir, el ETag pasa a ser débil: el contenido en bytes cambia
+    aunque la representación sea la misma.
+    """
+
+    def __init__(self, app, minimo: int = COMPRESION_MIN_BYTES, perfil: str = COMPRESION_PERFIL):
+        self.app = app
+        self.minimo = minimo
+        self.perfil = perfil
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codificacion = negociar(Headers(scope=scope).get("accept-encoding", ""), CODIFICACIONES_DINAMICAS)
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Compartido con las sub-apps montadas (que copian el scope), para
+        # que también puedan fijar el perfil con request.state
+        estado = scope.setdefault("state", {})
+        inicio = None
+
+        async def enviar(mensaje):
+            nonlocal inicio
+            if mensaje["type"] == "http.response.start":
+                # Se retiene hasta ver el primer trozo del cuerpo
+                inicio = mensaje
+                return
+            if inicio is None:
+                await send(mensaje)
+                return
+            pendiente, inicio = inicio, None
+            headers = MutableHeaders(raw=pendiente["headers"])
+            perfil = estado.get("perfil_compresion", self.perfil)
+            if (mensaje["type"] != "http.response.body" or mensaje.get("more_body", False)
+                    or perfil not in PERFILES or not _comprimible(headers, pendiente["status"])):
+                await send(pendiente)
+                await send(mensaje)
+                return
+
+            agregar_vary(headers, "Accept-Encoding")
+            cuerpo = mensaje.get("body", b"")
+            if len(cuerpo) >= self.minimo:
+                nivel = PERFILES[perfil][codificacion]
+                if len(cuerpo) >= BYTES_EN_THREAD:
+                    cuerpo = await asyncio.to_thread(comprimir, cuerpo, codificacion, nivel)
+                else:
+                    cuerpo = comprimir(cuerpo, codificacion, nivel)
+                headers["Content-Encoding"] = codificacion
+                headers["Content-Length"] = str(len(cuerpo))
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                mensaje = {**mensaje, "body": cuerpo}
+            await send(pendiente)
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
@@ -0,0 +1,153 @@
+from collections import deque
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.pool import NullPool, QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine
+from .config import env_bool
+from . import metricas
+import os
+import threading
+import time
+
+# Echo de SQLAlchemy (todas las consultas a stdout); solo para depurar
+SQL_ECHO = env_bool("SQL_ECHO", "false")
+
+# Configuración del pool, por worker. Ver env.example
+POOL_CONFIG = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_pre_ping": env_bool("DB_POOL_PRE_PING", "true"),
+}
+
+def repartir_conexiones(conexiones: int, workers: int) -> dict:
+    """pool_size y max_overflow para que `workers` procesos no pasen de `conexiones` en total.
+
+    Cada worker tiene dos motores (sync y async) y durante un reinicio
+    escalonado hay un worker de más, así que el cupo de cada pool es
+    conexiones / ((workers + 1) * 2). Se respeta lo configurado si entra.
+    """
+    cupo = conexiones // ((workers + 1) * 2)
+    if cupo < 1:
+        raise ValueError(f"{conexiones} conexiones no alcanzan para {workers} workers")
+    tamanio = min(POOL_CONFIG["pool_size"], cupo)
+    return {"pool_size": tamanio, "max_overflow": min(POOL_CONFIG["max_overflow"], cupo - tamanio)}
+
+class EstadisticasPool:
+    """Contadores de uso de un pool: checkouts, timeouts y tiempos de espera."""
+
+    def __init__(self, muestras: int = 1000):
+        self._lock = threading.Lock()
+        self._esperas = deque(maxlen=muestras)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.conexiones_creadas = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+
+    def registrar_espera(self, segundos: float):
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total += segundos
+            self.espera_max = max(self.espera_max, segundos)
+            self._esperas.append(segundos)
+
+    def registrar_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def registrar_conexion(self):
+        with self._lock:
+            self.conexiones_creadas += 1
+
+    def resumen(self) -> dict:
+        with self._lock:
+            esperas = sorted(self._esperas)
+            checkouts, timeouts = self.checkouts, self.timeouts
+            espera_total, espera_max = self.espera_total, self.espera_max
+            conexiones = self.conexiones_creadas
+
+        def percentil(p):
+            if not esperas:
+                return 0.0
+            return esperas[min(len(esperas) - 1, int(len(esperas) * p / 100))] * 1000
+
+        return {
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "conexiones_creadas": conexiones,
+            "espera_promedio_ms": (espera_total / checkouts * 1000) if checkouts else 0.0,
+            "espera_max_ms": espera_max * 1000,
+            "espera_p50_ms": percentil(50),
+            "espera_p99_ms": percentil(99),
+        }
+
+# Estadísticas por nombre de motor ("sync", "async", ...), para /health/db
+ESTADISTICAS = {}
+
+def _pool_medido(base, nombre: str, estadisticas: EstadisticasPool):
+    """Subclase del pool que mide cuánto espera cada checkout.
+
+    SQLAlchemy no tiene un evento previo al checkout, así que la espera se
+    mide alrededor de `_do_get`, que es donde el pool se bloquea cuando
+    están todas las conexiones en uso. Además de las estadísticas de
+    /health/db alimenta los histogramas de /metrics.
+    """
+    espera = metricas.espera_pool.labels(nombre)
+    timeouts = metricas.timeouts_pool.labels(nombre)
+
+    class PoolMedido(base):
+        def _do_get(self):
+            inicio = time.perf_counter()
+            try:
+                conexion = super()._do_get()
+            except exc.TimeoutError:
+                estadisticas.registrar_timeout()
+                timeouts.inc()
+                raise
+            segundos = time.perf_counter() - inicio
+            estadisticas.registrar_espera(segundos)
+            espera.observe(segundos)
+            return conexion
+
+    return PoolMedido
+
+def _opciones_pool(nombre: str, base, kwargs: dict) -> dict:
+    if kwargs.get("poolclass") is NullPool:
+        # Sin pool (Alembic, scripts puntuales): solo aplica pre_ping
+        return {"pool_pre_ping": POOL_CONFIG["pool_pre_ping"], **kwargs}
+    estadisticas = ESTADISTICAS.setdefault(nombre, EstadisticasPool())
+    return {**POOL_CONFIG, "poolclass": _pool_medido(base, nombre, estadisticas), **kwargs}
+
+def _escuchar_conexiones(engine, nombre: str):
+    estadisticas = ESTADISTICAS.get(nombre)
+    if estadisticas is not None:
+        event.listen(engine, "connect", lambda *_: estadisticas.registrar_conexion())
+
+def crear_engine(url: str, nombre: str = "sync", **kwargs):
+    """Crea un motor sincrónico con la configuración de pool compartida."""
+    engine = create_engine(url, **_opciones_pool(nombre, QueuePool, kwargs))
+    _escuchar_conexiones(engine, nombre)
+    return engine
+
+def crear_async_engine(url: str, nombre: str = "async", **kwargs):
+    """Crea un motor async con la configuración de pool compartida."""
+    engine = create_async_engine(url, **_opciones_pool(nombre, AsyncAdaptedQueuePool, kwargs))
+    _escuchar_conexiones(engine.sync_engine, nombre)
+    return engine
+
+def estado_pool(engine, nombre: str) -> dict:
+    """Foto del pool (en uso, overflow, libres) más las estadísticas de espera."""
+    pool = engine.pool
+    estado = {"clase": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        estado.update({
+            "tamanio": pool.size(),
+            "en_uso": pool.checkedout(),
+            "libres": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": POOL_CONFIG["max_overflow"],
+        })
+    if nombre in ESTADISTICAS:
+        estado.update(ESTADISTICAS[nombre].resumen())
+    return estado
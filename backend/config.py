@@ -0,0 +1,10 @@
+from dotenv import load_dotenv
+import os
+
+# El .env se lee una sola vez, al importar el paquete backend (ver __init__.py):
+# los módulos leen después sus variables con os.getenv, sin volver a cargarlo.
+# Las variables ya definidas en el entorno tienen prioridad sobre el archivo.
+load_dotenv()
+
+def env_bool(nombre: str, defecto: str) -> bool:
+    return os.getenv(nombre, defecto).lower() in ("1", "true", "yes", "si")
@@ -0,0 +1,98 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from sqlalchemy import event
+from .config import env_bool
+import logging
+import os
+import random
+import re
+import time
+
+logger = logging.getLogger("classroom.sql")
+
+# Ruta HTTP que originó la consulta; la completa el middleware de connections/main.py
+ruta_actual: ContextVar[str | None] = ContextVar("ruta_actual", default=None)
+
+class MedicionPeticion:
+    """Consultas SQL, tiempo en la base y en serializar de una petición HTTP.
+
+    La abre el middleware de backend/metricas.py (o el de backend/perfilado.py).
+    """
+    __slots__ = ("consultas", "tiempo_db", "serializacion")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_db = 0.0
+        self.serializacion = 0.0
+
+# Mutable y no un entero: los endpoints sync corren en otro thread con una copia del contexto
+medicion_actual: ContextVar[MedicionPeticion | None] = ContextVar("medicion_actual", default=None)
+
+@dataclass
+class ConfigConsultas:
+    activo: bool
+    umbral_ms: float
+    muestreo: float
+
+# Se puede cambiar en caliente con PUT /admin/consultas (afecta al worker que atiende)
+config = ConfigConsultas(
+    activo=env_bool("SQL_LOG", "true"),
+    umbral_ms=float(os.getenv("SQL_SLOW_MS", "200")),
+    muestreo=float(os.getenv("SQL_SAMPLE_RATE", "0")),
+)
+
+def actualizar_config(**cambios) -> dict:
+    for clave, valor in cambios.items():
+        if valor is not None:
+            setattr(config, clave, valor)
+    return asdict(config)
+
+_PARAMETROS = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+
+def normalizar_sql(sql: str) -> str:
+    """Reemplaza parámetros y literales por `?` para agrupar consultas iguales."""
+    sql = _PARAMETROS.sub("?", sql)
+    sql = _LITERALES.sub("?", sql)
+    sql = _LISTAS.sub("(...)", sql)
+    return _ESPACIOS.sub(" ", sql).strip()
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    medicion = medicion_actual.get()
+    if medicion is not None:
+        medicion.consultas += 1
+    conn.info.setdefault("inicio_consulta", []).append(time.perf_counter())
+
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    duracion = time.perf_counter() - conn.info["inicio_consulta"].pop()
+    medicion = medicion_actual.get()
+    if medicion is not None:
+        medicion.tiempo_db += duracion
+    duracion_ms = duracion * 1000
+    if not config.activo:
+        return
+    lenta = duracion_ms >= config.umbral_ms
+    if not lenta and (config.muestreo <= 0 or random.random() >= config.muestreo):
+        return
+    logger.log(
+        logging.WARNING if lenta else logging.INFO,
+        "%s %.1f ms filas=%s ruta=%s sql=%s",
+        "SQL lenta" if lenta else "SQL muestra",
+        duracion_ms,
+        cursor.rowcount,
+        ruta_actual.get() or "-",
+        normalizar_sql(statement),
+    )
+
+def _error(contexto):
+    # La consulta falló: descartar su marca de inicio para no desalinear la pila
+    if contexto.connection is not None and contexto.connection.info.get("inicio_consulta"):
+        contexto.connection.info["inicio_consulta"].pop()
+
+def instrumentar(engine):
+    """Engancha el log de consultas a un motor sincrónico (o a `async_engine.sync_engine`)."""
+    event.listen(engine, "before_cursor_execute", _antes)
+    event.listen(engine, "after_cursor_execute", _despues)
+    event.listen(engine, "handle_error", _error)
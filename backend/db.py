@@ -1,13 +1,12 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from .conexion import crear_engine, crear_async_engine, SQL_ECHO
+from .consultas import instrumentar
 import os
-from dotenv import load_dotenv
+import threading
 from typing import Annotated
 from fastapi import Depends
 
-# Cargar variables de entorno desde el archivo .env
-load_dotenv()
-
 # Configuración de la conexión desde variables de entorno
 POSTGRES_USER = os.getenv('POSTGRES_USER')
 POSTGRES_PASSWORD = os.getenv('POSTGRES_PASSWORD')
@@ -16,17 +15,63 @@ POSTGRES_HOST = os.getenv('POSTGRES_HOST')
 POSTGRES_PORT = os.getenv('POSTGRES_PORT')
 
 DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+# Misma base con el driver asyncpg, para los routers de la API
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+
+# Los motores se crean la primera vez que se usan (o en el lifespan de la
+# aplicación), no al importar: importar la app no toca la base ni carga los drivers
+_motores = {}
+_lock_motores = threading.Lock()
+
+def _crear_motores() -> dict:
+    # Motor sincrónico (psycopg2): scripts, benchmarks y endpoints sync
+    engine = crear_engine(DATABASE_URL, echo=SQL_ECHO)
+    instrumentar(engine)
+    # Motor async (asyncpg): la concurrencia queda acotada por el pool y no por el thread pool
+    async_engine = crear_async_engine(ASYNC_DATABASE_URL, echo=SQL_ECHO)
+    instrumentar(async_engine.sync_engine)
+    return {
+        "engine": engine,
+        "SessionLocal": sessionmaker(autocommit=False, autoflush=False, bind=engine),
+        "async_engine": async_engine,
+        "AsyncSessionLocal": async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False),
+    }
+
+def motores() -> dict:
+    """Motores y fábricas de sesiones, creados una sola vez por proceso."""
+    if not _motores:
+        with _lock_motores:
+            if not _motores:
+                _motores.update(_crear_motores())
+    return _motores
+
+def __getattr__(nombre):
+    # `from backend.db import engine` (y async_engine, SessionLocal, AsyncSessionLocal)
+    # sigue funcionando: el motor se crea recién cuando alguien lo pide
+    if nombre in ("engine", "SessionLocal", "async_engine", "AsyncSessionLocal"):
+        return motores()[nombre]
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+async def cerrar_motores():
+    """Cierra las conexiones de los pools (al apagar el worker)."""
+    if _motores:
+        await _motores["async_engine"].dispose()
+        _motores["engine"].dispose()
 
 def get_db():
-    db = SessionLocal()
+    db = motores()["SessionLocal"]()
     try:
         yield db
     finally:
         db.close()
 
-# Dependencia tipada para usar en todos lados
+async def get_async_db():
+    async with motores()["AsyncSessionLocal"]() as db:
+        yield db
+
+# Dependencia tipada para usar en todos lados (sesión sincrónica)
 db_dependency = Annotated[Session, Depends(get_db)]
+# Dependencia tipada para los endpoints async de connections/
+async_db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
 
-engine = create_engine(DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base() 
\ No newline at end of file
+Base = declarative_base()
@@ -0,0 +1,193 @@
+from fastapi import Request, Response
+from fastapi.staticfiles import StaticFiles
+from .compresion import CODIFICACIONES, comprimir, negociar
+import hashlib
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Assets que se versionan con el hash de su contenido
+EXTENSIONES_ASSETS = (".css", ".js")
+
+# Referencias a reescribir: href/src en el HTML y url()/@import en el CSS
+REFERENCIAS_HTML = re.compile(r'''(?P<atributo>\b(?:href|src)=)(?P<comilla>["'])(?P<ruta>[^"']+)(?P=comilla)''')
+REFERENCIAS_CSS = re.compile(r'''(?P<antes>url\(\s*|@import\s+(?=["']))(?P<comilla>["']?)(?P<ruta>[^"')\s]+)(?P=comilla)''')
+
+INMUTABLE = "public, max-age=31536000, immutable"
+REVALIDAR = "no-cache"
+
+class Recurso:
+    """Contenido servido desde memoria, con sus variantes comprimidas.
+
+    Las variantes se comprimen una sola vez, todas juntas con `precomprimir()`
+    (en un thread: nivel máximo). Hasta que estén listas se sirve el contenido
+    sin comprimir, para no comprimir en el event loop.
+    """
+
+    def __init__(self, datos: bytes, tipo: str, cache_control: str):
+        self.tipo = tipo
+        self.cache_control = cache_control
+        self.etag = f'"{hashlib.sha256(datos).hexdigest()[:20]}"'
+        self.datos = datos
+        # Codificación -> bytes, o None si comprimir no achica (archivos chicos)
+        self.variantes = {}
+
+    def variante(self, codificacion: str) -> bytes | None:
+        if codificacion not in self.variantes:
+            comprimido = comprimir(self.datos, codificacion)
+            self.variantes[codificacion] = comprimido if len(comprimido) < len(self.datos) else None
+        return self.variantes[codificacion]
+
+    def precomprimir(self):
+        for codificacion in CODIFICACIONES:
+            self.variante(codificacion)
+
+    def responder(self, request: Request) -> Response:
+        # Ya negocia con sus variantes: el middleware de compresión no la toca
+        # (ni siquiera antes de que estén listas, para no comprimir en el event loop)
+        request.state.perfil_compresion = "ninguno"
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if self.etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        listas = [c for c in CODIFICACIONES if self.variantes.get(c) is not None]
+        codificacion = negociar(request.headers.get("accept-encoding", ""), listas)
+        if codificacion:
+            contenido = self.variantes[codificacion]
+            headers["Content-Encoding"] = codificacion
+        else:
+            contenido = self.datos
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(contenido))
+            contenido = b""
+        return Response(contenido, media_type=self.tipo, headers=headers)
+
+class FrontendEstatico(StaticFiles):
+    """Sirve `frontend/` con assets versionados y páginas cacheadas en memoria.
+
+    `preparar()` recorre el directorio una sola vez: a cada CSS/JS le
+    agrega al nombre el hash de su contenido (`css/alumnos.3f2a9c1b7d4e.css`)
+    y reescribe las referencias del
+    HTML (y los `@import` del CSS) a esos nombres. Los assets versionados se
+    sirven con `Cache-Control: immutable`, porque un cambio de contenido
+    cambia la URL; las páginas HTML, con ETag y `no-cache`, así el navegador
+    revalida y recibe un 304 si no cambiaron. Lo que no está en memoria
+    (los nombres originales, imágenes, etc.) lo sirve StaticFiles como siempre.
+
+    La aplicación llama a `preparar()` en su lifespan; si no (por ejemplo con
+    un cliente de pruebas que no corre el lifespan), se prepara en el primer uso.
+    Las variantes gzip/brotli (lo caro: nivel máximo) las calcula
+    `precomprimir()` en segundo plano, sin demorar el arranque del worker.
+    """
+
+    def __init__(self, directorio: str, prefijo: str = "/static"):
+        super().__init__(directory=directorio)
+        self.directorio = directorio
+        self.prefijo = prefijo.rstrip("/")
+        self.versionados = {}
+        self.recursos = {}
+        self.preparado = False
+        self._lock = threading.Lock()
+
+    def preparar(self):
+        """Versiona los assets y carga las páginas en memoria (unos pocos ms)."""
+        with self._lock:
+            if not self.preparado:
+                self._construir()
+                self.preparado = True
+
+    def precomprimir(self, cancelar: threading.Event | None = None):
+        """Comprime de antemano todas las variantes (cientos de ms de CPU: conviene en un thread).
+
+        Con `cancelar` activado se corta entre un recurso y el siguiente.
+        """
+        self.preparar()
+        for recurso in list(self.recursos.values()):
+            if cancelar is not None and cancelar.is_set():
+                return
+            recurso.precomprimir()
+
+    def _construir(self):
+        for raiz, _, archivos in os.walk(self.directorio):
+            for archivo in sorted(archivos):
+                relativa = os.path.relpath(os.path.join(raiz, archivo), self.directorio).replace(os.sep, "/")
+                if relativa.endswith(EXTENSIONES_ASSETS):
+                    self._versionar(relativa, set())
+                elif relativa.endswith(".html"):
+                    self._cargar_pagina(relativa)
+        logger.info(f"Frontend: {len(self.versionados)} assets versionados y "
+                    f"{len(self.recursos) - len(self.versionados)} páginas en memoria")
+
+    def _leer(self, relativa: str) -> bytes:
+        with open(os.path.join(self.directorio, relativa), "rb") as archivo:
+            return archivo.read()
+
+    def _resolver(self, desde: str, ruta: str) -> str | None:
+        """Ruta relativa al directorio del asset local al que apunta `ruta`, o None."""
+        if re.match(r"^([a-z]+:|//|#)", ruta):
+            return None
+        ruta = ruta.split("?")[0].split("#")[0]
+        if ruta.startswith(self.prefijo + "/"):
+            destino = ruta[len(self.prefijo) + 1:]
+        elif ruta.startswith("/"):
+            return None
+        else:
+            destino = posixpath.normpath(posixpath.join(posixpath.dirname(desde), ruta))
+        return destino if os.path.isfile(os.path.join(self.directorio, destino)) else None
+
+    def _versionar(self, relativa: str, visitados: set) -> str:
+        """Nombre versionado del asset; versiona primero los que importa."""
+        if relativa in self.versionados:
+            return self.versionados[relativa]
+        visitados.add(relativa)
+        datos = self._leer(relativa)
+        if relativa.endswith(".css"):
+            def reemplazar(coincidencia):
+                destino = self._resolver(relativa, coincidencia["ruta"])
+                if destino is None or not destino.endswith(EXTENSIONES_ASSETS) or destino in visitados:
+                    return coincidencia[0]
+                nuevo = posixpath.relpath(self._versionar(destino, visitados), posixpath.dirname(relativa))
+                return f'{coincidencia["antes"]}{coincidencia["comilla"]}{nuevo}{coincidencia["comilla"]}'
+            datos = REFERENCIAS_CSS.sub(reemplazar, datos.decode("utf-8")).encode("utf-8")
+
+        base, extension = posixpath.splitext(relativa)
+        versionada = f"{base}.{hashlib.sha256(datos).hexdigest()[:12]}{extension}"
+        self.recursos[versionada] = Recurso(datos, self._tipo(relativa), INMUTABLE)
+        self.versionados[relativa] = versionada
+        return versionada
+
+    def _cargar_pagina(self, relativa: str):
+        def reemplazar(coincidencia):
+            destino = self._resolver(relativa, coincidencia["ruta"])
+            if destino not in self.versionados and (destino or "").endswith(EXTENSIONES_ASSETS):
+                self._versionar(destino, set())
+            if destino not in self.versionados:
+                return coincidencia[0]
+            # Absoluta: la misma página se sirve también desde /alumnos-page, etc.
+            nuevo = f"{self.prefijo}/{self.versionados[destino]}"
+            return f'{coincidencia["atributo"]}{coincidencia["comilla"]}{nuevo}{coincidencia["comilla"]}'
+
+        html = REFERENCIAS_HTML.sub(reemplazar, self._leer(relativa).decode("utf-8"))
+        self.recursos[relativa] = Recurso(html.encode("utf-8"), "text/html; charset=utf-8", REVALIDAR)
+
+    def _tipo(self, relativa: str) -> str:
+        tipo = mimetypes.guess_type(relativa)[0] or "application/octet-stream"
+        return f"{tipo}; charset=utf-8" if tipo.startswith("text/") or tipo.endswith("javascript") else tipo
+
+    def pagina(self, nombre: str, request: Request) -> Response:
+        """Respuesta para una página HTML del frontend (para las rutas `/alumnos-page`, etc.)."""
+        if not self.preparado:
+            self.preparar()
+        return self.recursos[nombre].responder(request)
+
+    async def get_response(self, path: str, scope) -> Response:
+        if not self.preparado:
+            self.preparar()
+        recurso = self.recursos.get(path.replace(os.sep, "/"))
+        if recurso is not None and scope["method"] in ("GET", "HEAD"):
+            return recurso.responder(Request(scope))
+        return await super().get_response(path, scope)
@@ -0,0 +1,57 @@
+from fastapi.responses import StreamingResponse
+from typing import Literal
+import csv
+import io
+import os
+import orjson
+from .db import motores
+
+# Filas que se piden por vez al cursor del servidor
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "1000"))
+
+FormatoExport = Literal["ndjson", "csv"]
+
+TIPOS_MEDIA = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+async def _particiones(stmt):
+    # Sesión propia: el generador sigue corriendo después de que el handler
+    # devolvió la respuesta, cuando la sesión de la dependencia ya se cerró.
+    # `stream()` abre un cursor del lado del servidor y `yield_per` acota
+    # cuántas filas hay en memoria a la vez.
+    async with motores()["AsyncSessionLocal"]() as db:
+        resultado = await db.stream(stmt.execution_options(yield_per=EXPORT_YIELD_PER))
+        async for particion in resultado.partitions():
+            yield particion
+
+async def _ndjson(stmt):
+    async for particion in _particiones(stmt):
+        yield b"".join(orjson.dumps(fila._asdict()) + b"\n" for fila in particion)
+
+async def _csv(stmt):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(stmt.selected_columns.keys())
+    yield buffer.getvalue()
+    async for particion in _particiones(stmt):
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows(particion)
+        yield buffer.getvalue()
+
+def exportar(stmt, formato: FormatoExport, nombre: str) -> StreamingResponse:
+    """Respuesta que va enviando el resultado de `stmt` a medida que llega de la base.
+
+    `stmt` tiene que ser un SELECT de columnas (ver `serializacion.columnas`),
+    ya filtrado y ordenado. La memoria usada depende de EXPORT_YIELD_PER y no
+    de la cantidad de filas; a cambio, la conexión queda tomada del pool
+    mientras dura la descarga.
+    """
+    generador = _csv(stmt) if formato == "csv" else _ndjson(stmt)
+    return StreamingResponse(
+        generador,
+        media_type=TIPOS_MEDIA[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}.{formato}"'},
+    )
@@ -0,0 +1,35 @@
+from sqlalchemy import select, delete, true
+from sqlalchemy.dialects.postgresql import insert
+from .modelos import AlumnoDB, MateriaDB, materia_alumno
+
+# Tope de ids por petición de inscripción / baja
+MAX_IDS_INSCRIPCION = 1000
+
+async def inscribir(db, materia_ids: list[int], alumno_ids: list[int]) -> int:
+    """Inscribe cada alumno en cada materia con un único INSERT ... SELECT.
+
+    Los pares se arman cruzando las filas existentes de `materias` y `alumnos`,
+    así que los ids inexistentes se descartan sin violar la FK, y los pares ya
+    inscriptos los salta el ON CONFLICT. Devuelve cuántas inscripciones nuevas
+    hubo. No hace commit.
+    """
+    pares = (
+        select(MateriaDB.id, AlumnoDB.id)
+        .select_from(MateriaDB)
+        .join(AlumnoDB, true())
+        .where(MateriaDB.id.in_(materia_ids), AlumnoDB.id.in_(alumno_ids))
+    )
+    stmt = (
+        insert(materia_alumno)
+        .from_select(["materia_id", "alumno_id"], pares)
+        .on_conflict_do_nothing()
+    )
+    return (await db.execute(stmt)).rowcount
+
+async def dar_de_baja(db, materia_ids: list[int], alumno_ids: list[int]) -> int:
+    """Borra las inscripciones de esos alumnos en esas materias con un único DELETE."""
+    stmt = delete(materia_alumno).where(
+        materia_alumno.c.materia_id.in_(materia_ids),
+        materia_alumno.c.alumno_id.in_(alumno_ids),
+    )
+    return (await db.execute(stmt)).rowcount
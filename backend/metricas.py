@@ -0,0 +1,122 @@
+import atexit
+import os
+import time
+
+# prometheus_client decide al importarse si escribe en memoria o en archivos
+# compartidos (PROMETHEUS_MULTIPROC_DIR): el .env ya lo cargó backend/config.py
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from .consultas import MedicionPeticion, medicion_actual
+
+# Con varios workers de uvicorn cada proceso escribe sus valores en este
+# directorio y /metrics los suma; tiene que existir y vaciarse al arrancar
+MULTIPROCESO = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+# Si está definido, /metrics exige "Authorization: Bearer <token>"
+METRICAS_TOKEN = os.getenv("METRICAS_TOKEN", "")
+
+SIN_RUTA = "sin_ruta"
+
+peticiones = Counter(
+    "http_peticiones_total", "Peticiones HTTP atendidas", ["metodo", "ruta", "estado"],
+)
+excepciones = Counter(
+    "http_excepciones_total", "Peticiones que terminaron con una excepción sin manejar", ["metodo", "ruta"],
+)
+duracion = Histogram(
+    "http_duracion_segundos", "Latencia de las peticiones HTTP, hasta el último byte", ["metodo", "ruta"],
+)
+en_curso = Gauge(
+    "http_en_curso", "Peticiones HTTP en curso", multiprocess_mode="livesum",
+)
+consultas_por_peticion = Histogram(
+    "db_consultas_por_peticion", "Consultas SQL ejecutadas por cada petición HTTP", ["ruta"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, float("inf")),
+)
+espera_pool = Histogram(
+    "db_pool_espera_segundos", "Espera para obtener una conexión del pool", ["motor"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30, float("inf")),
+)
+timeouts_pool = Counter(
+    "db_pool_timeouts_total", "Checkouts que agotaron DB_POOL_TIMEOUT", ["motor"],
+)
+bcrypt_segundos = Histogram(
+    "auth_bcrypt_segundos", "Tiempo de hashear o verificar una contraseña, incluida la cola del executor",
+    ["operacion"], buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, float("inf")),
+)
+cache_aciertos = Counter("cache_aciertos_total", "Lecturas de cache que encontraron el valor", ["cache"])
+cache_fallos = Counter("cache_fallos_total", "Lecturas de cache que no encontraron el valor", ["cache"])
+
+def _proceso_terminado():
+    # El pid se lee al salir y no al importar: con `servidor.py --preload` este
+    # módulo se importa en el supervisor y los workers son forks suyos
+    multiprocess.mark_process_dead(os.getpid())
+
+if MULTIPROCESO:
+    # Los gauges "livesum" de un worker que terminó dejan de sumar
+    atexit.register(_proceso_terminado)
+
+def registrar_cache(nombre: str, acierto: bool):
+    (cache_aciertos if acierto else cache_fallos).labels(nombre).inc()
+
+def exportar() -> tuple[bytes, str]:
+    """Texto de exposición de Prometheus con las métricas de todos los workers."""
+    if MULTIPROCESO:
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return generate_latest(registro), CONTENT_TYPE_LATEST
+
+def _ruta(scope) -> str:
+    # La plantilla de la ruta ("/alumnos/{alumno_id}") y no el path, para no
+    # crear una serie por id; la deja el router al resolverla
+    ruta = getattr(scope.get("route"), "path", None)
+    if ruta:
+        return ruta
+    if "app_root_path" in scope:
+        # Un Mount (/static) no se anota como ruta, pero sí deja su prefijo
+        return f"{scope['root_path']}/{{path}}"
+    return SIN_RUTA
+
+class MiddlewareMetricas:
+    """Latencia, estado y consultas SQL de cada petición.
+
+    Middleware ASGI puro y el más externo, para medir también lo que agregan
+    los demás (compresión, CORS). Abre la medición de consultas que completan
+    los eventos de backend/consultas.py.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        medicion = MedicionPeticion()
+        token = medicion_actual.set(medicion)
+        en_curso.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        except Exception:
+            excepciones.labels(scope["method"], _ruta(scope)).inc()
+            raise
+        finally:
+            transcurrido = time.perf_counter() - inicio
+            en_curso.dec()
+            medicion_actual.reset(token)
+            ruta = _ruta(scope)
+            peticiones.labels(scope["method"], ruta, str(estado)).inc()
+            duracion.labels(scope["method"], ruta).observe(transcurrido)
+            consultas_por_peticion.labels(ruta).observe(medicion.consultas)
@@ -0,0 +1,72 @@
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+import ast
+import asyncio
+import glob
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+VERSIONES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic", "versions")
+_IDENTIFICADORES = re.compile(r"^(revision|down_revision)\b[^=\n]*=\s*(.+)$", re.MULTILINE)
+
+# Qué hacer al arrancar si la base no está en la última migración:
+# "verificar" (no arranca), "avisar" (solo log) o "no" (ni consulta)
+MIGRACIONES_ARRANQUE = os.getenv("MIGRACIONES_ARRANQUE", "verificar")
+# Si la base no contesta en este tiempo el worker arranca igual (lo informa /health/db)
+TIMEOUT_VERIFICACION = 5
+
+class MigracionesPendientes(RuntimeError):
+    pass
+
+def revisiones_head() -> set[str]:
+    """Últimas revisiones de alembic/versions: las que ninguna otra revisa.
+
+    Lee los identificadores de cada archivo con una regex en lugar de cargar
+    el ScriptDirectory de Alembic, que importa alembic y todas las
+    migraciones (~150 ms por worker).
+    """
+    revisiones, revisadas = set(), set()
+    for ruta in glob.glob(os.path.join(VERSIONES, "*.py")):
+        with open(ruta, encoding="utf-8") as archivo:
+            for clave, valor in _IDENTIFICADORES.findall(archivo.read()):
+                valor = ast.literal_eval(valor.strip())
+                if clave == "revision":
+                    revisiones.add(valor)
+                elif isinstance(valor, str):
+                    revisadas.add(valor)
+                elif valor:
+                    revisadas.update(valor)
+    return revisiones - revisadas
+
+async def revisiones_aplicadas(engine) -> set[str]:
+    async with engine.connect() as conexion:
+        try:
+            filas = await conexion.execute(text("SELECT version_num FROM alembic_version"))
+        except DBAPIError:
+            return set()  # base sin migrar: no existe la tabla
+        return {fila[0] for fila in filas}
+
+async def verificar_migraciones(engine):
+    """Compara la revisión de la base con la del código (una consulta, sin reflejar el esquema).
+
+    El esquema lo crea y actualiza solo Alembic (`alembic upgrade head`);
+    la aplicación nunca ejecuta DDL al arrancar.
+    """
+    if MIGRACIONES_ARRANQUE == "no":
+        return
+    esperadas = revisiones_head()
+    try:
+        aplicadas = await asyncio.wait_for(revisiones_aplicadas(engine), TIMEOUT_VERIFICACION)
+    except (OSError, DBAPIError, asyncio.TimeoutError) as e:
+        logger.warning(f"No se pudo verificar la revisión de la base al arrancar: {e!r}")
+        return
+    if aplicadas == esperadas:
+        return
+    mensaje = (f"La base está en {', '.join(sorted(aplicadas)) or 'ninguna revisión'} y el código espera "
+               f"{', '.join(sorted(esperadas))}: ejecutar `alembic upgrade head`")
+    if MIGRACIONES_ARRANQUE == "verificar":
+        raise MigracionesPendientes(mensaje)
+    logger.warning(mensaje)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Table, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Date, Table, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from .db import Base
 
@@ -6,14 +6,17 @@ from .db import Base
 materia_alumno = Table(
     'materia_alumno', Base.metadata,
     Column('materia_id', Integer, ForeignKey('materias.id'), primary_key=True),
-    Column('alumno_id', Integer, ForeignKey('alumnos.id'), primary_key=True)
+    Column('alumno_id', Integer, ForeignKey('alumnos.id'), primary_key=True),
+    # La PK cubre las búsquedas por materia; este índice, las materias de un alumno
+    Index('ix_materia_alumno_alumno_id', 'alumno_id', 'materia_id'),
 )
 
 # Tabla de asociación para la relación muchos a muchos entre Materia y Profesor
 materia_profesor = Table(
     'materia_profesor', Base.metadata,
     Column('materia_id', Integer, ForeignKey('materias.id'), primary_key=True),
-    Column('profesor_id', Integer, ForeignKey('profesores.id'), primary_key=True)
+    Column('profesor_id', Integer, ForeignKey('profesores.id'), primary_key=True),
+    Index('ix_materia_profesor_profesor_id', 'profesor_id', 'materia_id'),
 )
 
 class UsuarioDB(Base):
@@ -39,7 +42,7 @@ class AlumnoDB(Base):
     nro_doc = Column(String, unique=True, nullable=False) 
     nombre = Column(String, nullable=False)
     apellido = Column(String, nullable=False)
-    nacimiento = Column(String, nullable=True)  # Fecha de nacimiento
+    nacimiento = Column(Date, nullable=True)  # Fecha de nacimiento
     mail = Column(String, unique=True, nullable=False)
     telefono = Column(String, nullable=True)
     direccion = Column(String, nullable=True)
@@ -49,6 +52,14 @@ class AlumnoDB(Base):
     carrera_id = Column(Integer, nullable=True)  # ID de la carrera (puede ser ForeignKey en el futuro)
     materias = relationship('MateriaDB', secondary=materia_alumno, back_populates='alumnos')
 
+    # Índices compuestos (filtro, id) para paginación keyset con filtros
+    __table_args__ = (
+        Index('ix_alumnos_cohorte_id', 'cohorte', 'id'),
+        Index('ix_alumnos_estado_id', 'estado', 'id'),
+        Index('ix_alumnos_al_dia_id', 'al_dia', 'id'),
+        Index('ix_alumnos_carrera_id_id', 'carrera_id', 'id'),
+    )
+
 class MateriaDB(Base):
     __tablename__ = 'materias'
     id = Column(Integer, primary_key=True, index=True)
@@ -62,12 +73,18 @@ class MateriaDB(Base):
     modalidad = Column(String, nullable=True) 
     profesor_responsable = Column(String, nullable=True)
     horario = Column(String, nullable=True)
-    materia_previa_id = Column(Integer, ForeignKey('materias.id'), nullable=True)
+    materia_previa_id = Column(Integer, ForeignKey('materias.id'), nullable=True, index=True)
     estado = Column(String, nullable=True) 
     carga_horaria = Column(Integer, nullable=True) 
     observaciones = Column(String, nullable=True)
     alumnos = relationship('AlumnoDB', secondary=materia_alumno, back_populates='materias')
     profesores = relationship('ProfesorDB', secondary=materia_profesor, back_populates='materias')
+    materia_previa = relationship('MateriaDB', remote_side=[id])
+
+    __table_args__ = (
+        Index('ix_materias_estado_id', 'estado', 'id'),
+        Index('ix_materias_anio_perteneciente_id', 'anio_perteneciente', 'id'),
+    )
 
 class ProfesorDB(Base):
     __tablename__ = 'profesores'
@@ -79,15 +96,20 @@ class ProfesorDB(Base):
     legajo = Column(Integer, unique=True, nullable=True) 
     titulo_universitario = Column(String, nullable=True)
     especialidad = Column(String, nullable=True)
-    fecha_alta = Column(String, nullable=True)
+    fecha_alta = Column(Date, nullable=True)
     mail = Column(String, unique=True, nullable=True)
     telefono = Column(String, nullable=True)
     estado = Column(String, nullable=True) 
     mat_asignadas = Column(Integer, nullable=True, default=0) 
-    usuario_id = Column(Integer, ForeignKey('usuarios.id'), nullable=True) 
+    usuario_id = Column(Integer, ForeignKey('usuarios.id'), nullable=True, index=True) 
     materias = relationship('MateriaDB', secondary=materia_profesor, back_populates='profesores')
     usuario = relationship('UsuarioDB', back_populates='profesores')
 
+    __table_args__ = (
+        Index('ix_profesores_estado_id', 'estado', 'id'),
+        Index('ix_profesores_especialidad_id', 'especialidad', 'id'),
+    )
+
 class MaterialDB(Base):
     __tablename__ = 'materiales'
     id = Column(Integer, primary_key=True, index=True)
@@ -95,21 +117,31 @@ class MaterialDB(Base):
     descripcion = Column(String, nullable=True)
     tipo = Column(String, nullable=True) 
     archivo = Column(String, nullable=True)
-    fecha_subida = Column(String, nullable=True) 
+    fecha_subida = Column(Date, nullable=True) 
     profesor_id = Column(Integer, ForeignKey('profesores.id'), nullable=True)
     materia_id = Column(Integer, ForeignKey('materias.id'), nullable=True) 
     tamanio = Column(Integer, nullable=True) 
     estado = Column(String, nullable=True) 
+    hash_archivo = Column(String(64), nullable=True, index=True)
+    nombre_archivo = Column(String, nullable=True)
+    tipo_contenido = Column(String, nullable=True)
     profesor = relationship('ProfesorDB', backref='materiales')
     materia = relationship('MateriaDB', backref='materiales')
 
+    __table_args__ = (
+        Index('ix_materiales_materia_id_id', 'materia_id', 'id'),
+        Index('ix_materiales_profesor_id_id', 'profesor_id', 'id'),
+        Index('ix_materiales_tipo_id', 'tipo', 'id'),
+        Index('ix_materiales_estado_id', 'estado', 'id'),
+    )
+
 class TareaDB(Base):
     __tablename__ = 'tareas'
     id = Column(Integer, primary_key=True, index=True)
     titulo = Column(String, nullable=False)
     descripcion = Column(String, nullable=True)
-    fecha_entrega = Column(String, nullable=True) 
-    fecha_publicacion = Column(String, nullable=True) 
+    fecha_entrega = Column(Date, nullable=True) 
+    fecha_publicacion = Column(Date, nullable=True) 
     materia_id = Column(Integer, ForeignKey('materias.id'), nullable=True)
     profesor_id = Column(Integer, ForeignKey('profesores.id'), nullable=True) 
     tipo = Column(String, nullable=True) 
@@ -117,4 +149,20 @@ class TareaDB(Base):
     estado = Column(String, nullable=True) 
     materia = relationship('MateriaDB', backref='tareas')
 
- 
\ No newline at end of file
+    __table_args__ = (
+        Index('ix_tareas_materia_id_id', 'materia_id', 'id'),
+        Index('ix_tareas_profesor_id_id', 'profesor_id', 'id'),
+        Index('ix_tareas_tipo_id', 'tipo', 'id'),
+        Index('ix_tareas_estado_id', 'estado', 'id'),
+        # Rangos de fecha de entrega (ver migración c4e8a1f6b903)
+        Index('ix_tareas_fecha_entrega_id', 'fecha_entrega', 'id'),
+        Index('ix_tareas_materia_id_fecha_entrega', 'materia_id', 'fecha_entrega', 'id'),
+    )
+
+# Versión por tabla para ETags; la mantienen triggers de la base (ver migraciones 5a7c3e9d2f18
+# y d3a6f8b2c517). Repartida en ranuras por conexión: la versión de la tabla es la suma
+class VersionTablaDB(Base):
+    __tablename__ = 'versiones_tablas'
+    tabla = Column(String, primary_key=True)
+    ranura = Column(SmallInteger, primary_key=True, default=0)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from typing import Annotated
+from fastapi import Depends, Query, Response
+
+# Límites de paginación para los endpoints de listado
+LIMITE_POR_DEFECTO = 100
+LIMITE_MAXIMO = 1000
+
+# Header con el cursor de la página siguiente (se expone en CORS desde main.py)
+HEADER_CURSOR = "X-Next-Cursor"
+
+@dataclass
+class Paginacion:
+    limit: int
+    after: int | None
+
+def parametros_paginacion(
+    limit: int = Query(LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+    after: int | None = Query(None, ge=0, description="Último id recibido en la página anterior"),
+) -> Paginacion:
+    return Paginacion(limit=limit, after=after)
+
+# Dependencia tipada para usar en los routers
+paginacion_dependency = Annotated[Paginacion, Depends(parametros_paginacion)]
+
+def consulta_pagina(stmt, columna_id, paginacion: Paginacion):
+    """`stmt` con el filtro del cursor, el orden y el límite de una página (más una fila)."""
+    if paginacion.after is not None:
+        stmt = stmt.where(columna_id > paginacion.after)
+    return stmt.order_by(columna_id).limit(paginacion.limit + 1)
+
+async def paginar(db, stmt, columna_id, paginacion: Paginacion, response: Response, crudas: bool = False):
+    """Aplica paginación keyset sobre `columna_id` y deja el cursor siguiente en el header.
+
+    Se pide una fila de más para saber si hay otra página sin hacer un COUNT.
+    Como se filtra por `id > after` en lugar de usar OFFSET, el costo de cada
+    página es el mismo sin importar qué tan lejos esté.
+
+    Con `crudas=True` devuelve las tuplas de un SELECT de columnas (ver
+    backend/serializacion.py) en lugar de objetos del ORM.
+    """
+    resultado = await db.execute(consulta_pagina(stmt, columna_id, paginacion))
+    filas = resultado.all() if crudas else resultado.scalars().all()
+    if len(filas) > paginacion.limit:
+        filas = filas[:paginacion.limit]
+        response.headers[HEADER_CURSOR] = str(filas[-1].id)
+    return filas
@@ -0,0 +1,259 @@
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from fastapi.routing import APIRoute
+from functools import lru_cache, wraps
+from starlette.datastructures import Headers
+from .consultas import MedicionPeticion, medicion_actual
+import asyncio
+import inspect
+import logging
+import os
+import re
+import secrets
+import sys
+import sysconfig
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Perfilado a pedido: sin token queda apagado y el middleware ni se instala
+PERFILADO_TOKEN = os.getenv("PERFILADO_TOKEN", "")
+PERFILADO_DIR = os.getenv("PERFILADO_DIR", "perfiles")
+PERFILADO_INTERVALO_MS = float(os.getenv("PERFILADO_INTERVALO_MS", "1"))
+
+HEADER_TOKEN = "x-perfilado"
+# "respuesta": el perfil reemplaza al cuerpo; "disco": se guarda en PERFILADO_DIR
+HEADER_MODO = "x-perfilado-modo"
+MODOS = ("respuesta", "disco")
+
+def registrar_serializacion(segundos: float):
+    """Suma tiempo de serialización a la petición en curso (si hay una medición abierta)."""
+    medicion = medicion_actual.get()
+    if medicion is not None:
+        medicion.serializacion += segundos
+
+# Los archivos de la biblioteca estándar y de los paquetes se muestran sin su carpeta
+_RAICES = sorted({sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["purelib"]}, key=len, reverse=True)
+
+@lru_cache(maxsize=4096)
+def _archivo(ruta: str) -> str:
+    for raiz in _RAICES:
+        if ruta.startswith(raiz + os.sep):
+            return os.path.relpath(ruta, raiz)
+    return os.path.relpath(ruta)
+
+def _pila(frame) -> str:
+    marcos = []
+    while frame is not None:
+        codigo = frame.f_code
+        marcos.append(f"{codigo.co_name} ({_archivo(codigo.co_filename)}:{codigo.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(marcos))
+
+class Muestreador:
+    """Profiler por muestreo de un thread: cada `intervalo` segundos anota su pila.
+
+    Se muestrea el thread del event loop, así que las corrutinas aparecen con
+    toda su cadena de awaits; también aparece lo que hagan en ese momento
+    otras peticiones del mismo worker, por eso conviene perfilar sin carga.
+    """
+
+    def __init__(self, hilo: int, intervalo: float):
+        self.hilo = hilo
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self.muestras = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._correr, name="perfilado", daemon=True)
+
+    def _correr(self):
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self.hilo)
+            if frame is not None:
+                self.pilas[_pila(frame)] += 1
+                self.muestras += 1
+
+    def iniciar(self):
+        self._thread.start()
+
+    def detener(self):
+        self._parar.set()
+        self._thread.join()
+
+    def plegado(self) -> bytes:
+        """Formato "collapsed" (`raiz;...;hoja cantidad`) de flamegraph.pl, speedscope o inferno."""
+        return "".join(f"{pila} {cantidad}\n" for pila, cantidad in self.pilas.most_common()).encode()
+
+def _autorizado(scope) -> bool:
+    token = Headers(scope=scope).get(HEADER_TOKEN)
+    return token is not None and secrets.compare_digest(token, PERFILADO_TOKEN)
+
+def _nombre_archivo(scope) -> str:
+    ruta = re.sub(r"[^\w.-]+", "_", scope["path"]).strip("_") or "raiz"
+    return os.path.join(PERFILADO_DIR, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{scope['method']}-{ruta}-{os.getpid()}.folded")
+
+def _cabeceras_tiempos(medicion: MedicionPeticion, total: float) -> list:
+    server_timing = (
+        f'db;dur={medicion.tiempo_db * 1000:.1f};desc="{medicion.consultas} consultas", '
+        f"serializacion;dur={medicion.serializacion * 1000:.1f}, "
+        f"total;dur={total * 1000:.1f}"
+    )
+    return [
+        (b"server-timing", server_timing.encode()),
+        (b"x-db-queries", str(medicion.consultas).encode()),
+    ]
+
+class MiddlewarePerfilado:
+    """Tiempos y perfil de las peticiones que traen `X-Perfilado: <PERFILADO_TOKEN>`.
+
+    A esas respuestas les agrega `Server-Timing` (base, serialización y total
+    hasta que empieza la respuesta) y `X-DB-Queries`. Con `X-Perfilado-Modo`
+    además corre el `Muestreador` mientras dura la petición: en "respuesta"
+    el perfil plegado reemplaza al cuerpo (el estado original va en
+    `X-Estado-Original`) y en "disco" se guarda en PERFILADO_DIR (la ruta va en
+    `X-Perfil-Archivo`). Las demás peticiones pasan sin costo extra.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _autorizado(scope):
+            await self.app(scope, receive, send)
+            return
+
+        modo = Headers(scope=scope).get(HEADER_MODO)
+        modo = modo if modo in MODOS else None
+        archivo = _nombre_archivo(scope) if modo == "disco" else None
+        medicion = medicion_actual.get()
+        token = None
+        if medicion is None:
+            medicion = MedicionPeticion()
+            token = medicion_actual.set(medicion)
+        estado = {}
+        inicio = time.perf_counter()
+
+        async def enviar(mensaje):
+            if modo == "respuesta":
+                # El cuerpo original se descarta; solo interesa el estado
+                if mensaje["type"] == "http.response.start":
+                    estado["codigo"] = mensaje["status"]
+                return
+            if mensaje["type"] == "http.response.start":
+                cabeceras = [*mensaje.get("headers", []), *_cabeceras_tiempos(medicion, time.perf_counter() - inicio)]
+                if archivo:
+                    cabeceras.append((b"x-perfil-archivo", archivo.encode()))
+                mensaje = {**mensaje, "headers": cabeceras}
+            await send(mensaje)
+
+        muestreador = Muestreador(threading.get_ident(), PERFILADO_INTERVALO_MS / 1000) if modo else None
+        if muestreador:
+            muestreador.iniciar()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            if muestreador:
+                muestreador.detener()
+            if token is not None:
+                medicion_actual.reset(token)
+
+        if modo == "disco":
+            # Fuera del event loop: el worker sigue atendiendo mientras se escribe
+            await asyncio.to_thread(_guardar_perfil, archivo, muestreador)
+            logger.info(f"Perfil de {scope['method']} {scope['path']}: {muestreador.muestras} muestras en {archivo}")
+        elif modo == "respuesta":
+            cuerpo = muestreador.plegado()
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(cuerpo)).encode()),
+                    (b"x-estado-original", str(estado.get("codigo", 500)).encode()),
+                    (b"x-perfil-muestras", str(muestreador.muestras).encode()),
+                    *_cabeceras_tiempos(medicion, time.perf_counter() - inicio),
+                ],
+            })
+            await send({"type": "http.response.body", "body": cuerpo})
+
+def _guardar_perfil(archivo: str, muestreador: Muestreador):
+    os.makedirs(PERFILADO_DIR, exist_ok=True)
+    with open(archivo, "wb") as destino:
+        destino.write(muestreador.plegado())
+
+# Momento en que terminó el endpoint de la petición en curso; lista y no un
+# float porque los endpoints sync corren en otro thread con una copia del contexto
+_fin_endpoint: ContextVar[list | None] = ContextVar("fin_endpoint", default=None)
+
+def _marcar_fin(call):
+    """Envuelve el endpoint para anotar cuándo termina, sea async o sync."""
+    def marcar():
+        marca = _fin_endpoint.get()
+        if marca is not None:
+            marca[0] = time.perf_counter()
+
+    if inspect.iscoroutinefunction(call):
+        @wraps(call)
+        async def marcado(*args, **kwargs):
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                marcar()
+    else:
+        @wraps(call)
+        def marcado(*args, **kwargs):
+            try:
+                return call(*args, **kwargs)
+            finally:
+                marcar()
+    marcado.marca_fin = True
+    return marcado
+
+def _medible(endpoint) -> bool:
+    return (inspect.isfunction(endpoint) and not getattr(endpoint, "marca_fin", False)
+            and not inspect.isgeneratorfunction(endpoint) and not inspect.isasyncgenfunction(endpoint))
+
+class RutaPerfilada(APIRoute):
+    """APIRoute que mide la validación/serialización del `response_model`.
+
+    Anota cuándo termina el endpoint y, cuando FastAPI devuelve la respuesta
+    armada, suma lo que tardó desde ahí (validar, serializar y renderizar el
+    JSON) a la medición abierta, que `Server-Timing` informa como
+    "serializacion". Los routers la usan con `route_class=RutaPerfilada`; sin
+    PERFILADO_TOKEN es una APIRoute común, sin costo extra.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if PERFILADO_TOKEN and _medible(endpoint):
+            endpoint = _marcar_fin(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        if not getattr(self.endpoint, "marca_fin", False):
+            return handler
+
+        async def medido(request):
+            if medicion_actual.get() is None:
+                return await handler(request)
+            marca = [None]
+            token = _fin_endpoint.set(marca)
+            try:
+                respuesta = await handler(request)
+            finally:
+                _fin_endpoint.reset(token)
+            if marca[0] is not None:
+                registrar_serializacion(time.perf_counter() - marca[0])
+            return respuesta
+
+        return medido
+
+def instalar(app):
+    """Agrega el middleware de perfilado. Solo se llama con PERFILADO_TOKEN definido.
+
+    El tiempo de serialización lo miden las rutas (`RutaPerfilada`).
+    """
+    app.add_middleware(MiddlewarePerfilado)
+    logger.warning("Perfilado habilitado: las peticiones con el header X-Perfilado pueden leer tiempos y pilas")
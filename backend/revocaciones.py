@@ -0,0 +1,125 @@
+from abc import ABC, abstractmethod
+import glob
+import importlib
+import os
+import threading
+import time
+
+class AlmacenRevocaciones(ABC):
+    """Interfaz de la lista de tokens revocados.
+
+    Se revocan tokens sueltos (logout, por digest hasta su `exp`) o todos los
+    tokens de un usuario emitidos hasta cierto momento (desactivación).
+    `esta_revocado` se llama en cada petición autenticada y tiene que ser O(1).
+    """
+
+    @abstractmethod
+    def revocar_token(self, digest: str, expira: float):
+        ...
+
+    @abstractmethod
+    def revocar_usuario(self, user_id: int, hasta: float):
+        ...
+
+    @abstractmethod
+    def esta_revocado(self, digest: str, user_id: int, emitido: float) -> bool:
+        ...
+
+class RevocacionesEnMemoria(AlmacenRevocaciones):
+    """Implementación en memoria del proceso.
+
+    Solo ve las revocaciones hechas en el mismo worker y las pierde al
+    reiniciar: sirve con un solo proceso. servidor.py no arranca varios
+    workers con este backend.
+    """
+
+    def __init__(self):
+        self._tokens = {}
+        self._usuarios = {}
+        self._lock = threading.Lock()
+
+    def revocar_token(self, digest: str, expira: float):
+        with self._lock:
+            self._purgar()
+            self._tokens[digest] = expira
+
+    def revocar_usuario(self, user_id: int, hasta: float):
+        with self._lock:
+            self._usuarios[user_id] = max(hasta, self._usuarios.get(user_id, 0))
+
+    def esta_revocado(self, digest: str, user_id: int, emitido: float) -> bool:
+        if digest in self._tokens:
+            return True
+        hasta = self._usuarios.get(user_id)
+        return hasta is not None and emitido <= hasta
+
+    def _purgar(self):
+        # Un token vencido ya no pasa la validación: no hace falta recordarlo
+        ahora = time.time()
+        for digest in [d for d, expira in self._tokens.items() if expira <= ahora]:
+            del self._tokens[digest]
+
+class RevocacionesEnDisco(AlmacenRevocaciones):
+    """Un archivo por revocación en REVOCACIONES_DIR.
+
+    La ven al instante todos los workers de la máquina (los de servidor.py)
+    y sobrevive a los reinicios. `esta_revocado` cuesta uno o dos `stat`;
+    las escrituras reemplazan el archivo entero con `os.replace`, así que
+    nunca se lee uno a medio escribir.
+    """
+
+    def __init__(self, directorio: str | None = None):
+        self.directorio = directorio or os.getenv("REVOCACIONES_DIR", "revocaciones")
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _ruta(self, tipo: str, clave) -> str:
+        return os.path.join(self.directorio, f"{tipo}-{clave}")
+
+    def revocar_token(self, digest: str, expira: float):
+        self._purgar()
+        self._escribir(self._ruta("token", digest), expira)
+
+    def revocar_usuario(self, user_id: int, hasta: float):
+        ruta = self._ruta("usuario", user_id)
+        self._escribir(ruta, max(hasta, self._leer(ruta) or 0))
+
+    def esta_revocado(self, digest: str, user_id: int, emitido: float) -> bool:
+        if os.path.exists(self._ruta("token", digest)):
+            return True
+        hasta = self._leer(self._ruta("usuario", user_id))
+        return hasta is not None and emitido <= hasta
+
+    def _escribir(self, ruta: str, valor: float):
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "w") as archivo:
+            archivo.write(repr(valor))
+        os.replace(temporal, ruta)
+
+    def _leer(self, ruta: str) -> float | None:
+        try:
+            with open(ruta) as archivo:
+                return float(archivo.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _purgar(self):
+        ahora = time.time()
+        for ruta in glob.glob(self._ruta("token", "*")):
+            expira = self._leer(ruta)
+            if expira is not None and expira <= ahora:
+                try:
+                    os.remove(ruta)
+                except FileNotFoundError:
+                    pass  # lo borró otro worker
+
+def cargar_almacen() -> AlmacenRevocaciones:
+    """Instancia el backend de REVOCACIONES_BACKEND ("memoria", "disco" o "modulo:Clase")."""
+    backend = os.getenv("REVOCACIONES_BACKEND", "memoria")
+    if backend == "memoria":
+        return RevocacionesEnMemoria()
+    if backend == "disco":
+        return RevocacionesEnDisco()
+    modulo, clase = backend.split(":")
+    return getattr(importlib.import_module(modulo), clase)()
+
+revocaciones = cargar_almacen()
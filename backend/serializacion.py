@@ -0,0 +1,52 @@
+from fastapi import Response
+from sqlalchemy import select
+from .config import env_bool
+from .perfilado import registrar_serializacion
+import orjson
+import time
+
+# Camino rápido de los listados: SELECT de columnas + orjson, sin validar fila por fila
+LISTADOS_RAPIDOS = env_bool("LISTADOS_RAPIDOS", "false")
+
+def columnas(modelo, esquema) -> list:
+    """Columnas del `modelo` que forman el `esquema` de salida, en su orden."""
+    return [getattr(modelo, campo) for campo in esquema.model_fields]
+
+def seleccionar(modelo, esquema):
+    """SELECT para un listado del `modelo` con salida `esquema`.
+
+    Con LISTADOS_RAPIDOS trae solo las columnas del esquema como tuplas, sin
+    armar objetos del ORM ni pasar por el identity map; si no, la entidad
+    completa como siempre. Los `.where()` se aplican igual en los dos casos.
+    """
+    if not LISTADOS_RAPIDOS:
+        return select(modelo)
+    return select(*columnas(modelo, esquema))
+
+async def consultar(db, stmt) -> list:
+    """Ejecuta un SELECT armado con `seleccionar()`: tuplas o entidades según el modo."""
+    resultado = await db.execute(stmt)
+    return resultado.all() if LISTADOS_RAPIDOS else resultado.scalars().all()
+
+def como_dicts(filas, esquema) -> list:
+    """Pasa las filas de un listado a dicts serializables (para guardarlas en cache)."""
+    if LISTADOS_RAPIDOS:
+        return [fila._asdict() for fila in filas]
+    return [esquema.model_validate(fila).model_dump(mode="json") for fila in filas]
+
+def listado(filas, response):
+    """Respuesta de un listado.
+
+    Sin LISTADOS_RAPIDOS devuelve las filas tal cual y FastAPI las valida con
+    el `response_model`. Con LISTADOS_RAPIDOS las codifica directamente con
+    orjson: el JSON es el mismo porque las columnas son las del esquema, pero
+    se saltea la validación por ítem. Al devolver una Response propia hay que
+    copiar los headers ya puestos (ETag, cursor).
+    """
+    if not LISTADOS_RAPIDOS:
+        return filas
+    inicio = time.perf_counter()
+    contenido = [fila if isinstance(fila, dict) else fila._asdict() for fila in filas]
+    cuerpo = orjson.dumps(contenido)
+    registrar_serializacion(time.perf_counter() - inicio)
+    return Response(cuerpo, media_type="application/json", headers=dict(response.headers))
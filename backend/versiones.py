@@ -0,0 +1,64 @@
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import BigInteger, cast, func, select
+from backend.db import async_db_dependency
+from backend.modelos import VersionTablaDB
+from typing import Callable
+import hashlib
+
+async def obtener_version(db, tabla: str) -> int:
+    """Versión actual de la tabla; la incrementa un trigger en cada escritura.
+
+    El trigger incrementa una de varias ranuras (la de la conexión que
+    escribe) para que los escritores no se esperen entre sí; la suma solo
+    crece, y cada escritura confirmada la cambia.
+    """
+    version = await db.scalar(select(cast(func.sum(VersionTablaDB.version), BigInteger)).where(VersionTablaDB.tabla == tabla))
+    return version or 0
+
+async def obtener_versiones(db, tablas) -> dict:
+    """Versiones de varias tablas en una sola consulta."""
+    filas = await db.execute(
+        select(VersionTablaDB.tabla, cast(func.sum(VersionTablaDB.version), BigInteger))
+        .where(VersionTablaDB.tabla.in_(tablas))
+        .group_by(VersionTablaDB.tabla)
+    )
+    return dict(filas.all())
+
+def calcular_etag(tabla: str, version: int | str, request: Request, variante: str = "") -> str:
+    # La misma versión de la tabla da respuestas distintas según ruta y filtros
+    clave = f"{request.url.path}?{request.url.query}"
+    if variante:
+        clave += f"#{variante}"
+    representacion = hashlib.sha1(clave.encode()).hexdigest()[:16]
+    return f'"{tabla}-{version}-{representacion}"'
+
+def coincide(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidatos = [valor.strip().removeprefix("W/") for valor in if_none_match.split(",")]
+    return "*" in candidatos or etag in candidatos
+
+def condicional(*tablas: str, variante: Callable[[], str] | None = None):
+    """Dependencia para GETs: responde 304 si el cliente ya tiene la versión actual.
+
+    Corre antes del handler, así que con un 304 la consulta del listado no se ejecuta.
+    Si la respuesta lee de varias tablas se pasan todas y el ETag combina sus versiones.
+    `variante` devuelve algo más de lo que depende la respuesta y que no está
+    en la URL (por ejemplo la fecha de hoy); entra en el ETag y, con él, en la
+    clave del cache de respuestas.
+    """
+    async def verificar_etag(request: Request, response: Response, db: async_db_dependency):
+        if len(tablas) == 1:
+            version = await obtener_version(db, tablas[0])
+        else:
+            versiones = await obtener_versiones(db, tablas)
+            version = ".".join(str(versiones.get(tabla, 0)) for tabla in tablas)
+        etag = calcular_etag("+".join(tablas), version, request, variante() if variante else "")
+        # La usa también el cache de respuestas como clave
+        request.state.etag = etag
+        if coincide(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+
+    return Depends(verificar_etag)
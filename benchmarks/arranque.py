@@ -0,0 +1,99 @@
+"""
+Benchmark: tiempo de arranque en frío de un worker, por fase.
+
+Lanza `--repeticiones` procesos de Python nuevos, como haría uvicorn con
+cada worker, y en cada uno mide: importar `connections.main`, correr el
+lifespan (verificación de migraciones y preparación del frontend) y atender
+la primera petición (`/health/db`, que abre la primera conexión del pool).
+El total incluye además el arranque del intérprete. Con `--importtime`
+muestra los módulos que más tardan en importarse (`python -X importtime`).
+
+Uso (desde la raíz del proyecto, con la base configurada en .env):
+    pip install httpx
+    python -m benchmarks.arranque --repeticiones 10 --salida arranque.json
+    python -m benchmarks.arranque --importtime
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from benchmarks.comun import comparar, guardar, resumir
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HIJO = r"""
+import asyncio, json, time
+import httpx
+inicio = time.perf_counter()
+import connections.main as main
+importado = time.perf_counter()
+
+async def arrancar():
+    async with main.app.router.lifespan_context(main.app):
+        listo = time.perf_counter()
+        transporte = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://arranque") as cliente:
+            (await cliente.get("/health/db")).raise_for_status()
+        primera = time.perf_counter()
+        tiempos = {"importar": importado - inicio, "lifespan": listo - importado, "primera_peticion": primera - listo}
+        print(json.dumps(tiempos), flush=True)
+
+asyncio.run(arrancar())
+"""
+
+FASES = ["importar", "lifespan", "primera_peticion", "total"]
+
+def medir_proceso() -> dict:
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen([sys.executable, "-c", HIJO], cwd=RAIZ, text=True,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # El total corta cuando el hijo informa, no cuando termina de apagarse
+    linea = proceso.stdout.readline()
+    total = time.perf_counter() - inicio
+    _, errores = proceso.communicate()
+    if not linea:
+        raise SystemExit(f"El worker no arrancó:\n{errores}")
+    return {**json.loads(linea), "total": total}
+
+def modulos_lentos(cantidad: int):
+    salida = subprocess.run([sys.executable, "-X", "importtime", "-c", "import connections.main"],
+                            cwd=RAIZ, capture_output=True, text=True)
+    filas = []
+    for linea in salida.stderr.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        propio, acumulado, modulo = (parte.strip() for parte in linea[len("import time:"):].split("|"))
+        if propio.isdigit():
+            filas.append((int(propio), int(acumulado), modulo))
+    print(f"\n{'módulo':<50} {'propio ms':>10} {'acumulado ms':>13}")
+    for propio, acumulado, modulo in sorted(filas, reverse=True)[:cantidad]:
+        print(f"{modulo:<50} {propio / 1000:>10.1f} {acumulado / 1000:>13.1f}")
+
+def main(args):
+    medir_proceso()  # calentar la cache de disco y los .pyc
+    medidas = [medir_proceso() for _ in range(args.repeticiones)]
+
+    resultados = {}
+    print(f"{'fase':<18} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for fase in FASES:
+        resultados[fase] = resumir([medida[fase] for medida in medidas])
+        r = resultados[fase]
+        print(f"{fase:<18} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['max_ms']:>8.1f}")
+
+    if args.importtime:
+        modulos_lentos(args.importtime)
+    if args.salida:
+        guardar(args.salida, "arranque", {"repeticiones": args.repeticiones}, resultados)
+    if args.comparar:
+        comparar(args.comparar, resultados, metricas=("p50_ms", "p95_ms"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--importtime", type=int, nargs="?", const=20, default=0,
+                        help="mostrar los N módulos más lentos de importar (20 si no se indica)")
+    parser.add_argument("--salida", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior contra el cual comparar")
+    main(parser.parse_args())
@@ -0,0 +1,93 @@
+"""
+Driver de carga HTTP: throughput y p50/p95/p99 por router con N clientes concurrentes.
+
+Cada cliente elige peticiones al azar (con semilla) entre los GET de
+`benchmarks.comun.escenarios`, según su peso, durante `--duracion`
+segundos. Por defecto le pega a un servidor ya levantado en `--url` (con
+uvicorn y los workers que se quieran medir); con `--en-proceso` usa la
+aplicación importada, sin red. Los resultados se agrupan por router y se
+pueden guardar en JSON y comparar contra una corrida anterior.
+
+Uso (desde la raíz del proyecto, con la base configurada en .env):
+    pip install httpx
+    python -m benchmarks.datos --alumnos 100000
+    uvicorn connections.main:app --workers 4 &
+    python -m benchmarks.carga --clientes 100 --duracion 30 --salida carga.json
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+import httpx
+from backend.db import async_engine
+from benchmarks.comun import comparar, elegir_ids, escenarios, guardar, resumir
+
+async def correr(cliente, mezcla: list, clientes: int, duracion: float, semilla: int) -> tuple[dict, dict, float]:
+    latencias = defaultdict(list)
+    errores = defaultdict(int)
+    pesos = [peso for *_, peso in mezcla]
+    fin = time.perf_counter() + duracion
+
+    async def trabajador(numero: int):
+        azar = random.Random(semilla + numero)
+        while time.perf_counter() < fin:
+            router, _, ruta, _ = azar.choices(mezcla, weights=pesos)[0]
+            inicio = time.perf_counter()
+            try:
+                respuesta = await cliente.get(ruta)
+                ok = respuesta.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencias[router].append(time.perf_counter() - inicio)
+            else:
+                errores[router] += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador(numero) for numero in range(clientes)))
+    return latencias, errores, time.perf_counter() - inicio
+
+async def main(args):
+    mezcla = escenarios(await elegir_ids())
+    await async_engine.dispose()  # los ids ya están; el resto va por HTTP
+
+    if args.en_proceso:
+        from connections.main import app
+        cliente = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+    else:
+        limites = httpx.Limits(max_connections=args.clientes, max_keepalive_connections=args.clientes)
+        cliente = httpx.AsyncClient(base_url=args.url, timeout=60, limits=limites)
+
+    async with cliente:
+        await correr(cliente, mezcla, args.clientes, min(args.duracion, 3), args.semilla)  # calentar
+        latencias, errores, duracion = await correr(cliente, mezcla, args.clientes, args.duracion, args.semilla)
+
+    resultados = {}
+    print(f"{'router':<12} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errores':>8}")
+    todas = [latencia for valores in latencias.values() for latencia in valores]
+    for router in sorted(set(latencias) | set(errores)) + ["total"]:
+        valores = todas if router == "total" else latencias[router]
+        fallidas = sum(errores.values()) if router == "total" else errores[router]
+        resultados[router] = {**resumir(valores, duracion), "errores": fallidas}
+        r = resultados[router]
+        print(f"{router:<12} {r.get('req_s', 0):>9.1f} {r.get('p50_ms', 0):>8.1f} "
+              f"{r.get('p95_ms', 0):>8.1f} {r.get('p99_ms', 0):>8.1f} {fallidas:>8}")
+
+    parametros = {"url": None if args.en_proceso else args.url, "clientes": args.clientes,
+                  "duracion": args.duracion, "semilla": args.semilla}
+    if args.salida:
+        guardar(args.salida, "carga", parametros, resultados)
+    if args.comparar:
+        comparar(args.comparar, resultados)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--en-proceso", action="store_true", help="usar la app importada en lugar de --url")
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--duracion", type=float, default=30, help="segundos de medición")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior contra el cual comparar")
+    asyncio.run(main(parser.parse_args()))
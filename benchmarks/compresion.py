@@ -0,0 +1,63 @@
+"""
+Benchmark: bytes en la red y CPU de comprimir cada listado de la API.
+
+Pide a la aplicación (en proceso, sin red) una página de cada listado tal
+como la arma el endpoint y mide, para cada codificación disponible y cada
+perfil de `PERFILES`, el tamaño comprimido, la relación contra el JSON
+plano y el tiempo de CPU por respuesta: lo mismo que hace
+`MiddlewareCompresion` en cada petición. Al final hace una petición real con
+`Accept-Encoding` para comprobar que el middleware comprime.
+
+Uso (desde la raíz del proyecto, con la base configurada en .env y datos cargados):
+    pip install httpx brotli zstandard
+    python -m benchmarks.compresion --limit 1000
+"""
+import argparse
+import asyncio
+import sys
+import time
+import httpx
+from backend.compresion import CODIFICACIONES_DINAMICAS, PERFILES, comprimir
+from backend.db import async_engine
+from connections.main import app
+
+LISTADOS = ["/alumnos/", "/materias/", "/profesores/", "/materiales/", "/tareas/"]
+
+def cpu_ms(datos: bytes, codificacion: str, nivel: int, repeticiones: int) -> tuple[int, float]:
+    inicio = time.process_time()
+    for _ in range(repeticiones):
+        comprimido = comprimir(datos, codificacion, nivel)
+    return len(comprimido), (time.process_time() - inicio) / repeticiones * 1000
+
+async def main(limit: int, repeticiones: int) -> int:
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        cuerpos = {}
+        for ruta in LISTADOS:
+            respuesta = await cliente.get(ruta, params={"limit": limit}, headers={"Accept-Encoding": "identity"})
+            respuesta.raise_for_status()
+            cuerpos[ruta] = (respuesta.content, len(respuesta.json()))
+
+        print(f"{'listado':<14} {'filas':>5} {'plano':>9}  {'cod.':<5} {'perfil':<7} {'bytes':>9} {'relación':>8} {'CPU ms':>8}")
+        for ruta, (cuerpo, filas) in cuerpos.items():
+            for codificacion in CODIFICACIONES_DINAMICAS:
+                for perfil, niveles in PERFILES.items():
+                    tamanio, ms = cpu_ms(cuerpo, codificacion, niveles[codificacion], repeticiones)
+                    print(f"{ruta:<14} {filas:>5} {len(cuerpo):>9}  {codificacion:<5} {perfil:<7} "
+                          f"{tamanio:>9} {len(cuerpo) / tamanio:>7.1f}x {ms:>8.2f}")
+
+        # El camino completo: el middleware tiene que comprimir el listado más grande
+        ruta = max(cuerpos, key=lambda r: len(cuerpos[r][0]))
+        respuesta = await cliente.get(ruta, params={"limit": limit}, headers={"Accept-Encoding": "gzip"})
+        comprimida = respuesta.headers.get("content-encoding") == "gzip"
+        print(f"\nGET {ruta} con Accept-Encoding: gzip -> "
+              f"{respuesta.headers.get('content-encoding', 'sin comprimir')}, {respuesta.headers.get('content-length')} bytes")
+    await async_engine.dispose()
+    return 0 if comprimida or len(cuerpos[ruta][0]) < 1024 else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=1000, help="filas por listado (máximo 1000)")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.limit, args.repeticiones)))
@@ -0,0 +1,107 @@
+"""Utilidades compartidas por los benchmarks: endpoints a medir, percentiles y resultados en JSON."""
+import json
+import platform
+import subprocess
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import func, select
+from backend.db import AsyncSessionLocal
+from backend.modelos import AlumnoDB, MateriaDB, MaterialDB, ProfesorDB, TareaDB, materia_alumno
+
+async def elegir_ids() -> dict:
+    """Ids con datos para los endpoints de detalle: lo último cargado y la materia con más inscriptos."""
+    async with AsyncSessionLocal() as db:
+        ids = {
+            "alumno": await db.scalar(select(func.max(AlumnoDB.id))),
+            "profesor": await db.scalar(select(func.max(ProfesorDB.id))),
+            "material": await db.scalar(select(func.max(MaterialDB.id))),
+            "tarea": await db.scalar(select(func.max(TareaDB.id))),
+            "materia": await db.scalar(
+                select(materia_alumno.c.materia_id)
+                .group_by(materia_alumno.c.materia_id)
+                .order_by(func.count().desc())
+                .limit(1)
+            ) or await db.scalar(select(func.max(MateriaDB.id))),
+        }
+    faltan = [tabla for tabla, valor in ids.items() if valor is None]
+    if faltan:
+        raise SystemExit(f"No hay datos en: {', '.join(faltan)} (cargar con python -m benchmarks.datos)")
+    return ids
+
+def escenarios(ids: dict) -> list:
+    """(router, nombre, ruta, peso): los GET que se miden; el peso lo usa benchmarks.carga."""
+    hoy = date.today()
+    return [
+        ("alumnos", "listado", "/alumnos/?limit=100", 10),
+        ("alumnos", "listado filtrado", "/alumnos/?cohorte=2020&al_dia=true&limit=100", 5),
+        ("alumnos", "detalle", f"/alumnos/{ids['alumno']}", 10),
+        ("materias", "listado", "/materias/?limit=100", 8),
+        ("materias", "detalle", f"/materias/{ids['materia']}", 8),
+        ("materias", "completa", f"/materias/{ids['materia']}/completa", 5),
+        ("materias", "inscriptos", f"/materias/{ids['materia']}/alumnos?limit=100", 5),
+        ("profesores", "listado", "/profesores/?limit=100", 5),
+        ("profesores", "detalle", f"/profesores/{ids['profesor']}", 5),
+        ("materiales", "listado por materia", f"/materiales/?materia_id={ids['materia']}&limit=100", 5),
+        ("materiales", "detalle", f"/materiales/{ids['material']}", 5),
+        ("tareas", "listado", "/tareas/?limit=100", 5),
+        ("tareas", "detalle", f"/tareas/{ids['tarea']}", 5),
+        ("tareas", "vencimientos", f"/tareas/vencimientos?desde={hoy}&hasta={hoy + timedelta(days=14)}", 5),
+        ("tareas", "próximas por materia", f"/tareas/materia/{ids['materia']}/proximas?dias=30", 5),
+        ("dashboard", "resumen", "/dashboard/resumen", 3),
+        ("buscar", "búsqueda", "/buscar/?q=gonz", 3),
+        ("health", "db", "/health/db", 1),
+    ]
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+def resumir(latencias: list, duracion: float | None = None) -> dict:
+    """Cantidad, percentiles (ms) y, si se da la duración, peticiones por segundo."""
+    if not latencias:
+        return {"peticiones": 0}
+    resumen = {
+        "peticiones": len(latencias),
+        "p50_ms": round(percentil(latencias, 50) * 1000, 3),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 3),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 3),
+        "max_ms": round(max(latencias) * 1000, 3),
+    }
+    if duracion:
+        resumen["req_s"] = round(len(latencias) / duracion, 1)
+    return resumen
+
+def commit_actual() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def guardar(ruta: str, benchmark: str, parametros: dict, resultados: dict):
+    """Escribe los resultados con lo necesario para comparar corridas (commit, fecha, parámetros)."""
+    datos = {
+        "benchmark": benchmark,
+        "commit": commit_actual(),
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "parametros": parametros,
+        "resultados": resultados,
+    }
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(datos, archivo, indent=2, ensure_ascii=False)
+    print(f"Resultados en {ruta}")
+
+def comparar(ruta_anterior: str, resultados: dict, metricas=("p50_ms", "p95_ms", "req_s")):
+    """Imprime la variación de cada métrica contra una corrida guardada con `guardar`."""
+    with open(ruta_anterior, encoding="utf-8") as archivo:
+        anterior = json.load(archivo)
+    print(f"\nContra {ruta_anterior} (commit {anterior.get('commit')}, {anterior.get('fecha')}):")
+    for nombre, actual in resultados.items():
+        previo = anterior["resultados"].get(nombre)
+        if not previo:
+            continue
+        cambios = []
+        for metrica in metricas:
+            if metrica in actual and previo.get(metrica):
+                cambios.append(f"{metrica} {(actual[metrica] - previo[metrica]) / previo[metrica] * 100:+.1f}%")
+        if cambios:
+            print(f"  {nombre:<40} {'  '.join(cambios)}")
@@ -0,0 +1,179 @@
+"""
+Generador de datos sintéticos para benchmarks: llena todas las tablas de backend/modelos.py.
+
+Con `--alumnos N` inserta N alumnos y, en proporción, usuarios, profesores,
+materias (con correlativas), tareas, materiales y las dos tablas de
+asociación (~3 inscripciones por alumno y 2 profesores por materia). Todo
+se genera del lado de la base con generate_series, así que 1M de alumnos
+tarda segundos y no pasa por Python. Con la misma `--semilla` los datos
+salen iguales. Las filas generadas llevan el prefijo `bench-` (o el de
+`--prefijo`) y `--limpiar` las borra. Los usuarios tienen la contraseña `bench-password`.
+
+Uso (desde la raíz del proyecto, con la base migrada a head):
+    python -m benchmarks.datos --alumnos 100000
+    python -m benchmarks.datos --limpiar
+"""
+import argparse
+import time
+from sqlalchemy import text
+from backend.auth import bcrypt_context
+from backend.db import engine
+
+PASSWORD = "bench-password"
+
+NOMBRES = ["Ana", "Juan", "María", "Pedro", "Lucía", "Martín", "Sofía", "Diego", "Valentina", "Tomás",
+           "Camila", "Nicolás", "Julieta", "Matías", "Florencia", "Facundo"]
+APELLIDOS = ["González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez",
+             "García", "Sánchez", "Romero", "Sosa", "Álvarez", "Torres", "Ruiz", "Ramírez"]
+
+def proporciones(alumnos: int) -> dict:
+    return {
+        "alumnos": alumnos,
+        "materias": max(alumnos // 100, 10),
+        "profesores": max(alumnos // 20, 10),
+        "tareas": alumnos,
+        "materiales": alumnos // 2,
+    }
+
+def _ultimo_id(conn, tabla: str) -> int:
+    return conn.scalar(text(f"SELECT coalesce(max(id), 0) FROM {tabla}"))
+
+def _primer_id_nuevo(conn, tabla: str, ultimo: int) -> int:
+    # Los ids de un mismo INSERT son consecutivos, pero la secuencia puede
+    # haber saltado (transacciones descartadas): se busca dónde arrancaron
+    return conn.scalar(text(f"SELECT min(id) FROM {tabla} WHERE id > :ultimo"), {"ultimo": ultimo})
+
+def sembrar(conn, alumnos: int, semilla: float = 0.42, prefijo: str = "bench") -> dict:
+    """Inserta el dataset en la transacción de `conn` (no hace commit).
+
+    Devuelve los ids mínimos de lo insertado ("materia", "profesor",
+    "alumno", "usuario") y la cantidad de filas por tabla.
+    """
+    parametros = {**proporciones(alumnos), "nombres": NOMBRES, "apellidos": APELLIDOS,
+                  "hash": bcrypt_context.hash(PASSWORD), "prefijo": prefijo}
+    conn.execute(text("SELECT setseed(:semilla)"), {"semilla": semilla})
+    base = {tabla: _ultimo_id(conn, tabla) for tabla in ("usuarios", "materias", "profesores", "alumnos")}
+
+    conn.execute(text("""
+        INSERT INTO usuarios (username, email, hashed_password, rol, estado, is_active, is_superuser)
+        SELECT :prefijo || '-' || g, :prefijo || '-' || g || '@bench.local', :hash, 'profesor', 'activo', true, false
+        FROM generate_series(1, :profesores) g
+    """), parametros)
+    conn.execute(text("""
+        INSERT INTO materias (nombre, codigo, anio_perteneciente, cant_dias, descripcion, creditos, duracion,
+                              modalidad, horario, estado, carga_horaria)
+        SELECT 'Materia ' || g, upper(:prefijo) || '-' || g, 1 + g % 5, 1 + g % 3,
+               'Contenidos y bibliografía de la materia ' || g, 4 + g % 6, 16,
+               (ARRAY['presencial', 'virtual', 'híbrida'])[1 + g % 3],
+               (ARRAY['lunes', 'martes', 'miércoles', 'jueves', 'viernes'])[1 + g % 5] || ' 18 a 22',
+               (ARRAY['activa', 'inactiva'])[1 + g % 2], 64 + 32 * (g % 3)
+        FROM generate_series(1, :materias) g
+    """), parametros)
+    parametros["m0"] = _primer_id_nuevo(conn, "materias", base["materias"])
+    # Correlativas: la materia de un año depende de una del año anterior
+    conn.execute(text("""
+        UPDATE materias SET materia_previa_id = id - 1
+        WHERE id > :m0 AND anio_perteneciente > 1 AND codigo LIKE upper(:prefijo) || '-%'
+    """), parametros)
+    conn.execute(text("""
+        INSERT INTO profesores (documento, nro_doc, nombre, apellido, legajo, titulo_universitario, especialidad,
+                                fecha_alta, mail, telefono, estado, mat_asignadas, usuario_id)
+        SELECT 'DNI', :prefijo || '-' || g, (:nombres)[1 + g % 16], (:apellidos)[1 + (g / 16) % 16] || ' ' || g,
+               legajos.base + g, 'Licenciatura', 'Especialidad ' || g % 40, date '2000-01-01' + g % 8000,
+               :prefijo || '-profesor-' || g || '@bench.local', '11-4000-' || lpad((g % 10000)::text, 4, '0'),
+               (ARRAY['activo', 'licencia'])[1 + g % 2], 2, u.id
+        FROM generate_series(1, :profesores) g
+        JOIN usuarios u ON u.username = :prefijo || '-' || g
+        -- Legajos a continuación de los existentes: son únicos aunque ya haya otro dataset cargado
+        CROSS JOIN (SELECT greatest(max(legajo), 900000000) AS base FROM profesores) legajos
+    """), parametros)
+    parametros["p0"] = _primer_id_nuevo(conn, "profesores", base["profesores"])
+    conn.execute(text("""
+        INSERT INTO alumnos (documento, nro_doc, nombre, apellido, nacimiento, mail, telefono, direccion,
+                             cohorte, estado, al_dia, carrera_id)
+        SELECT 'DNI', :prefijo || '-' || g, (:nombres)[1 + floor(random() * 16)::int],
+               (:apellidos)[1 + floor(random() * 16)::int] || ' ' || g, date '1990-01-01' + g % 9000,
+               :prefijo || '-' || g || '@bench.local', '11-5000-' || lpad((g % 10000)::text, 4, '0'),
+               'Calle ' || (1 + g % 300) || ' ' || (100 + g % 4000),
+               (2010 + g % 15)::text, (ARRAY['activo', 'inactivo', 'egresado'])[1 + g % 3],
+               random() > 0.2, g % 20
+        FROM generate_series(1, :alumnos) g
+    """), parametros)
+    conn.execute(text("""
+        INSERT INTO tareas (titulo, descripcion, fecha_entrega, fecha_publicacion, materia_id, profesor_id,
+                            tipo, puntaje, estado)
+        SELECT initcap(:prefijo) || ' tarea ' || g, 'Resolver los ejercicios ' || (1 + g % 12) || ' de la guía',
+               current_date - 365 + g % 730, current_date - 379 + g % 730,
+               :m0 + floor(random() * :materias)::int, :p0 + floor(random() * :profesores)::int,
+               (ARRAY['tp', 'parcial', 'final'])[1 + g % 3], 1 + g % 10, (ARRAY['pendiente', 'entregada'])[1 + g % 2]
+        FROM generate_series(1, :tareas) g
+    """), parametros)
+    conn.execute(text("""
+        INSERT INTO materiales (titulo, descripcion, tipo, archivo, fecha_subida, profesor_id, materia_id, tamanio, estado)
+        SELECT initcap(:prefijo) || ' material ' || g, 'Apunte de la unidad ' || (1 + g % 8),
+               (ARRAY['pdf', 'video', 'link'])[1 + g % 3], 'https://bench.local/material/' || g,
+               date '2024-01-01' + g % 730, :p0 + floor(random() * :profesores)::int,
+               :m0 + floor(random() * :materias)::int, floor(random() * 5000000)::int, 'publicado'
+        FROM generate_series(1, :materiales) g
+    """), parametros)
+    conn.execute(text("""
+        INSERT INTO materia_alumno (materia_id, alumno_id)
+        SELECT :m0 + floor(random() * :materias)::int, a.id
+        FROM alumnos a CROSS JOIN generate_series(1, 3) k
+        WHERE a.id > :a0
+        ON CONFLICT DO NOTHING
+    """), {**parametros, "a0": base["alumnos"]})
+    conn.execute(text("""
+        INSERT INTO materia_profesor (materia_id, profesor_id)
+        SELECT m.id, :p0 + floor(random() * :profesores)::int
+        FROM materias m CROSS JOIN generate_series(1, 2) k
+        WHERE m.id >= :m0
+        ON CONFLICT DO NOTHING
+    """), parametros)
+    conn.execute(text("ANALYZE"))
+
+    return {
+        "materia": parametros["m0"],
+        "profesor": parametros["p0"],
+        "alumno": _primer_id_nuevo(conn, "alumnos", base["alumnos"]),
+        "usuario": _primer_id_nuevo(conn, "usuarios", base["usuarios"]),
+        "filas": proporciones(alumnos),
+    }
+
+def limpiar(conn, prefijo: str = "bench"):
+    """Borra todo lo generado por `sembrar` con ese prefijo."""
+    sentencias = [
+        """DELETE FROM materia_alumno
+           WHERE alumno_id IN (SELECT id FROM alumnos WHERE nro_doc LIKE :prefijo || '-%')
+              OR materia_id IN (SELECT id FROM materias WHERE codigo LIKE upper(:prefijo) || '-%')""",
+        "DELETE FROM materia_profesor WHERE materia_id IN (SELECT id FROM materias WHERE codigo LIKE upper(:prefijo) || '-%')",
+        "DELETE FROM tareas WHERE titulo LIKE initcap(:prefijo) || ' tarea %'",
+        "DELETE FROM materiales WHERE titulo LIKE initcap(:prefijo) || ' material %'",
+        "DELETE FROM alumnos WHERE nro_doc LIKE :prefijo || '-%'",
+        "DELETE FROM profesores WHERE nro_doc LIKE :prefijo || '-%'",
+        "UPDATE materias SET materia_previa_id = NULL WHERE codigo LIKE upper(:prefijo) || '-%'",
+        "DELETE FROM materias WHERE codigo LIKE upper(:prefijo) || '-%'",
+        "DELETE FROM usuarios WHERE username LIKE :prefijo || '-%' AND email LIKE '%@bench.local'",
+    ]
+    for sentencia in sentencias:
+        conn.execute(text(sentencia), {"prefijo": prefijo})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--alumnos", type=int, default=100_000, help="escala del dataset (hasta 1.000.000)")
+    parser.add_argument("--semilla", type=float, default=0.42, help="semilla de random() entre -1 y 1")
+    parser.add_argument("--prefijo", default="bench", help="marca de las filas generadas")
+    parser.add_argument("--limpiar", action="store_true", help="borrar los datos generados y salir")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    with engine.begin() as conn:
+        if args.limpiar:
+            limpiar(conn, args.prefijo)
+            print("Datos de benchmark borrados")
+        elif conn.scalar(text("SELECT 1 FROM usuarios WHERE username = :prefijo || '-1'"), {"prefijo": args.prefijo}):
+            raise SystemExit(f"Ya hay datos con el prefijo '{args.prefijo}': borrarlos con --limpiar o usar otro --prefijo")
+        else:
+            resultado = sembrar(conn, args.alumnos, args.semilla, args.prefijo)
+            print(", ".join(f"{cantidad} {tabla}" for tabla, cantidad in resultado["filas"].items()))
+    print(f"{time.perf_counter() - inicio:.1f} s")
@@ -0,0 +1,73 @@
+"""
+Micro-benchmarks por endpoint: latencia, consultas SQL y bytes de cada GET de la API.
+
+Usa la aplicación en proceso (sin red ni servidor) y pide cada endpoint de
+`escenarios()` de a uno, `--repeticiones` veces después de calentar. Para
+cada uno informa p50/p95/p99, cuántas consultas llegaron a la base por
+petición y el tamaño de la respuesta. Los ids salen del dataset cargado
+(conviene generarlo antes con benchmarks.datos).
+
+Uso (desde la raíz del proyecto, con la base configurada en .env):
+    pip install httpx
+    python -m benchmarks.datos --alumnos 100000
+    python -m benchmarks.endpoints --salida endpoints.json
+    python -m benchmarks.endpoints --comparar endpoints.json   # después de un cambio
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from sqlalchemy import event
+from backend.db import async_engine
+from benchmarks.comun import comparar, elegir_ids, escenarios, guardar, resumir
+from connections.main import app
+
+async def medir(cliente, ruta: str, repeticiones: int, consultas: list) -> dict:
+    latencias, cantidad, tamanio = [], 0, 0
+    for _ in range(repeticiones):
+        consultas.clear()
+        inicio = time.perf_counter()
+        respuesta = await cliente.get(ruta)
+        latencias.append(time.perf_counter() - inicio)
+        respuesta.raise_for_status()
+        cantidad += len(consultas)
+        tamanio = len(respuesta.content)
+    return {**resumir(latencias), "consultas": round(cantidad / repeticiones, 2), "bytes": tamanio}
+
+async def main(repeticiones: int, salida: str | None, anterior: str | None):
+    ids = await elegir_ids()
+    consultas = []
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", contar)
+
+    resultados = {}
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=60) as cliente:
+        print(f"{'endpoint':<34} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'consultas':>9} {'bytes':>9}")
+        for router, nombre, ruta, _ in escenarios(ids):
+            for _ in range(3):  # calentar pools y caches
+                await cliente.get(ruta)
+            try:
+                resultado = await medir(cliente, ruta, repeticiones, consultas)
+            except httpx.HTTPStatusError as e:
+                print(f"{router + ' ' + nombre:<34} error {e.response.status_code}")
+                continue
+            resultados[f"{router} {nombre}"] = {"ruta": ruta, **resultado}
+            print(f"{router + ' ' + nombre:<34} {resultado['p50_ms']:>8.2f} {resultado['p95_ms']:>8.2f} "
+                  f"{resultado['p99_ms']:>8.2f} {resultado['consultas']:>9} {resultado['bytes']:>9}")
+
+    event.remove(async_engine.sync_engine, "before_cursor_execute", contar)
+    await async_engine.dispose()
+    if salida:
+        guardar(salida, "endpoints", {"repeticiones": repeticiones, "ids": ids}, resultados)
+    if anterior:
+        comparar(anterior, resultados, metricas=("p50_ms", "p95_ms", "consultas"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--salida", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior contra el cual comparar")
+    args = parser.parse_args()
+    asyncio.run(main(args.repeticiones, args.salida, args.comparar))
@@ -0,0 +1,74 @@
+"""
+Benchmark: latencia de GET /health mientras corre una tormenta de logins.
+
+Mide p50/p99 de /health sin carga y luego con N clientes haciendo
+POST /auth/token en paralelo. Con bcrypt fuera del event loop la latencia
+de /health tiene que quedar prácticamente igual.
+
+Uso (desde la raíz del proyecto, con la base configurada en .env):
+    pip install httpx
+    python -m benchmarks.login_storm --logins 20 --duracion 10
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from connections.main import app
+
+USUARIO = {"username": "bench", "email": "bench@classroom.local", "password": "bench-password"}
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+async def sondear_health(cliente, duracion: float) -> list:
+    latencias = []
+    fin = time.perf_counter() + duracion
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        (await cliente.get("/health")).raise_for_status()
+        latencias.append(time.perf_counter() - inicio)
+        await asyncio.sleep(0.01)
+    return latencias
+
+async def tormenta(cliente, logins: int, duracion: float) -> int:
+    total = 0
+    fin = time.perf_counter() + duracion
+
+    async def loguear():
+        nonlocal total
+        while time.perf_counter() < fin:
+            respuesta = await cliente.post("/auth/token", data={
+                "username": USUARIO["email"],
+                "password": USUARIO["password"],
+            })
+            respuesta.raise_for_status()
+            total += 1
+
+    await asyncio.gather(*(loguear() for _ in range(logins)))
+    return total
+
+def imprimir(titulo: str, latencias: list):
+    print(f"{titulo:<16} /health p50 {percentil(latencias, 50) * 1000:>7.2f} ms  "
+          f"p99 {percentil(latencias, 99) * 1000:>7.2f} ms  ({len(latencias)} muestras)")
+
+async def main(logins: int, duracion: float):
+    transporte = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=60) as cliente:
+        # Crear el usuario de prueba (si ya existe, falla la restricción única y se ignora)
+        await cliente.post("/auth/", json=USUARIO)
+
+        imprimir("sin carga", await sondear_health(cliente, duracion))
+        latencias, total = await asyncio.gather(
+            sondear_health(cliente, duracion),
+            tormenta(cliente, logins, duracion),
+        )
+        imprimir(f"{logins} logins", latencias)
+        print(f"logins completados: {total} ({total / duracion:.1f}/s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=20, help="clientes haciendo login en paralelo")
+    parser.add_argument("--duracion", type=float, default=10, help="segundos por medición")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.duracion))
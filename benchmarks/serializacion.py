@@ -0,0 +1,85 @@
+"""
+Benchmark: serialización de un listado con response_model contra el camino rápido (orjson).
+
+Arma en memoria N alumnos y mide lo que hace FastAPI después del handler:
+- response_model: validar cada objeto del ORM contra `AlumnoOut` con
+  from_attributes, volcarlo a tipos JSON y codificar con JSONResponse.
+- rápido: las tuplas de un SELECT de columnas pasadas a dict y codificadas
+  con orjson (lo que hace `listado()` con LISTADOS_RAPIDOS=true).
+
+No toca la base: la diferencia de traer tuplas en lugar de entidades del ORM
+se suma a lo que se mide acá.
+
+Uso (desde la raíz del proyecto):
+    pip install orjson
+    python -m benchmarks.serializacion --filas 10000 100000
+"""
+import argparse
+import time
+import orjson
+from collections import namedtuple
+from datetime import date
+from typing import List
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from backend.modelos import AlumnoDB
+from connections.alumnos import AlumnoOut
+
+CAMPOS = list(AlumnoOut.model_fields)
+Fila = namedtuple("Fila", CAMPOS)
+ADAPTADOR = TypeAdapter(List[AlumnoOut])
+
+def generar(n: int) -> list:
+    return [
+        {
+            "id": i,
+            "documento": "DNI",
+            "nro_doc": str(30000000 + i),
+            "nombre": f"Nombre{i}",
+            "apellido": f"Apellido{i}",
+            "nacimiento": date(2000, 1, 1),
+            "mail": f"alumno{i}@classroom.local",
+            "telefono": "11-5555-0000",
+            "direccion": f"Calle {i}",
+            "cohorte": "2024",
+            "estado": "activo",
+            "al_dia": i % 7 != 0,
+            "carrera_id": i % 10 or None,
+        }
+        for i in range(1, n + 1)
+    ]
+
+def con_response_model(entidades: list) -> bytes:
+    validados = ADAPTADOR.validate_python(entidades, from_attributes=True)
+    return JSONResponse(ADAPTADOR.dump_python(validados, mode="json")).body
+
+def rapido(filas: list) -> bytes:
+    return orjson.dumps([fila._asdict() for fila in filas])
+
+def medir(funcion, datos, repeticiones: int) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(datos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+def main(tamanios: list, repeticiones: int):
+    for n in tamanios:
+        datos = generar(n)
+        entidades = [AlumnoDB(**d) for d in datos]
+        filas = [Fila(**d) for d in datos]
+        # Los dos caminos tienen que producir exactamente el mismo JSON
+        assert con_response_model(entidades[:100]) == rapido(filas[:100])
+
+        lento = medir(con_response_model, entidades, repeticiones)
+        veloz = medir(rapido, filas, repeticiones)
+        print(f"{n:>7} filas  response_model {lento * 1000:>8.1f} ms  "
+              f"rápido {veloz * 1000:>7.1f} ms  x{lento / veloz:.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+    main(args.filas, args.repeticiones)
@@ -0,0 +1,76 @@
+"""
+Benchmark: sesión sincrónica (psycopg2 + thread pool) contra AsyncSession (asyncpg).
+
+Levanta en proceso una app mínima con la misma consulta que la primera página
+de GET /alumnos/ en dos variantes y la golpea con N clientes concurrentes.
+
+Uso (desde la raíz del proyecto, con la base configurada en .env):
+    pip install httpx
+    python -m benchmarks.sync_vs_async --clientes 200 --peticiones 5000
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from fastapi import FastAPI, Response
+from sqlalchemy import select
+from backend.db import db_dependency, async_db_dependency, async_engine
+from backend.modelos import AlumnoDB
+from backend.paginacion import Paginacion, paginar
+
+app = FastAPI()
+PAGINA = Paginacion(limit=50, after=None)
+
+@app.get("/sync")
+def listar_sync(db: db_dependency):
+    alumnos = db.query(AlumnoDB).order_by(AlumnoDB.id).limit(PAGINA.limit).all()
+    return [alumno.id for alumno in alumnos]
+
+@app.get("/async")
+async def listar_async(db: async_db_dependency, response: Response):
+    alumnos = await paginar(db, select(AlumnoDB), AlumnoDB.id, PAGINA, response)
+    return [alumno.id for alumno in alumnos]
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+async def medir(cliente, ruta: str, clientes: int, peticiones: int) -> dict:
+    latencias = []
+    restantes = peticiones
+
+    async def trabajador():
+        nonlocal restantes
+        while restantes > 0:
+            restantes -= 1
+            inicio = time.perf_counter()
+            respuesta = await cliente.get(ruta)
+            respuesta.raise_for_status()
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(clientes)))
+    duracion = time.perf_counter() - inicio
+    return {
+        "ruta": ruta,
+        "req_s": len(latencias) / duracion,
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+    }
+
+async def main(clientes: int, peticiones: int):
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=60) as cliente:
+        for ruta in ("/sync", "/async"):
+            await medir(cliente, ruta, clientes, clientes)  # calentar pools
+            resultado = await medir(cliente, ruta, clientes, peticiones)
+            print(f"{resultado['ruta']:<8} {resultado['req_s']:>9.1f} req/s  "
+                  f"p50 {resultado['p50_ms']:>7.1f} ms  p99 {resultado['p99_ms']:>7.1f} ms")
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=200)
+    parser.add_argument("--peticiones", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.clientes, args.peticiones))
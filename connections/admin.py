@@ -0,0 +1,76 @@
+from fastapi import APIRouter, HTTPException, Depends
+from backend.auth import get_current_user, cache_tokens
+from backend.cache import cache_respuestas
+from backend.revocaciones import revocaciones
+from backend.db import async_db_dependency
+from backend.perfilado import RutaPerfilada
+from backend.modelos import UsuarioDB
+from backend import consultas
+from pydantic import BaseModel, Field
+from typing import Annotated
+import logging
+import os
+import time
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+user_dependency = Annotated[dict, Depends(get_current_user)]
+
+async def requerir_admin(user: user_dependency, db: async_db_dependency):
+    usuario = await db.get(UsuarioDB, user['id'])
+    if not usuario or not usuario.is_superuser:
+        raise HTTPException(status_code=403, detail="Se requieren permisos de administrador")
+    return user
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(requerir_admin)], route_class=RutaPerfilada)
+
+# Esquemas Pydantic
+class ConfigConsultasUpdate(BaseModel):
+    activo: bool | None = None
+    umbral_ms: float | None = Field(None, ge=0)
+    muestreo: float | None = Field(None, ge=0, le=1)
+
+# Configuración del log de consultas SQL. Es estado del proceso: con varios
+# workers (servidor.py) se lee y se cambia solo la del worker que atiende la
+# petición, que se informa en `worker`. Para cambiarla en todos: SQL_LOG,
+# SQL_SLOW_MS y SQL_SAMPLE_RATE en el entorno y reinicio escalonado (kill -HUP)
+@router.get("/consultas")
+def obtener_config_consultas():
+    return {**consultas.actualizar_config(), "worker": os.getpid()}
+
+@router.put("/consultas")
+def actualizar_config_consultas(datos: ConfigConsultasUpdate):
+    """Cambia la configuración solo en el worker que atiende la petición."""
+    config = consultas.actualizar_config(**datos.model_dump())
+    logger.info(f"Log de consultas actualizado en el worker {os.getpid()}: {config}")
+    return {**config, "worker": os.getpid()}
+
+# Contadores de los caches en memoria (del worker que atiende la petición)
+@router.get("/cache")
+def estadisticas_cache():
+    return {
+        "respuestas": cache_respuestas.estadisticas(),
+        "tokens": cache_tokens.estadisticas(),
+    }
+
+# Activar / desactivar usuarios. Al desactivar se revocan sus tokens ya emitidos
+@router.put("/usuarios/{usuario_id}/activo")
+async def cambiar_usuario_activo(usuario_id: int, activo: bool, db: async_db_dependency):
+    try:
+        usuario = await db.get(UsuarioDB, usuario_id)
+        if not usuario:
+            raise HTTPException(status_code=404, detail="Usuario no encontrado")
+        usuario.is_active = activo
+        await db.commit()
+        if not activo:
+            revocaciones.revocar_usuario(usuario_id, time.time())
+        logger.info(f"Usuario {usuario_id} {'activado' if activo else 'desactivado'}")
+        return {"ok": True, "id": usuario_id, "is_active": activo}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error al cambiar estado del usuario {usuario_id}: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
@@ -1,22 +1,34 @@
-from fastapi import APIRouter, HTTPException
+from datetime import date
+from fastapi import APIRouter, HTTPException, Request, Response
+from sqlalchemy import select, or_
+from sqlalchemy.dialects.postgresql import insert
 from backend.modelos import AlumnoDB
-from backend.db import db_dependency  
-from pydantic import BaseModel, ConfigDict
-from typing import List
+from backend.db import async_db_dependency  
+from backend.perfilado import RutaPerfilada
+from backend.cache import cache_dashboard, cache_respuestas
+from backend.versiones import condicional
+from backend.paginacion import paginacion_dependency, paginar
+from backend.serializacion import LISTADOS_RAPIDOS, columnas, seleccionar, listado
+from backend.exportacion import FormatoExport, exportar
+from backend.inscripciones import MAX_IDS_INSCRIPCION, inscribir, dar_de_baja
+from backend.compresion import perfil_compresion
+from backend.carga_masiva import FormatoInvalido, FilaInvalida, leer_filas_csv, leer_filas_json
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from typing import List, Literal
 import logging
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/alumnos", tags=["alumnos"])
+router = APIRouter(prefix="/alumnos", tags=["alumnos"], route_class=RutaPerfilada)
 
 class AlumnoCreate(BaseModel):
     documento: str
     nro_doc: str
     nombre: str
     apellido: str
-    nacimiento: str | None = None
+    nacimiento: date | None = None
     mail: str
     telefono: str | None = None
     direccion: str | None = None
@@ -31,7 +43,7 @@ class AlumnoOut(BaseModel):
     nro_doc: str
     nombre: str
     apellido: str
-    nacimiento: str | None = None
+    nacimiento: date | None = None
     mail: str
     telefono: str | None = None
     direccion: str | None = None
@@ -42,25 +54,54 @@ class AlumnoOut(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class ResultadoFila(BaseModel):
+    fila: int
+    estado: Literal["creado", "duplicado", "invalido"]
+    id: int | None = None
+    error: str | None = None
+
+class ReporteCarga(BaseModel):
+    creados: int
+    duplicados: int
+    invalidos: int
+    filas: List[ResultadoFila]
+
+class InscripcionMaterias(BaseModel):
+    materia_ids: List[int] = Field(min_length=1, max_length=MAX_IDS_INSCRIPCION)
+
+class ResultadoInscripcion(BaseModel):
+    solicitados: int
+    inscriptos: int
+    omitidos: int  # ya inscriptos o ids inexistentes
+
+class ResultadoBaja(BaseModel):
+    solicitados: int
+    dados_de_baja: int
+
+# Filas que se validan e insertan juntas en la carga masiva
+TAMANIO_LOTE = 1000
+
 @router.post("/", response_model=AlumnoOut)
-def crear_alumno(alumno: AlumnoCreate, db: db_dependency):
+async def crear_alumno(alumno: AlumnoCreate, db: async_db_dependency):
     try:
         logger.info(f"Intentando crear alumno: {alumno.model_dump()}")
         
         # Verificar si ya existe un alumno con el mismo número de documento
-        existing_doc = db.query(AlumnoDB).filter(AlumnoDB.nro_doc == alumno.nro_doc).first()
+        existing_doc = await db.scalar(select(AlumnoDB).where(AlumnoDB.nro_doc == alumno.nro_doc).limit(1))
         if existing_doc:
             raise HTTPException(status_code=400, detail=f"Ya existe un alumno con el número de documento {alumno.nro_doc}")
         
         # Verificar si ya existe un alumno con el mismo email
-        existing_email = db.query(AlumnoDB).filter(AlumnoDB.mail == alumno.mail).first()
+        existing_email = await db.scalar(select(AlumnoDB).where(AlumnoDB.mail == alumno.mail).limit(1))
         if existing_email:
             raise HTTPException(status_code=400, detail=f"Ya existe un alumno con el email {alumno.mail}")
         
         db_alumno = AlumnoDB(**alumno.model_dump())
         db.add(db_alumno)
-        db.commit()
-        db.refresh(db_alumno)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("alumnos")
+        await db.refresh(db_alumno)
         
         logger.info(f"Alumno creado exitosamente con ID: {db_alumno.id}")
         return db_alumno
@@ -69,26 +110,168 @@ def crear_alumno(alumno: AlumnoCreate, db: db_dependency):
         raise
     except Exception as e:
         logger.error(f"Error al crear alumno: {str(e)}")
-        db.rollback()
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+async def procesar_lote(db, lote, docs_vistos: set, mails_vistos: set) -> List[ResultadoFila]:
+    """Valida, descarta duplicados e inserta un lote de filas con una consulta por paso.
+
+    `docs_vistos` y `mails_vistos` acumulan lo ya recibido en toda la carga,
+    para detectar duplicados entre lotes sin volver a consultar la base.
+    """
+    reporte = []
+    candidatos = []
+    for nro_fila, datos in lote:
+        if isinstance(datos, FilaInvalida):
+            reporte.append(ResultadoFila(fila=nro_fila, estado="invalido", error=datos.error))
+            continue
+        try:
+            alumno = AlumnoCreate.model_validate(datos)
+        except ValidationError as e:
+            errores = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            reporte.append(ResultadoFila(fila=nro_fila, estado="invalido", error=errores))
+            continue
+        if alumno.nro_doc in docs_vistos or alumno.mail in mails_vistos:
+            reporte.append(ResultadoFila(fila=nro_fila, estado="duplicado", error="Documento o email repetido en la carga"))
+            continue
+        docs_vistos.add(alumno.nro_doc)
+        mails_vistos.add(alumno.mail)
+        candidatos.append((nro_fila, alumno))
+
+    if not candidatos:
+        return reporte
+
+    # Un solo SELECT para todos los documentos y emails del lote
+    existentes = (await db.execute(
+        select(AlumnoDB.nro_doc, AlumnoDB.mail).where(or_(
+            AlumnoDB.nro_doc.in_([alumno.nro_doc for _, alumno in candidatos]),
+            AlumnoDB.mail.in_([alumno.mail for _, alumno in candidatos]),
+        ))
+    )).all()
+    docs_existentes = {fila.nro_doc for fila in existentes}
+    mails_existentes = {fila.mail for fila in existentes}
+
+    nuevos = []
+    for nro_fila, alumno in candidatos:
+        if alumno.nro_doc in docs_existentes:
+            reporte.append(ResultadoFila(fila=nro_fila, estado="duplicado", error=f"Ya existe un alumno con el número de documento {alumno.nro_doc}"))
+        elif alumno.mail in mails_existentes:
+            reporte.append(ResultadoFila(fila=nro_fila, estado="duplicado", error=f"Ya existe un alumno con el email {alumno.mail}"))
+        else:
+            nuevos.append((nro_fila, alumno))
+
+    if nuevos:
+        # INSERT multi-fila; ON CONFLICT cubre altas concurrentes entre el SELECT y el INSERT
+        insertados = (await db.execute(
+            insert(AlumnoDB)
+            .values([alumno.model_dump() for _, alumno in nuevos])
+            .on_conflict_do_nothing()
+            .returning(AlumnoDB.id, AlumnoDB.nro_doc)
+        )).all()
+        await db.commit()
+        ids = {fila.nro_doc: fila.id for fila in insertados}
+        for nro_fila, alumno in nuevos:
+            if alumno.nro_doc in ids:
+                reporte.append(ResultadoFila(fila=nro_fila, estado="creado", id=ids[alumno.nro_doc]))
+            else:
+                reporte.append(ResultadoFila(fila=nro_fila, estado="duplicado", error="Documento o email creado por otra operación"))
+    return reporte
+
+# Carga masiva de alumnos (CSV o array JSON)
+@router.post("/bulk", response_model=ReporteCarga, dependencies=[perfil_compresion("rapido")])
+async def cargar_alumnos(request: Request, db: async_db_dependency):
+    content_type = request.headers.get("content-type", "")
+    leer_filas = leer_filas_csv if "csv" in content_type else leer_filas_json
+    docs_vistos, mails_vistos = set(), set()
+    reporte = []
+    lote = []
+    try:
+        nro_fila = 0
+        async for datos in leer_filas(request.stream()):
+            nro_fila += 1
+            lote.append((nro_fila, datos))
+            if len(lote) >= TAMANIO_LOTE:
+                reporte += await procesar_lote(db, lote, docs_vistos, mails_vistos)
+                lote = []
+        if lote:
+            reporte += await procesar_lote(db, lote, docs_vistos, mails_vistos)
+    except FormatoInvalido as e:
+        # Los lotes anteriores ya quedaron guardados
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=f"{str(e)} (procesadas {len(reporte)} filas antes del error)")
+    except Exception as e:
+        logger.error(f"Error en la carga masiva de alumnos: {str(e)}")
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+    finally:
+        if reporte:
+            cache_dashboard.invalidar()
+            await cache_respuestas.invalidar("alumnos")
+
+    reporte.sort(key=lambda resultado: resultado.fila)
+    estados = [resultado.estado for resultado in reporte]
+    logger.info(f"Carga masiva de alumnos: {estados.count('creado')} creados de {len(reporte)} filas")
+    return ReporteCarga(
+        creados=estados.count("creado"),
+        duplicados=estados.count("duplicado"),
+        invalidos=estados.count("invalido"),
+        filas=reporte,
+    )
+
+def filtrar_alumnos(stmt, cohorte=None, estado=None, al_dia=None, carrera_id=None):
+    """Filtros comunes al listado y a la exportación de alumnos."""
+    if cohorte is not None:
+        stmt = stmt.where(AlumnoDB.cohorte == cohorte)
+    if estado is not None:
+        stmt = stmt.where(AlumnoDB.estado == estado)
+    if al_dia is not None:
+        stmt = stmt.where(AlumnoDB.al_dia == al_dia)
+    if carrera_id is not None:
+        stmt = stmt.where(AlumnoDB.carrera_id == carrera_id)
+    return stmt
 
-@router.get("/", response_model=List[AlumnoOut])
-def listar_alumnos(db: db_dependency):
+@router.get("/", response_model=List[AlumnoOut], dependencies=[condicional("alumnos")])
+async def listar_alumnos(
+    db: async_db_dependency,
+    paginacion: paginacion_dependency,
+    response: Response,
+    cohorte: str | None = None,
+    estado: str | None = None,
+    al_dia: bool | None = None,
+    carrera_id: int | None = None,
+):
     try:
-        alumnos = db.query(AlumnoDB).all()
+        stmt = filtrar_alumnos(seleccionar(AlumnoDB, AlumnoOut), cohorte, estado, al_dia, carrera_id)
+        alumnos = await paginar(db, stmt, AlumnoDB.id, paginacion, response, crudas=LISTADOS_RAPIDOS)
         logger.info(f"Listando {len(alumnos)} alumnos")
-        return alumnos
+        return listado(alumnos, response)
     except Exception as e:
         logger.error(f"Error al listar alumnos: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
-@router.get("/{alumno_id}", response_model=AlumnoOut)
-def obtener_alumno(alumno_id: int, db: db_dependency):
-    try:
-        alumno = db.query(AlumnoDB).filter(AlumnoDB.id == alumno_id).first()
+# Exportación completa (NDJSON o CSV), en streaming desde un cursor del servidor
+@router.get("/export")
+async def exportar_alumnos(
+    formato: FormatoExport = "ndjson",
+    cohorte: str | None = None,
+    estado: str | None = None,
+    al_dia: bool | None = None,
+    carrera_id: int | None = None,
+):
+    stmt = select(*columnas(AlumnoDB, AlumnoOut)).order_by(AlumnoDB.id)
+    logger.info(f"Exportando alumnos en {formato}")
+    return exportar(filtrar_alumnos(stmt, cohorte, estado, al_dia, carrera_id), formato, "alumnos")
+
+@router.get("/{alumno_id}", response_model=AlumnoOut, dependencies=[condicional("alumnos")])
+async def obtener_alumno(alumno_id: int, request: Request, response: Response, db: async_db_dependency):
+    async def calcular():
+        alumno = await db.get(AlumnoDB, alumno_id)
         if not alumno:
             raise HTTPException(status_code=404, detail="Alumno no encontrado")
-        return alumno
+        return AlumnoOut.model_validate(alumno).model_dump(mode="json")
+
+    try:
+        return await cache_respuestas.leer("alumnos", request, response, calcular)
     except HTTPException:
         raise
     except Exception as e:
@@ -96,37 +279,74 @@ def obtener_alumno(alumno_id: int, db: db_dependency):
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 @router.put("/{alumno_id}", response_model=AlumnoOut)
-def actualizar_alumno(alumno_id: int, datos: AlumnoCreate, db: db_dependency):
+async def actualizar_alumno(alumno_id: int, datos: AlumnoCreate, db: async_db_dependency):
     try:
-        alumno = db.query(AlumnoDB).filter(AlumnoDB.id == alumno_id).first()
+        alumno = await db.get(AlumnoDB, alumno_id)
         if not alumno:
             raise HTTPException(status_code=404, detail="Alumno no encontrado")
         
         for key, value in datos.model_dump().items():
             setattr(alumno, key, value)
         
-        db.commit()
-        db.refresh(alumno)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("alumnos")
+        await db.refresh(alumno)
         return alumno
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error al actualizar alumno {alumno_id}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 @router.delete("/{alumno_id}")
-def eliminar_alumno(alumno_id: int, db: db_dependency):
+async def eliminar_alumno(alumno_id: int, db: async_db_dependency):
     try:
-        alumno = db.query(AlumnoDB).filter(AlumnoDB.id == alumno_id).first()
+        alumno = await db.get(AlumnoDB, alumno_id)
         if not alumno:
             raise HTTPException(status_code=404, detail="Alumno no encontrado")
-        db.delete(alumno)
-        db.commit()
+        await db.delete(alumno)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("alumnos")
         return {"ok": True, "mensaje": "Alumno eliminado"}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error al eliminar alumno {alumno_id}: {str(e)}")
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
\ No newline at end of file
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+# Inscribir al alumno en varias materias con una sola sentencia
+@router.post("/{alumno_id}/materias", response_model=ResultadoInscripcion)
+async def inscribir_alumno(alumno_id: int, datos: InscripcionMaterias, db: async_db_dependency):
+    try:
+        if not await db.get(AlumnoDB, alumno_id):
+            raise HTTPException(status_code=404, detail="Alumno no encontrado")
+        materia_ids = set(datos.materia_ids)
+        inscriptos = await inscribir(db, list(materia_ids), [alumno_id])
+        await db.commit()
+        cache_dashboard.invalidar()
+        logger.info(f"Alumno {alumno_id} inscripto en {inscriptos} materias")
+        return ResultadoInscripcion(solicitados=len(materia_ids), inscriptos=inscriptos, omitidos=len(materia_ids) - inscriptos)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error al inscribir alumno {alumno_id}: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+@router.delete("/{alumno_id}/materias", response_model=ResultadoBaja)
+async def dar_de_baja_alumno(alumno_id: int, datos: InscripcionMaterias, db: async_db_dependency):
+    try:
+        materia_ids = set(datos.materia_ids)
+        bajas = await dar_de_baja(db, list(materia_ids), [alumno_id])
+        await db.commit()
+        cache_dashboard.invalidar()
+        logger.info(f"Alumno {alumno_id} dado de baja de {bajas} materias")
+        return ResultadoBaja(solicitados=len(materia_ids), dados_de_baja=bajas)
+    except Exception as e:
+        logger.error(f"Error al dar de baja alumno {alumno_id}: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
@@ -0,0 +1,104 @@
+from fastapi import APIRouter, HTTPException, Query
+from sqlalchemy import text
+from backend.db import async_db_dependency
+from backend.perfilado import RutaPerfilada
+from backend.compresion import perfil_compresion
+from pydantic import BaseModel
+from typing import List, Literal
+import logging
+import re
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/buscar", tags=["buscar"], route_class=RutaPerfilada)
+
+# Las expresiones tienen que coincidir exactamente con las de los índices GIN
+# creados en la migración 8d2e4b6a1c37, si no Postgres no los usa.
+TEXTO_ALUMNO = (
+    "(coalesce(nombre, '') || ' ' || coalesce(apellido, '') || ' ' || "
+    "coalesce(mail, '') || ' ' || coalesce(nro_doc, ''))"
+)
+TEXTO_PROFESOR = (
+    "(coalesce(nombre, '') || ' ' || coalesce(apellido, '') || ' ' || "
+    "coalesce(legajo::text, '') || ' ' || coalesce(especialidad, ''))"
+)
+
+# Coincidencia por prefijo (tsvector) o aproximada (trigramas); se ordena
+# combinando el rank del tsvector con la similitud por palabra.
+SQL_BUSQUEDA = """
+    SELECT {columnas},
+           ts_rank(to_tsvector('simple', {texto}), to_tsquery('simple', :tsquery))
+             + word_similarity(:q, {texto}) AS score
+    FROM {tabla}
+    WHERE to_tsvector('simple', {texto}) @@ to_tsquery('simple', :tsquery)
+       OR :q <% {texto}
+    ORDER BY score DESC, id
+    LIMIT :limit
+"""
+
+BUSQUEDA_ALUMNOS = text(SQL_BUSQUEDA.format(
+    columnas="id, nombre, apellido, mail, nro_doc",
+    texto=TEXTO_ALUMNO,
+    tabla="alumnos",
+))
+BUSQUEDA_PROFESORES = text(SQL_BUSQUEDA.format(
+    columnas="id, nombre, apellido, legajo, especialidad",
+    texto=TEXTO_PROFESOR,
+    tabla="profesores",
+))
+
+# Esquemas Pydantic
+class AlumnoEncontrado(BaseModel):
+    id: int
+    nombre: str
+    apellido: str
+    mail: str
+    nro_doc: str
+    score: float
+
+class ProfesorEncontrado(BaseModel):
+    id: int
+    nombre: str
+    apellido: str
+    legajo: int | None = None
+    especialidad: str | None = None
+    score: float
+
+class ResultadoBusqueda(BaseModel):
+    alumnos: List[AlumnoEncontrado] = []
+    profesores: List[ProfesorEncontrado] = []
+
+def armar_tsquery(q: str) -> str | None:
+    """Convierte lo que escribe el usuario en un tsquery de prefijos: 'jua per' -> 'jua:* & per:*'."""
+    terminos = re.findall(r"\w+", q.lower())
+    if not terminos:
+        return None
+    return " & ".join(f"{termino}:*" for termino in terminos)
+
+# Buscar alumnos y profesores (se consulta mientras el usuario escribe: prima la latencia)
+@router.get("/", response_model=ResultadoBusqueda, dependencies=[perfil_compresion("rapido")])
+async def buscar(
+    db: async_db_dependency,
+    q: str = Query(..., min_length=2, max_length=100),
+    tipo: Literal["alumnos", "profesores"] | None = None,
+    limit: int = Query(10, ge=1, le=50),
+):
+    try:
+        tsquery = armar_tsquery(q)
+        if tsquery is None:
+            return ResultadoBusqueda()
+
+        parametros = {"q": q, "tsquery": tsquery, "limit": limit}
+        resultado = ResultadoBusqueda()
+        if tipo in (None, "alumnos"):
+            filas = (await db.execute(BUSQUEDA_ALUMNOS, parametros)).all()
+            resultado.alumnos = [AlumnoEncontrado(**fila._mapping) for fila in filas]
+        if tipo in (None, "profesores"):
+            filas = (await db.execute(BUSQUEDA_PROFESORES, parametros)).all()
+            resultado.profesores = [ProfesorEncontrado(**fila._mapping) for fila in filas]
+        return resultado
+    except Exception as e:
+        logger.error(f"Error al buscar '{q}': {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
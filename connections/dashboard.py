@@ -0,0 +1,96 @@
+from datetime import date
+from fastapi import APIRouter, HTTPException, Query
+from sqlalchemy import select, func
+from backend.modelos import AlumnoDB, MateriaDB, ProfesorDB, MaterialDB, TareaDB, materia_alumno
+from backend.db import async_db_dependency
+from backend.perfilado import RutaPerfilada
+from backend.cache import cache_dashboard
+from pydantic import BaseModel
+from typing import List
+import logging
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"], route_class=RutaPerfilada)
+
+# Esquemas Pydantic
+class Totales(BaseModel):
+    materias: int
+    alumnos: int
+    profesores: int
+    tareas: int
+    materiales: int
+
+class TareaProxima(BaseModel):
+    id: int
+    titulo: str
+    fecha_entrega: date | None = None
+    materia_id: int | None = None
+
+class MateriaPopular(BaseModel):
+    id: int
+    nombre: str
+    codigo: str
+    alumnos: int
+
+class ResumenOut(BaseModel):
+    totales: Totales
+    proximas_tareas: List[TareaProxima]
+    materias_con_mas_alumnos: List[MateriaPopular]
+
+def _contar(modelo):
+    return select(func.count()).select_from(modelo).scalar_subquery()
+
+def consulta_proximas_tareas(desde: date, top: int):
+    return (
+        select(TareaDB.id, TareaDB.titulo, TareaDB.fecha_entrega, TareaDB.materia_id)
+        .where(TareaDB.fecha_entrega >= desde)
+        .order_by(TareaDB.fecha_entrega, TareaDB.id)
+        .limit(top)
+    )
+
+async def calcular_resumen(db, top: int) -> ResumenOut:
+    # Todos los totales en un solo SELECT con subconsultas escalares
+    totales = (await db.execute(select(
+        _contar(MateriaDB).label("materias"),
+        _contar(AlumnoDB).label("alumnos"),
+        _contar(ProfesorDB).label("profesores"),
+        _contar(TareaDB).label("tareas"),
+        _contar(MaterialDB).label("materiales"),
+    ))).one()
+
+    proximas = (await db.execute(consulta_proximas_tareas(date.today(), top))).all()
+
+    inscriptos = (
+        select(materia_alumno.c.materia_id, func.count().label("alumnos"))
+        .group_by(materia_alumno.c.materia_id)
+        .order_by(func.count().desc())
+        .limit(top)
+        .subquery()
+    )
+    populares = (await db.execute(
+        select(MateriaDB.id, MateriaDB.nombre, MateriaDB.codigo, inscriptos.c.alumnos)
+        .join(inscriptos, inscriptos.c.materia_id == MateriaDB.id)
+        .order_by(inscriptos.c.alumnos.desc(), MateriaDB.id)
+    )).all()
+
+    return ResumenOut(
+        totales=Totales(**totales._mapping),
+        proximas_tareas=[TareaProxima(**fila._mapping) for fila in proximas],
+        materias_con_mas_alumnos=[MateriaPopular(**fila._mapping) for fila in populares],
+    )
+
+# Resumen del dashboard
+@router.get("/resumen", response_model=ResumenOut)
+async def obtener_resumen(db: async_db_dependency, top: int = Query(5, ge=1, le=20)):
+    try:
+        resumen = cache_dashboard.obtener(top)
+        if resumen is None:
+            resumen = await calcular_resumen(db, top)
+            cache_dashboard.guardar(top, resumen)
+        return resumen
+    except Exception as e:
+        logger.error(f"Error al obtener resumen del dashboard: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
@@ -1,32 +1,123 @@
-from fastapi import FastAPI, status, HTTPException
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request, Response, status, HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
 from fastapi.middleware.cors import CORSMiddleware
 from connections.alumnos import router as alumnos_router
 from connections.materias import router as materias_router
 from connections.profesores import router as profesores_router
 from connections.materiales import router as materiales_router
 from connections.tareas import router as tareas_router
+from connections.dashboard import router as dashboard_router
+from connections.buscar import router as buscar_router
+from connections.admin import router as admin_router
 from backend.auth import get_current_user
 from backend.db import db_dependency
-from backend.db import engine
+from backend.db import motores, cerrar_motores
+from backend.migraciones import verificar_migraciones
+from backend.conexion import POOL_CONFIG, estado_pool
+from backend.consultas import ruta_actual
+from backend.paginacion import HEADER_CURSOR
+from backend.estaticos import FrontendEstatico
+from backend.compresion import MiddlewareCompresion
+from backend import metricas, perfilado
 from typing import Annotated
 from fastapi import Depends
-from backend import auth, modelos
+from backend import auth
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
-
-app = FastAPI()
+import secrets
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Arranque del worker: nada de esto pasa al importar el módulo.
+
+    El esquema lo maneja solo Alembic; acá se verifica con una consulta que
+    la base esté en la última revisión. Los assets del frontend se comprimen
+    en segundo plano, con el worker ya atendiendo.
+    """
+    inicio = time.perf_counter()
+    frontend.preparar()
+    await verificar_migraciones(motores()["async_engine"])
+    cancelar = threading.Event()
+    precompresion = asyncio.create_task(asyncio.to_thread(frontend.precomprimir, cancelar))
+    logger.info(f"Worker {os.getpid()} listo en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    yield
+    # Un apagado rápido no espera a que termine de comprimir: corta en el
+    # recurso que está comprimiendo y se espera al thread antes de cerrar
+    cancelar.set()
+    try:
+        await precompresion
+    except Exception as e:
+        logger.warning(f"Falló la precompresión del frontend: {e!r}")
+    await cerrar_motores()
+
+app = FastAPI(lifespan=lifespan)
+# Las rutas propias de la app también miden su serialización (ver backend/perfilado.py)
+app.router.route_class = perfilado.RutaPerfilada
 app.include_router(auth.router)
 
-modelos.Base.metadata.create_all(bind=engine)
+user_dependency = Annotated[dict, Depends(get_current_user)]
 
-# ← ELIMINAR: Ya no necesitamos get_db() aquí
+class RegistrarRuta:
+    """Para que el log de consultas lentas sepa qué endpoint las disparó.
 
-user_dependency = Annotated[dict, Depends(get_current_user)]
+    Middleware ASGI puro: @app.middleware("http") pasaba cada respuesta por
+    un stream, y eso impedía comprimirla entera.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            ruta_actual.set(f"{scope['method']} {scope['path']}")
+        await self.app(scope, receive, send)
+
+app.add_middleware(RegistrarRuta)
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
+@app.get("/health/db")
+async def health_db():
+    """Estado de la base y de los pools de conexiones de este worker"""
+    engine, async_engine = motores()["engine"], motores()["async_engine"]
+    resultado = {
+        "config": POOL_CONFIG,
+        "pools": {
+            "async": estado_pool(async_engine.sync_engine, "async"),
+            "sync": estado_pool(engine, "sync"),
+        },
+    }
+    try:
+        inicio = time.perf_counter()
+        async with async_engine.connect() as conexion:
+            await conexion.execute(text("SELECT 1"))
+        resultado["status"] = "ok"
+        resultado["ping_ms"] = (time.perf_counter() - inicio) * 1000
+        return resultado
+    except Exception as e:
+        resultado["status"] = "error"
+        resultado["error"] = str(e)
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=resultado)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """Métricas en formato Prometheus, sumadas entre workers si PROMETHEUS_MULTIPROC_DIR está definido"""
+    if metricas.METRICAS_TOKEN and not secrets.compare_digest(
+        request.headers.get("authorization", ""), f"Bearer {metricas.METRICAS_TOKEN}"
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de métricas inválido")
+    contenido, tipo = metricas.exportar()
+    return Response(content=contenido, media_type=tipo)
+
 # Autenticacion de usuario - ← CAMBIO: usar db_dependency
 @app.get("/user", status_code=status.HTTP_200_OK)
 async def get_user(user: user_dependency, db: db_dependency):
@@ -34,6 +125,9 @@ async def get_user(user: user_dependency, db: db_dependency):
         raise HTTPException(status_code=401, detail="Autenticacion fallida")
     return {"User": user}
 
+# Comprimir las respuestas de la API (gzip/brotli/zstd según Accept-Encoding)
+app.add_middleware(MiddlewareCompresion)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -41,67 +135,70 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[HEADER_CURSOR, "ETag", "Server-Timing", "X-DB-Queries"],
 )
 
-# Montar archivos estáticos
-app.mount("/static", StaticFiles(directory="frontend"), name="static")
+# Server-Timing y perfiles a pedido, solo si hay PERFILADO_TOKEN (ver backend/perfilado.py)
+if perfilado.PERFILADO_TOKEN:
+    perfilado.instalar(app)
+
+# Métricas de cada petición; va última para quedar por fuera de todos los demás
+app.add_middleware(metricas.MiddlewareMetricas)
+
+# Montar archivos estáticos: assets versionados y precomprimidos, HTML en memoria
+frontend = FrontendEstatico("frontend", prefijo="/static")
+app.mount("/static", frontend, name="static")
 
 app.include_router(alumnos_router)
 app.include_router(materias_router)
 app.include_router(profesores_router)
 app.include_router(materiales_router)
 app.include_router(tareas_router)
+app.include_router(dashboard_router)
+app.include_router(buscar_router)
+app.include_router(admin_router)
 
-@app.get("/")
-def read_root():
+@app.api_route("/", methods=["GET", "HEAD"], include_in_schema=False)
+async def read_root(request: Request):
     """Redirigir a la página principal"""
-    from fastapi.responses import FileResponse
-    return FileResponse("frontend/index.html")
+    return frontend.pagina("index.html", request)
 
-@app.get("/alumnos-page")
-def alumnos_page():
+@app.api_route("/alumnos-page", methods=["GET", "HEAD"], include_in_schema=False)
+async def alumnos_page(request: Request):
     """Redirigir a la página de alumnos"""
-    from fastapi.responses import FileResponse
-    return FileResponse("frontend/alumnos.html")
+    return frontend.pagina("alumnos.html", request)
 
-@app.get("/crear-alumnos-page")
-def crear_alumnos_page():
+@app.api_route("/crear-alumnos-page", methods=["GET", "HEAD"], include_in_schema=False)
+async def crear_alumnos_page(request: Request):
     """Redirigir a la página de crear alumnos"""
-    from fastapi.responses import FileResponse
-    return FileResponse("frontend/crearAlumnos.html")
+    return frontend.pagina("crearAlumnos.html", request)
 
-@app.get("/materias-page")
-def materias_page():
+@app.api_route("/materias-page", methods=["GET", "HEAD"], include_in_schema=False)
+async def materias_page(request: Request):
     """Redirigir a la página de materias"""
-    from fastapi.responses import FileResponse
-    return FileResponse("frontend/materias.html")
+    return frontend.pagina("materias.html", request)
 
-@app.get("/crear-materia-page")
-def crear_materia_page():
+@app.api_route("/crear-materia-page", methods=["GET", "HEAD"], include_in_schema=False)
+async def crear_materia_page(request: Request):
     """Redirigir a la página de crear materias"""
-    from fastapi.responses import FileResponse
-    return FileResponse("frontend/crearMateria.html")
+    return frontend.pagina("crearMateria.html", request)
 
-@app.get("/editar-materia-page")
-def editar_materia_page():
+@app.api_route("/editar-materia-page", methods=["GET", "HEAD"], include_in_schema=False)
+async def editar_materia_page(request: Request):
     """Redirigir a la página de editar materias"""
-    from fastapi.responses import FileResponse
-    return FileResponse("frontend/editarMateria.html")
+    return frontend.pagina("editarMateria.html", request)
 
-@app.get("/profesores-page")
-def profesores_page():
+@app.api_route("/profesores-page", methods=["GET", "HEAD"], include_in_schema=False)
+async def profesores_page(request: Request):
     """Redirigir a la página de profesores"""
-    from fastapi.responses import FileResponse
-    return FileResponse("frontend/profesores.html")
+    return frontend.pagina("profesores.html", request)
 
-@app.get("/materiales-page")
-def materiales_page():
+@app.api_route("/materiales-page", methods=["GET", "HEAD"], include_in_schema=False)
+async def materiales_page(request: Request):
     """Redirigir a la página de materiales"""
-    from fastapi.responses import FileResponse
-    return FileResponse("frontend/materiales.html")
+    return frontend.pagina("materiales.html", request)
 
-@app.get("/tareas-page")
-def tareas_page():
+@app.api_route("/tareas-page", methods=["GET", "HEAD"], include_in_schema=False)
+async def tareas_page(request: Request):
     """Redirigir a la página de tareas"""
-    from fastapi.responses import FileResponse
-    return FileResponse("frontend/tareas.html")
\ No newline at end of file
+    return frontend.pagina("tareas.html", request)
\ No newline at end of file
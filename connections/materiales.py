@@ -1,6 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import RedirectResponse
+from sqlalchemy import select, func
 from backend.modelos import MaterialDB
-from backend.db import db_dependency 
+from backend.db import async_db_dependency 
+from backend.perfilado import RutaPerfilada
+from backend.almacenamiento import almacen, ArchivoMultipart, ArchivoInvalido, ArchivoDemasiadoGrande
+from backend.cache import cache_dashboard, cache_respuestas
+from backend.versiones import condicional
+from backend.paginacion import paginacion_dependency, paginar
+from backend.serializacion import LISTADOS_RAPIDOS, seleccionar, listado
 from pydantic import BaseModel, ConfigDict
 from typing import List
 import logging
@@ -9,31 +17,35 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/materiales", tags=["materiales"])
+router = APIRouter(prefix="/materiales", tags=["materiales"], route_class=RutaPerfilada)
 
 class MaterialCreate(BaseModel):
     titulo: str
     descripcion: str = None
-    archivo: str
+    archivo: str | None = None
 
 class MaterialOut(BaseModel):
     id: int
     titulo: str
-    descripcion: str = None
-    archivo: str
+    descripcion: str | None = None
+    archivo: str | None = None
+    tamanio: int | None = None
+    hash_archivo: str | None = None
     
     model_config = ConfigDict(from_attributes=True)
 
 # Crear Material
 @router.post("/", response_model=MaterialOut)
-def crear_material(material: MaterialCreate, db: db_dependency):
+async def crear_material(material: MaterialCreate, db: async_db_dependency):
     try:
         logger.info(f"Intentando crear material: {material.model_dump()}")
         
         db_material = MaterialDB(**material.model_dump())
         db.add(db_material)
-        db.commit()
-        db.refresh(db_material)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("materiales")
+        await db.refresh(db_material)
         
         logger.info(f"Material creado exitosamente con ID: {db_material.id}")
         return db_material
@@ -42,28 +54,157 @@ def crear_material(material: MaterialCreate, db: db_dependency):
         raise
     except Exception as e:
         logger.error(f"Error al crear material: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
+def filtrar_materiales(stmt, materia_id=None, profesor_id=None, tipo=None, estado=None):
+    """Filtros del listado de materiales."""
+    if materia_id is not None:
+        stmt = stmt.where(MaterialDB.materia_id == materia_id)
+    if profesor_id is not None:
+        stmt = stmt.where(MaterialDB.profesor_id == profesor_id)
+    if tipo is not None:
+        stmt = stmt.where(MaterialDB.tipo == tipo)
+    if estado is not None:
+        stmt = stmt.where(MaterialDB.estado == estado)
+    return stmt
+
 # Listar Materiales
-@router.get("/", response_model=List[MaterialOut])
-def listar_materiales(db: db_dependency):
+@router.get("/", response_model=List[MaterialOut], dependencies=[condicional("materiales")])
+async def listar_materiales(
+    db: async_db_dependency,
+    paginacion: paginacion_dependency,
+    response: Response,
+    materia_id: int | None = None,
+    profesor_id: int | None = None,
+    tipo: str | None = None,
+    estado: str | None = None,
+):
     try:
-        materiales = db.query(MaterialDB).all()
+        stmt = filtrar_materiales(seleccionar(MaterialDB, MaterialOut), materia_id, profesor_id, tipo, estado)
+        materiales = await paginar(db, stmt, MaterialDB.id, paginacion, response, crudas=LISTADOS_RAPIDOS)
         logger.info(f"Listando {len(materiales)} materiales")
-        return materiales
+        return listado(materiales, response)
     except Exception as e:
         logger.error(f"Error al listar materiales: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
-# Obtener Material por ID
-@router.get("/{material_id}", response_model=MaterialOut)
-def obtener_material(material_id: int, db: db_dependency):
+async def bloquear_archivo(db, hash_archivo: str):
+    """Lock de la base sobre un contenido hasta el fin de la transacción.
+
+    Serializa, entre todos los workers, la subida que confirma un archivo y
+    lo referencia con la baja que lo borra al quedar sin referencias.
+    """
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(hash_archivo))))
+
+def consulta_referencias(hash_archivo: str):
+    """Cuántos materiales apuntan a un contenido (por ix_materiales_hash_archivo)."""
+    return select(func.count()).where(MaterialDB.hash_archivo == hash_archivo)
+
+async def liberar_archivo(db, hash_archivo: str | None):
+    """Borra el archivo del almacén si ya ningún material lo usa.
+
+    Se llama después del commit que soltó la referencia, en una transacción
+    propia y con el lock del hash: una subida del mismo contenido espera y
+    después lo vuelve a guardar.
+    """
+    if hash_archivo is None:
+        return
+    await bloquear_archivo(db, hash_archivo)
+    en_uso = await db.scalar(consulta_referencias(hash_archivo))
+    if not en_uso:
+        await almacen().eliminar(hash_archivo)
+    await db.commit()
+
+# Subir el archivo de un material (multipart/form-data, campo "archivo")
+@router.put("/{material_id}/archivo", response_model=MaterialOut)
+async def subir_archivo(material_id: int, request: Request, db: async_db_dependency):
     try:
-        material = db.query(MaterialDB).filter(MaterialDB.id == material_id).first()
-        if not material:
+        if not await db.scalar(select(MaterialDB.id).where(MaterialDB.id == material_id)):
             raise HTTPException(status_code=404, detail="Material no encontrado")
+        # Devolver la conexión al pool mientras dura la subida
+        await db.rollback()
+
+        archivo = ArchivoMultipart(request)
+        recibido = await almacen().recibir(archivo)
+        confirmado = False
+        try:
+            await bloquear_archivo(db, recibido.hash)
+            material = await db.get(MaterialDB, material_id)
+            if not material:
+                raise HTTPException(status_code=404, detail="Material no encontrado")
+            await almacen().confirmar(recibido)
+            confirmado = True
+            anterior = material.hash_archivo
+            material.hash_archivo = recibido.hash
+            material.tamanio = recibido.tamanio
+            material.nombre_archivo = archivo.nombre
+            material.tipo_contenido = archivo.tipo
+            material.archivo = f"/materiales/{material_id}/archivo"
+            await db.commit()
+        except BaseException:
+            await almacen().descartar(recibido)
+            await db.rollback()
+            if confirmado:
+                # El contenido quedó guardado pero la referencia no se confirmó
+                await liberar_archivo(db, recibido.hash)
+            raise
+        if anterior != recibido.hash:
+            await liberar_archivo(db, anterior)
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("materiales")
+        await db.refresh(material)
+
+        logger.info(f"Archivo del material {material_id}: {recibido.tamanio} bytes, sha256 {recibido.hash}")
         return material
+    except ArchivoDemasiadoGrande as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ArchivoInvalido as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error al subir el archivo del material {material_id}: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+# Descargar el archivo de un material (acepta Range e If-None-Match)
+@router.get("/{material_id}/archivo")
+async def descargar_archivo(material_id: int, request: Request, db: async_db_dependency):
+    try:
+        material = await db.get(MaterialDB, material_id)
+        if not material:
+            raise HTTPException(status_code=404, detail="Material no encontrado")
+        if material.hash_archivo is None:
+            # Materiales cargados con un link externo en lugar de un archivo
+            if material.archivo and material.archivo != f"/materiales/{material_id}/archivo":
+                return RedirectResponse(material.archivo)
+            raise HTTPException(status_code=404, detail="El material no tiene archivo")
+        hash_archivo, nombre, tipo = material.hash_archivo, material.nombre_archivo, material.tipo_contenido
+        await db.rollback()
+
+        # El contenido está direccionado por hash: el hash es un ETag fuerte
+        headers = {"ETag": f'"{hash_archivo}"', "Cache-Control": "private, no-cache"}
+        if hash_archivo in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return await almacen().descargar(hash_archivo, nombre, tipo, headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error al descargar el archivo del material {material_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+# Obtener Material por ID
+@router.get("/{material_id}", response_model=MaterialOut, dependencies=[condicional("materiales")])
+async def obtener_material(material_id: int, request: Request, response: Response, db: async_db_dependency):
+    async def calcular():
+        material = await db.get(MaterialDB, material_id)
+        if not material:
+            raise HTTPException(status_code=404, detail="Material no encontrado")
+        return MaterialOut.model_validate(material).model_dump(mode="json")
+
+    try:
+        return await cache_respuestas.leer("materiales", request, response, calcular)
     except HTTPException:
         raise
     except Exception as e:
@@ -72,38 +213,49 @@ def obtener_material(material_id: int, db: db_dependency):
 
 # Actualizar Material
 @router.put("/{material_id}", response_model=MaterialOut)
-def actualizar_material(material_id: int, datos: MaterialCreate, db: db_dependency):
+async def actualizar_material(material_id: int, datos: MaterialCreate, db: async_db_dependency):
     try:
-        material = db.query(MaterialDB).filter(MaterialDB.id == material_id).first()
+        material = await db.get(MaterialDB, material_id)
         if not material:
             raise HTTPException(status_code=404, detail="Material no encontrado")
         
-        for key, value in datos.model_dump().items():
+        # Solo los campos enviados: un PUT con el título no borra el enlace al archivo.
+        # Con un archivo subido, `archivo` lo maneja PUT /{id}/archivo
+        cambios = datos.model_dump(exclude_unset=True)
+        if material.hash_archivo is not None:
+            cambios.pop("archivo", None)
+        for key, value in cambios.items():
             setattr(material, key, value)
         
-        db.commit()
-        db.refresh(material)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("materiales")
+        await db.refresh(material)
         return material
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error al actualizar material {material_id}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 # Eliminar Material
 @router.delete("/{material_id}")
-def eliminar_material(material_id: int, db: db_dependency):
+async def eliminar_material(material_id: int, db: async_db_dependency):
     try:
-        material = db.query(MaterialDB).filter(MaterialDB.id == material_id).first()
+        material = await db.get(MaterialDB, material_id)
         if not material:
             raise HTTPException(status_code=404, detail="Material no encontrado")
-        db.delete(material)
-        db.commit()
+        hash_archivo = material.hash_archivo
+        await db.delete(material)
+        await db.commit()
+        await liberar_archivo(db, hash_archivo)
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("materiales")
         return {"ok": True, "mensaje": "Material eliminado"}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error al eliminar material {material_id}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}") 
\ No newline at end of file
@@ -1,7 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends
-from backend.modelos import MateriaDB
-from backend.db import db_dependency
-from pydantic import BaseModel, ConfigDict
+from fastapi import APIRouter, HTTPException, Request, Depends, Response
+from sqlalchemy import select, func
+from sqlalchemy.orm import joinedload, selectinload
+from backend.modelos import MateriaDB, AlumnoDB, TareaDB, MaterialDB, materia_alumno
+from backend.db import async_db_dependency
+from backend.perfilado import RutaPerfilada
+from backend.cache import cache_dashboard, cache_respuestas
+from backend.versiones import condicional
+from backend.paginacion import paginacion_dependency, paginar
+from backend.serializacion import LISTADOS_RAPIDOS, columnas, seleccionar, como_dicts, listado
+from backend.exportacion import FormatoExport, exportar
+from backend.inscripciones import MAX_IDS_INSCRIPCION, inscribir, dar_de_baja
+from connections.alumnos import AlumnoOut, ResultadoInscripcion, ResultadoBaja, filtrar_alumnos
+from connections.profesores import ProfesorOut
+from connections.tareas import TareaOut
+from connections.materiales import MaterialOut
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List
 import logging
 
@@ -9,7 +22,7 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/materias", tags=["materias"])
+router = APIRouter(prefix="/materias", tags=["materias"], route_class=RutaPerfilada)
 
 # Esquemas Pydantic
 class MateriaCreate(BaseModel):
@@ -23,21 +36,50 @@ class MateriaOut(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class MateriaResumen(BaseModel):
+    id: int
+    nombre: str
+    codigo: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+class MateriaDetalle(MateriaOut):
+    anio_perteneciente: int | None = None
+    descripcion: str | None = None
+    modalidad: str | None = None
+    horario: str | None = None
+    estado: str | None = None
+    materia_previa: MateriaResumen | None = None
+    profesores: List[ProfesorOut]
+
+class MateriaCompleta(MateriaDetalle):
+    inscriptos: int
+    tareas_recientes: List[TareaOut]
+    materiales: List[MaterialOut]
+
+# Tareas y materiales que trae /materias/{id}/completa
+RECIENTES = 10
+
+class InscripcionAlumnos(BaseModel):
+    alumno_ids: List[int] = Field(min_length=1, max_length=MAX_IDS_INSCRIPCION)
+
 # Crear Materia
 @router.post("/", response_model=MateriaOut)
-def crear_materia(materia: MateriaCreate, db: db_dependency):
+async def crear_materia(materia: MateriaCreate, db: async_db_dependency):
     try:
         logger.info(f"Intentando crear materia: {materia.model_dump()}")
         
         # Verificar si ya existe una materia con el mismo código
-        existing_codigo = db.query(MateriaDB).filter(MateriaDB.codigo == materia.codigo).first()
+        existing_codigo = await db.scalar(select(MateriaDB).where(MateriaDB.codigo == materia.codigo).limit(1))
         if existing_codigo:
             raise HTTPException(status_code=400, detail=f"Ya existe una materia con el código {materia.codigo}")
         
         db_materia = MateriaDB(**materia.model_dump())
         db.add(db_materia)
-        db.commit()
-        db.refresh(db_materia)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("materias")
+        await db.refresh(db_materia)
         
         logger.info(f"Materia creada exitosamente con ID: {db_materia.id}")
         return db_materia
@@ -46,68 +88,220 @@ def crear_materia(materia: MateriaCreate, db: db_dependency):
         raise
     except Exception as e:
         logger.error(f"Error al crear materia: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 # Listar Materias
-@router.get("/", response_model=List[MateriaOut])
-def listar_materias(db: db_dependency):
-    try:
-        materias = db.query(MateriaDB).all()
+@router.get("/", response_model=List[MateriaOut], dependencies=[condicional("materias")])
+async def listar_materias(
+    request: Request,
+    db: async_db_dependency,
+    paginacion: paginacion_dependency,
+    response: Response,
+    estado: str | None = None,
+    anio_perteneciente: int | None = None,
+):
+    async def calcular():
+        stmt = seleccionar(MateriaDB, MateriaOut)
+        if estado is not None:
+            stmt = stmt.where(MateriaDB.estado == estado)
+        if anio_perteneciente is not None:
+            stmt = stmt.where(MateriaDB.anio_perteneciente == anio_perteneciente)
+        materias = await paginar(db, stmt, MateriaDB.id, paginacion, response, crudas=LISTADOS_RAPIDOS)
         logger.info(f"Listando {len(materias)} materias")
-        return materias
+        return como_dicts(materias, MateriaOut)
+
+    try:
+        return listado(await cache_respuestas.leer("materias", request, response, calcular), response)
     except Exception as e:
         logger.error(f"Error al listar materias: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
-# Obtener Materia por ID
-@router.get("/{materia_id}", response_model=MateriaOut)
-def obtener_materia(materia_id: int, db: db_dependency):
+def inscriptos_de(stmt, materia_id: int):
+    """Restringe un SELECT de alumnos a los inscriptos en la materia.
+
+    Es un join por la PK (materia_id, alumno_id) de materia_alumno en lugar
+    de cargar la relación MateriaDB.alumnos.
+    """
+    return stmt.join(materia_alumno, materia_alumno.c.alumno_id == AlumnoDB.id).where(materia_alumno.c.materia_id == materia_id)
+
+# Alumnos inscriptos, paginados
+@router.get("/{materia_id}/alumnos", response_model=List[AlumnoOut], dependencies=[condicional("alumnos", "materia_alumno")])
+async def listar_alumnos_materia(
+    materia_id: int,
+    db: async_db_dependency,
+    paginacion: paginacion_dependency,
+    response: Response,
+):
+    try:
+        if not await db.get(MateriaDB, materia_id):
+            raise HTTPException(status_code=404, detail="Materia no encontrada")
+        stmt = inscriptos_de(seleccionar(AlumnoDB, AlumnoOut), materia_id)
+        alumnos = await paginar(db, stmt, AlumnoDB.id, paginacion, response, crudas=LISTADOS_RAPIDOS)
+        logger.info(f"Listando {len(alumnos)} alumnos de la materia {materia_id}")
+        return listado(alumnos, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error al listar alumnos de la materia {materia_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+# Inscribir varios alumnos con una sola sentencia
+@router.post("/{materia_id}/alumnos", response_model=ResultadoInscripcion)
+async def inscribir_alumnos(materia_id: int, datos: InscripcionAlumnos, db: async_db_dependency):
     try:
-        materia = db.query(MateriaDB).filter(MateriaDB.id == materia_id).first()
+        if not await db.get(MateriaDB, materia_id):
+            raise HTTPException(status_code=404, detail="Materia no encontrada")
+        alumno_ids = set(datos.alumno_ids)
+        inscriptos = await inscribir(db, [materia_id], list(alumno_ids))
+        await db.commit()
+        cache_dashboard.invalidar()
+        logger.info(f"{inscriptos} alumnos inscriptos en la materia {materia_id}")
+        return ResultadoInscripcion(solicitados=len(alumno_ids), inscriptos=inscriptos, omitidos=len(alumno_ids) - inscriptos)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error al inscribir alumnos en la materia {materia_id}: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+@router.delete("/{materia_id}/alumnos", response_model=ResultadoBaja)
+async def dar_de_baja_alumnos(materia_id: int, datos: InscripcionAlumnos, db: async_db_dependency):
+    try:
+        alumno_ids = set(datos.alumno_ids)
+        bajas = await dar_de_baja(db, [materia_id], list(alumno_ids))
+        await db.commit()
+        cache_dashboard.invalidar()
+        logger.info(f"{bajas} alumnos dados de baja de la materia {materia_id}")
+        return ResultadoBaja(solicitados=len(alumno_ids), dados_de_baja=bajas)
+    except Exception as e:
+        logger.error(f"Error al dar de baja alumnos de la materia {materia_id}: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+# Exportar los alumnos inscriptos en la materia (NDJSON o CSV), en streaming
+@router.get("/{materia_id}/export")
+async def exportar_alumnos_materia(
+    materia_id: int,
+    db: async_db_dependency,
+    formato: FormatoExport = "ndjson",
+    cohorte: str | None = None,
+    estado: str | None = None,
+    al_dia: bool | None = None,
+    carrera_id: int | None = None,
+):
+    if not await db.get(MateriaDB, materia_id):
+        raise HTTPException(status_code=404, detail="Materia no encontrada")
+    stmt = inscriptos_de(select(*columnas(AlumnoDB, AlumnoOut)), materia_id).order_by(AlumnoDB.id)
+    logger.info(f"Exportando alumnos de la materia {materia_id} en {formato}")
+    return exportar(filtrar_alumnos(stmt, cohorte, estado, al_dia, carrera_id), formato, f"materia_{materia_id}_alumnos")
+
+# Obtener Materia por ID
+@router.get("/{materia_id}", response_model=MateriaOut, dependencies=[condicional("materias")])
+async def obtener_materia(materia_id: int, request: Request, response: Response, db: async_db_dependency):
+    async def calcular():
+        materia = await db.get(MateriaDB, materia_id)
         if not materia:
             raise HTTPException(status_code=404, detail="Materia no encontrada")
-        return materia
+        return MateriaOut.model_validate(materia).model_dump(mode="json")
+
+    try:
+        return await cache_respuestas.leer("materias", request, response, calcular)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error al obtener materia {materia_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
+def consulta_materia_completa(materia_id: int):
+    """Materia + materia previa (join) + conteo de inscriptos (subconsulta); los profesores van en otra (selectin)."""
+    inscriptos = (
+        select(func.count())
+        .select_from(materia_alumno)
+        .where(materia_alumno.c.materia_id == MateriaDB.id)
+        .scalar_subquery()
+    )
+    return (
+        select(MateriaDB, inscriptos.label("inscriptos"))
+        .where(MateriaDB.id == materia_id)
+        .options(joinedload(MateriaDB.materia_previa), selectinload(MateriaDB.profesores))
+    )
+
+def recientes(modelo, materia_id: int):
+    """Últimas RECIENTES tareas o materiales de la materia."""
+    return select(modelo).where(modelo.materia_id == materia_id).order_by(modelo.id.desc()).limit(RECIENTES)
+
+# Materia con profesores, cantidad de inscriptos, tareas y materiales recientes.
+# Son siempre 4 consultas, sin importar cuántos profesores o alumnos tenga:
+# materia + materia previa (join) + conteo (subconsulta), profesores (selectin),
+# tareas y materiales
+@router.get(
+    "/{materia_id}/completa",
+    response_model=MateriaCompleta,
+    dependencies=[condicional("materias", "materia_profesor", "profesores", "materia_alumno", "tareas", "materiales")],
+)
+async def obtener_materia_completa(materia_id: int, request: Request, response: Response, db: async_db_dependency):
+    async def calcular():
+        fila = (await db.execute(consulta_materia_completa(materia_id))).first()
+        if fila is None:
+            raise HTTPException(status_code=404, detail="Materia no encontrada")
+        materia, cantidad = fila
+
+        tareas = await db.scalars(recientes(TareaDB, materia_id))
+        materiales = await db.scalars(recientes(MaterialDB, materia_id))
+        return MateriaCompleta(
+            **dict(MateriaDetalle.model_validate(materia)),
+            inscriptos=cantidad,
+            tareas_recientes=[TareaOut.model_validate(tarea) for tarea in tareas],
+            materiales=[MaterialOut.model_validate(material) for material in materiales],
+        ).model_dump(mode="json")
+
+    try:
+        return await cache_respuestas.leer("materias", request, response, calcular)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error al obtener la materia completa {materia_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
 # Actualizar Materia
 @router.put("/{materia_id}", response_model=MateriaOut)
-def actualizar_materia(materia_id: int, datos: MateriaCreate, db: db_dependency):
+async def actualizar_materia(materia_id: int, datos: MateriaCreate, db: async_db_dependency):
     try:
-        materia = db.query(MateriaDB).filter(MateriaDB.id == materia_id).first()
+        materia = await db.get(MateriaDB, materia_id)
         if not materia:
             raise HTTPException(status_code=404, detail="Materia no encontrada")
         
         for key, value in datos.model_dump().items():
             setattr(materia, key, value)
         
-        db.commit()
-        db.refresh(materia)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("materias")
+        await db.refresh(materia)
         return materia
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error al actualizar materia {materia_id}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 # Eliminar Materia
 @router.delete("/{materia_id}")
-def eliminar_materia(materia_id: int, db: db_dependency):
+async def eliminar_materia(materia_id: int, db: async_db_dependency):
     try:
-        materia = db.query(MateriaDB).filter(MateriaDB.id == materia_id).first()
+        materia = await db.get(MateriaDB, materia_id)
         if not materia:
             raise HTTPException(status_code=404, detail="Materia no encontrada")
-        db.delete(materia)
-        db.commit()
+        await db.delete(materia)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("materias")
         return {"ok": True, "mensaje": "Materia eliminada"}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error al eliminar materia {materia_id}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}") 
\ No newline at end of file
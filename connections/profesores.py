@@ -1,6 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from sqlalchemy import select
 from backend.modelos import ProfesorDB
-from backend.db import db_dependency
+from backend.db import async_db_dependency
+from backend.perfilado import RutaPerfilada
+from backend.cache import cache_dashboard, cache_respuestas
+from backend.versiones import condicional
+from backend.paginacion import paginacion_dependency, paginar
+from backend.serializacion import LISTADOS_RAPIDOS, seleccionar, como_dicts, listado
 from pydantic import BaseModel, ConfigDict
 from typing import List
 import logging
@@ -9,7 +15,7 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/profesores", tags=["profesores"])
+router = APIRouter(prefix="/profesores", tags=["profesores"], route_class=RutaPerfilada)
 
 # Esquemas Pydantic
 class ProfesorCreate(BaseModel):
@@ -27,19 +33,21 @@ class ProfesorOut(BaseModel):
 
 # Crear Profesor
 @router.post("/", response_model=ProfesorOut)
-def crear_profesor(profesor: ProfesorCreate, db: db_dependency):
+async def crear_profesor(profesor: ProfesorCreate, db: async_db_dependency):
     try:
         logger.info(f"Intentando crear profesor: {profesor.model_dump()}")
         
         # Verificar si ya existe un profesor con el mismo legajo
-        existing_legajo = db.query(ProfesorDB).filter(ProfesorDB.legajo == profesor.legajo).first()
+        existing_legajo = await db.scalar(select(ProfesorDB).where(ProfesorDB.legajo == profesor.legajo).limit(1))
         if existing_legajo:
             raise HTTPException(status_code=400, detail=f"Ya existe un profesor con el legajo {profesor.legajo}")
         
         db_profesor = ProfesorDB(**profesor.model_dump())
         db.add(db_profesor)
-        db.commit()
-        db.refresh(db_profesor)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("profesores")
+        await db.refresh(db_profesor)
         
         logger.info(f"Profesor creado exitosamente con ID: {db_profesor.id}")
         return db_profesor
@@ -48,28 +56,46 @@ def crear_profesor(profesor: ProfesorCreate, db: db_dependency):
         raise
     except Exception as e:
         logger.error(f"Error al crear profesor: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 # Listar Profesores
-@router.get("/", response_model=List[ProfesorOut])
-def listar_profesores(db: db_dependency):
-    try:
-        profesores = db.query(ProfesorDB).all()
+@router.get("/", response_model=List[ProfesorOut], dependencies=[condicional("profesores")])
+async def listar_profesores(
+    request: Request,
+    db: async_db_dependency,
+    paginacion: paginacion_dependency,
+    response: Response,
+    estado: str | None = None,
+    especialidad: str | None = None,
+):
+    async def calcular():
+        stmt = seleccionar(ProfesorDB, ProfesorOut)
+        if estado is not None:
+            stmt = stmt.where(ProfesorDB.estado == estado)
+        if especialidad is not None:
+            stmt = stmt.where(ProfesorDB.especialidad == especialidad)
+        profesores = await paginar(db, stmt, ProfesorDB.id, paginacion, response, crudas=LISTADOS_RAPIDOS)
         logger.info(f"Listando {len(profesores)} profesores")
-        return profesores
+        return como_dicts(profesores, ProfesorOut)
+
+    try:
+        return listado(await cache_respuestas.leer("profesores", request, response, calcular), response)
     except Exception as e:
         logger.error(f"Error al listar profesores: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 # Obtener Profesor por ID
-@router.get("/{profesor_id}", response_model=ProfesorOut)
-def obtener_profesor(profesor_id: int, db: db_dependency):
-    try:
-        profesor = db.query(ProfesorDB).filter(ProfesorDB.id == profesor_id).first()
+@router.get("/{profesor_id}", response_model=ProfesorOut, dependencies=[condicional("profesores")])
+async def obtener_profesor(profesor_id: int, request: Request, response: Response, db: async_db_dependency):
+    async def calcular():
+        profesor = await db.get(ProfesorDB, profesor_id)
         if not profesor:
             raise HTTPException(status_code=404, detail="Profesor no encontrado")
-        return profesor
+        return ProfesorOut.model_validate(profesor).model_dump(mode="json")
+
+    try:
+        return await cache_respuestas.leer("profesores", request, response, calcular)
     except HTTPException:
         raise
     except Exception as e:
@@ -78,38 +104,42 @@ def obtener_profesor(profesor_id: int, db: db_dependency):
 
 # Actualizar Profesor
 @router.put("/{profesor_id}", response_model=ProfesorOut)
-def actualizar_profesor(profesor_id: int, datos: ProfesorCreate, db: db_dependency):
+async def actualizar_profesor(profesor_id: int, datos: ProfesorCreate, db: async_db_dependency):
     try:
-        profesor = db.query(ProfesorDB).filter(ProfesorDB.id == profesor_id).first()
+        profesor = await db.get(ProfesorDB, profesor_id)
         if not profesor:
             raise HTTPException(status_code=404, detail="Profesor no encontrado")
         
         for key, value in datos.model_dump().items():
             setattr(profesor, key, value)
         
-        db.commit()
-        db.refresh(profesor)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("profesores")
+        await db.refresh(profesor)
         return profesor
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error al actualizar profesor {profesor_id}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 # Eliminar Profesor
 @router.delete("/{profesor_id}")
-def eliminar_profesor(profesor_id: int, db: db_dependency):
+async def eliminar_profesor(profesor_id: int, db: async_db_dependency):
     try:
-        profesor = db.query(ProfesorDB).filter(ProfesorDB.id == profesor_id).first()
+        profesor = await db.get(ProfesorDB, profesor_id)
         if not profesor:
             raise HTTPException(status_code=404, detail="Profesor no encontrado")
-        db.delete(profesor)
-        db.commit()
+        await db.delete(profesor)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("profesores")
         return {"ok": True, "mensaje": "Profesor eliminado"}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error al eliminar profesor {profesor_id}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}") 
\ No newline at end of file
@@ -1,6 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from datetime import date, timedelta
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from sqlalchemy import select
 from backend.modelos import TareaDB
-from backend.db import db_dependency
+from backend.db import async_db_dependency
+from backend.perfilado import RutaPerfilada
+from backend.cache import cache_dashboard, cache_respuestas
+from backend.versiones import condicional
+from backend.paginacion import LIMITE_POR_DEFECTO, LIMITE_MAXIMO, paginacion_dependency, paginar
+from backend.serializacion import LISTADOS_RAPIDOS, columnas, seleccionar, consultar, listado
+from backend.exportacion import FormatoExport, exportar
 from pydantic import BaseModel, ConfigDict
 from typing import List
 import logging
@@ -9,14 +17,14 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/tareas", tags=["tareas"])
+router = APIRouter(prefix="/tareas", tags=["tareas"], route_class=RutaPerfilada)
 
 # Esquemas Pydantic
 class TareaCreate(BaseModel):
     titulo: str
     descripcion: str = None
-    fecha_entrega: str = None
-    fecha_publicacion: str = None
+    fecha_entrega: date = None
+    fecha_publicacion: date = None
     materia_id: int = None
     profesor_id: int = None
     tipo: str = None
@@ -26,66 +34,166 @@ class TareaCreate(BaseModel):
 class TareaOut(BaseModel):
     id: int
     titulo: str
-    descripcion: str = None
-    fecha_entrega: str = None
-    fecha_publicacion: str = None
-    materia_id: int = None
-    profesor_id: int = None
-    tipo: str = None
-    puntaje: int = None
-    estado: str = None
+    descripcion: str | None = None
+    fecha_entrega: date | None = None
+    fecha_publicacion: date | None = None
+    materia_id: int | None = None
+    profesor_id: int | None = None
+    tipo: str | None = None
+    puntaje: int | None = None
+    estado: str | None = None
     
     model_config = ConfigDict(from_attributes=True)
 
 # Crear Tarea
 @router.post("/", response_model=TareaOut)
-def crear_tarea(tarea: TareaCreate, db: db_dependency):
+async def crear_tarea(tarea: TareaCreate, db: async_db_dependency):
     try:
         logger.info(f"Intentando crear tarea: {tarea.model_dump()}")
         
         db_tarea = TareaDB(**tarea.model_dump())
         db.add(db_tarea)
-        db.commit()
-        db.refresh(db_tarea)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("tareas")
+        await db.refresh(db_tarea)
         
         logger.info(f"Tarea creada exitosamente con ID: {db_tarea.id}")
         return db_tarea
         
     except Exception as e:
         logger.error(f"Error al crear tarea: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
+def filtrar_tareas(stmt, materia_id=None, profesor_id=None, tipo=None, estado=None):
+    """Filtros comunes al listado y a la exportación de tareas."""
+    if materia_id is not None:
+        stmt = stmt.where(TareaDB.materia_id == materia_id)
+    if profesor_id is not None:
+        stmt = stmt.where(TareaDB.profesor_id == profesor_id)
+    if tipo is not None:
+        stmt = stmt.where(TareaDB.tipo == tipo)
+    if estado is not None:
+        stmt = stmt.where(TareaDB.estado == estado)
+    return stmt
+
 # Listar Tareas
-@router.get("/", response_model=List[TareaOut])
-def listar_tareas(db: db_dependency):
+@router.get("/", response_model=List[TareaOut], dependencies=[condicional("tareas")])
+async def listar_tareas(
+    db: async_db_dependency,
+    paginacion: paginacion_dependency,
+    response: Response,
+    materia_id: int | None = None,
+    profesor_id: int | None = None,
+    tipo: str | None = None,
+    estado: str | None = None,
+):
     try:
-        tareas = db.query(TareaDB).all()
+        stmt = filtrar_tareas(seleccionar(TareaDB, TareaOut), materia_id, profesor_id, tipo, estado)
+        tareas = await paginar(db, stmt, TareaDB.id, paginacion, response, crudas=LISTADOS_RAPIDOS)
         logger.info(f"Listando {len(tareas)} tareas")
-        return tareas
+        return listado(tareas, response)
     except Exception as e:
         logger.error(f"Error al listar tareas: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
+# Exportación del historial de tareas (NDJSON o CSV), en streaming
+@router.get("/export")
+async def exportar_tareas(
+    formato: FormatoExport = "ndjson",
+    materia_id: int | None = None,
+    profesor_id: int | None = None,
+    tipo: str | None = None,
+    estado: str | None = None,
+):
+    stmt = select(*columnas(TareaDB, TareaOut)).order_by(TareaDB.id)
+    logger.info(f"Exportando tareas en {formato}")
+    return exportar(filtrar_tareas(stmt, materia_id, profesor_id, tipo, estado), formato, "tareas")
+
 # Listar Tareas por Materia
-@router.get("/materia/{materia_id}", response_model=List[TareaOut])
-def listar_tareas_por_materia(materia_id: int, db: db_dependency):
+@router.get("/materia/{materia_id}", response_model=List[TareaOut], dependencies=[condicional("tareas")])
+async def listar_tareas_por_materia(
+    materia_id: int,
+    db: async_db_dependency,
+    paginacion: paginacion_dependency,
+    response: Response,
+):
     try:
-        tareas = db.query(TareaDB).filter(TareaDB.materia_id == materia_id).all()
+        stmt = filtrar_tareas(seleccionar(TareaDB, TareaOut), materia_id=materia_id)
+        tareas = await paginar(db, stmt, TareaDB.id, paginacion, response, crudas=LISTADOS_RAPIDOS)
         logger.info(f"Listando {len(tareas)} tareas para la materia {materia_id}")
-        return tareas
+        return listado(tareas, response)
     except Exception as e:
         logger.error(f"Error al listar tareas por materia {materia_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
-# Obtener Tarea por ID
-@router.get("/{tarea_id}", response_model=TareaOut)
-def obtener_tarea(tarea_id: int, db: db_dependency):
+def consulta_vencimientos(desde: date, hasta: date, materia_id: int | None, limit: int):
+    """Tareas con entrega en [desde, hasta], ordenadas por fecha.
+
+    Es un range scan sobre ix_tareas_fecha_entrega_id, o sobre
+    ix_tareas_materia_id_fecha_entrega cuando se filtra por materia; el orden
+    sale del índice, sin ordenar en memoria.
+    """
+    stmt = seleccionar(TareaDB, TareaOut).where(TareaDB.fecha_entrega.between(desde, hasta))
+    if materia_id is not None:
+        stmt = stmt.where(TareaDB.materia_id == materia_id)
+    return stmt.order_by(TareaDB.fecha_entrega, TareaDB.id).limit(limit)
+
+async def buscar_vencimientos(db, response, desde: date, hasta: date, materia_id: int | None, limit: int):
+    tareas = await consultar(db, consulta_vencimientos(desde, hasta, materia_id, limit))
+    return listado(tareas, response)
+
+# Tareas con entrega entre dos fechas (inclusive)
+@router.get("/vencimientos", response_model=List[TareaOut], dependencies=[condicional("tareas")])
+async def listar_vencimientos(
+    desde: date,
+    hasta: date,
+    db: async_db_dependency,
+    response: Response,
+    materia_id: int | None = None,
+    limit: int = Query(LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+):
+    if hasta < desde:
+        raise HTTPException(status_code=400, detail="'hasta' no puede ser anterior a 'desde'")
     try:
-        tarea = db.query(TareaDB).filter(TareaDB.id == tarea_id).first()
+        return await buscar_vencimientos(db, response, desde, hasta, materia_id, limit)
+    except Exception as e:
+        logger.error(f"Error al listar vencimientos entre {desde} y {hasta}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+# Tareas de una materia que vencen en los próximos `dias` días. La ventana
+# corre con la fecha: entra en el ETag para que un 304 no devuelva la de ayer
+@router.get(
+    "/materia/{materia_id}/proximas",
+    response_model=List[TareaOut],
+    dependencies=[condicional("tareas", variante=lambda: date.today().isoformat())],
+)
+async def listar_proximas_por_materia(
+    materia_id: int,
+    db: async_db_dependency,
+    response: Response,
+    dias: int = Query(7, ge=0, le=366),
+    limit: int = Query(LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+):
+    hoy = date.today()
+    try:
+        return await buscar_vencimientos(db, response, hoy, hoy + timedelta(days=dias), materia_id, limit)
+    except Exception as e:
+        logger.error(f"Error al listar próximas tareas de la materia {materia_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+# Obtener Tarea por ID
+@router.get("/{tarea_id}", response_model=TareaOut, dependencies=[condicional("tareas")])
+async def obtener_tarea(tarea_id: int, request: Request, response: Response, db: async_db_dependency):
+    async def calcular():
+        tarea = await db.get(TareaDB, tarea_id)
         if not tarea:
             raise HTTPException(status_code=404, detail="Tarea no encontrada")
-        return tarea
+        return TareaOut.model_validate(tarea).model_dump(mode="json")
+
+    try:
+        return await cache_respuestas.leer("tareas", request, response, calcular)
     except HTTPException:
         raise
     except Exception as e:
@@ -94,57 +202,63 @@ def obtener_tarea(tarea_id: int, db: db_dependency):
 
 # Actualizar Tarea
 @router.put("/{tarea_id}", response_model=TareaOut)
-def actualizar_tarea(tarea_id: int, datos: TareaCreate, db: db_dependency):
+async def actualizar_tarea(tarea_id: int, datos: TareaCreate, db: async_db_dependency):
     try:
-        tarea = db.query(TareaDB).filter(TareaDB.id == tarea_id).first()
+        tarea = await db.get(TareaDB, tarea_id)
         if not tarea:
             raise HTTPException(status_code=404, detail="Tarea no encontrada")
         
         for key, value in datos.model_dump().items():
             setattr(tarea, key, value)
         
-        db.commit()
-        db.refresh(tarea)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("tareas")
+        await db.refresh(tarea)
         return tarea
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error al actualizar tarea {tarea_id}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 # Marcar Tarea como Entregada
 @router.patch("/{tarea_id}/entregar")
-def marcar_tarea_entregada(tarea_id: int, db: db_dependency):
+async def marcar_tarea_entregada(tarea_id: int, db: async_db_dependency):
     try:
-        tarea = db.query(TareaDB).filter(TareaDB.id == tarea_id).first()
+        tarea = await db.get(TareaDB, tarea_id)
         if not tarea:
             raise HTTPException(status_code=404, detail="Tarea no encontrada")
         
         tarea.entregada = True
-        db.commit()
-        db.refresh(tarea)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("tareas")
+        await db.refresh(tarea)
         return {"ok": True, "mensaje": "Tarea marcada como entregada"}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error al marcar tarea {tarea_id} como entregada: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
 # Eliminar Tarea
 @router.delete("/{tarea_id}")
-def eliminar_tarea(tarea_id: int, db: db_dependency):
+async def eliminar_tarea(tarea_id: int, db: async_db_dependency):
     try:
-        tarea = db.query(TareaDB).filter(TareaDB.id == tarea_id).first()
+        tarea = await db.get(TareaDB, tarea_id)
         if not tarea:
             raise HTTPException(status_code=404, detail="Tarea no encontrada")
-        db.delete(tarea)
-        db.commit()
+        await db.delete(tarea)
+        await db.commit()
+        cache_dashboard.invalidar()
+        await cache_respuestas.invalidar("tareas")
         return {"ok": True, "mensaje": "Tarea eliminada"}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error al eliminar tarea {tarea_id}: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}") 
\ No newline at end of file
@@ -22,29 +22,42 @@ async function fetchAPI(endpoint) {
     }
 }
 
+// Listados paginados: se piden todas las páginas siguiendo X-Next-Cursor (null si falla)
+async function fetchListado(endpoint) {
+    try {
+        const pagina = new URL(`${API_BASE_URL}${endpoint}`);
+        pagina.searchParams.set('limit', '1000');
+        const items = [];
+        while (true) {
+            const response = await fetch(pagina);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            items.push(...await response.json());
+            const cursor = response.headers.get('X-Next-Cursor');
+            if (!cursor) {
+                return items;
+            }
+            pagina.searchParams.set('after', cursor);
+        }
+    } catch (error) {
+        console.error('Error fetching data:', error);
+        return null;
+    }
+}
+
 // Función para cargar estadísticas
 async function cargarEstadisticas() {
     try {
-        // Cargar datos en paralelo
-        const [materias, alumnos, profesores, tareas] = await Promise.all([
-            fetchAPI('/materias/'),
-            fetchAPI('/alumnos/'),
-            fetchAPI('/profesores/'),
-            fetchAPI('/tareas/')
-        ]);
+        // Los totales se calculan en el servidor con COUNT
+        const resumen = await fetchAPI('/dashboard/resumen');
 
         // Actualizar contadores
-        if (materias) {
-            totalMateriasElement.textContent = materias.length;
-        }
-        if (alumnos) {
-            totalAlumnosElement.textContent = alumnos.length;
-        }
-        if (profesores) {
-            totalProfesoresElement.textContent = profesores.length;
-        }
-        if (tareas) {
-            totalTareasElement.textContent = tareas.length;
+        if (resumen) {
+            totalMateriasElement.textContent = resumen.totales.materias;
+            totalAlumnosElement.textContent = resumen.totales.alumnos;
+            totalProfesoresElement.textContent = resumen.totales.profesores;
+            totalTareasElement.textContent = resumen.totales.tareas;
         }
 
     } catch (error) {
@@ -87,7 +100,7 @@ function crearMateriaCard(materia) {
 // Función para cargar materias
 async function cargarMaterias() {
     try {
-        const materias = await fetchAPI('/materias/');
+        const materias = await fetchListado('/materias/');
         
         if (materias && materias.length > 0) {
             // Crear tarjetas de materias
@@ -122,7 +135,7 @@ async function cargarMaterias() {
 async function cargarEstadisticasMateria(materiaId) {
     try {
         // Cargar tareas de la materia
-        const tareas = await fetchAPI(`/tareas/materia/${materiaId}`);
+        const tareas = await fetchListado(`/tareas/materia/${materiaId}`);
         const tareasElement = document.getElementById(`tareas-${materiaId}`);
         if (tareasElement && tareas) {
             tareasElement.textContent = tareas.length;
@@ -1,3 +1,22 @@
+// Los listados de la API vienen paginados: se piden todas las páginas siguiendo X-Next-Cursor
+async function fetchListado(url) {
+    const pagina = new URL(url);
+    pagina.searchParams.set('limit', '1000');
+    const items = [];
+    while (true) {
+        const response = await fetch(pagina);
+        if (!response.ok) {
+            throw new Error(`Error HTTP: ${response.status}`);
+        }
+        items.push(...await response.json());
+        const cursor = response.headers.get('X-Next-Cursor');
+        if (!cursor) {
+            return items;
+        }
+        pagina.searchParams.set('after', cursor);
+    }
+}
+
 // Función para cargar los materiales desde la API
 async function cargarMateriales() {
     const loading = document.getElementById('loading');
@@ -13,13 +32,7 @@ async function cargarMateriales() {
     emptyState.style.display = 'none';
 
     try {
-        const response = await fetch('http://127.0.0.1:8000/materiales/');
-        
-        if (!response.ok) {
-            throw new Error(`Error HTTP: ${response.status}`);
-        }
-
-        const materiales = await response.json();
+        const materiales = await fetchListado('http://127.0.0.1:8000/materiales/');
         
         // Ocultar loading
         loading.style.display = 'none';
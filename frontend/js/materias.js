@@ -37,6 +37,26 @@ async function fetchAPI(endpoint, options = {}) {
     }
 }
 
+// Los listados vienen paginados: se piden todas las páginas siguiendo X-Next-Cursor
+async function fetchListado(endpoint) {
+    const pagina = new URL(`${API_BASE_URL}${endpoint}`);
+    pagina.searchParams.set('limit', '1000');
+    const items = [];
+    while (true) {
+        const response = await fetch(pagina);
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+        }
+        items.push(...await response.json());
+        const cursor = response.headers.get('X-Next-Cursor');
+        if (!cursor) {
+            return items;
+        }
+        pagina.searchParams.set('after', cursor);
+    }
+}
+
 // Función para mostrar notificaciones
 function mostrarNotificacion(mensaje, tipo = 'info') {
     const notificacion = document.createElement('div');
@@ -85,7 +105,7 @@ function mostrarNotificacion(mensaje, tipo = 'info') {
 async function cargarMaterias() {
     try {
         mostrarLoading();
-        materias = await fetchAPI('/materias/');
+        materias = await fetchListado('/materias/');
         renderizarMaterias(materias);
     } catch (error) {
         mostrarError('Error al cargar las materias');
@@ -37,6 +37,26 @@ async function fetchAPI(endpoint, options = {}) {
     }
 }
 
+// Los listados vienen paginados: se piden todas las páginas siguiendo X-Next-Cursor
+async function fetchListado(endpoint) {
+    const pagina = new URL(`${API_BASE_URL}${endpoint}`);
+    pagina.searchParams.set('limit', '1000');
+    const items = [];
+    while (true) {
+        const response = await fetch(pagina);
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+        }
+        items.push(...await response.json());
+        const cursor = response.headers.get('X-Next-Cursor');
+        if (!cursor) {
+            return items;
+        }
+        pagina.searchParams.set('after', cursor);
+    }
+}
+
 // Función para mostrar notificaciones
 function mostrarNotificacion(mensaje, tipo = 'info') {
     const notificacion = document.createElement('div');
@@ -85,7 +105,7 @@ function mostrarNotificacion(mensaje, tipo = 'info') {
 async function cargarProfesores() {
     try {
         mostrarLoading();
-        profesores = await fetchAPI('/profesores/');
+        profesores = await fetchListado('/profesores/');
         renderizarProfesores(profesores);
     } catch (error) {
         mostrarError('Error al cargar los profesores');
@@ -148,14 +168,24 @@ function crearProfesorHTML(profesor) {
     `;
 }
 
-// Función para filtrar profesores
+// Función para filtrar profesores (la búsqueda se hace en el servidor)
+let busquedaTimeout = null;
+
 function filtrarProfesores(termino) {
-    const profesoresFiltrados = profesores.filter(profesor =>
-        profesor.nombre.toLowerCase().includes(termino.toLowerCase()) ||
-        profesor.apellido.toLowerCase().includes(termino.toLowerCase()) ||
-        profesor.legajo.toString().includes(termino)
-    );
-    renderizarProfesores(profesoresFiltrados);
+    clearTimeout(busquedaTimeout);
+    termino = termino.trim();
+    if (termino.length < 2) {
+        renderizarProfesores(profesores);
+        return;
+    }
+    busquedaTimeout = setTimeout(async () => {
+        try {
+            const resultado = await fetchAPI(`/buscar/?tipo=profesores&q=${encodeURIComponent(termino)}`);
+            renderizarProfesores(resultado.profesores);
+        } catch (error) {
+            console.error('Error buscando profesores:', error);
+        }
+    }, 200);
 }
 
 // Funciones del modal
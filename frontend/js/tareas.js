@@ -1,3 +1,22 @@
+// Los listados de la API vienen paginados: se piden todas las páginas siguiendo X-Next-Cursor
+async function fetchListado(url) {
+    const pagina = new URL(url);
+    pagina.searchParams.set('limit', '1000');
+    const items = [];
+    while (true) {
+        const response = await fetch(pagina);
+        if (!response.ok) {
+            throw new Error(`Error HTTP: ${response.status}`);
+        }
+        items.push(...await response.json());
+        const cursor = response.headers.get('X-Next-Cursor');
+        if (!cursor) {
+            return items;
+        }
+        pagina.searchParams.set('after', cursor);
+    }
+}
+
 // Función para cargar las tareas desde la API
 async function cargarTareas() {
     const loading = document.getElementById('loading');
@@ -13,13 +32,7 @@ async function cargarTareas() {
     emptyState.style.display = 'none';
 
     try {
-        const response = await fetch('http://127.0.0.1:8000/tareas/');
-        
-        if (!response.ok) {
-            throw new Error(`Error HTTP: ${response.status}`);
-        }
-
-        const tareas = await response.json();
+        const tareas = await fetchListado('http://127.0.0.1:8000/tareas/');
         
         // Ocultar loading
         loading.style.display = 'none';
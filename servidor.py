@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Servidor de producción: N workers de uvicorn con un proceso supervisor.
+
+- `--workers` procesos (por defecto uno por CPU) que comparten el socket.
+- Reparte las conexiones de Postgres entre los workers: el pool de cada uno
+  se achica para que el total quede bajo `max_connections` (ver
+  `repartir_conexiones` en backend/conexion.py).
+- `--preload`: el supervisor importa la aplicación y comprime el frontend
+  una vez y los workers se crean con fork, compartiendo esa memoria. Sin
+  `--preload` cada worker importa todo de nuevo (spawn).
+- `kill -HUP <pid del supervisor>`: reinicio escalonado, un worker por vez;
+  el reemplazo tiene que estar listo antes de apagar al anterior, que
+  termina las peticiones en curso.
+- Con más de un worker las revocaciones de tokens tienen que ser compartidas:
+  sin REVOCACIONES_BACKEND se usa "disco", y con "memoria" no arranca.
+- Lo que cada worker guarda en memoria no se comparte: la configuración del
+  log de consultas lentas que cambia `PUT /admin/consultas` (solo en el
+  worker que atiende; para todos, SQL_* en el entorno y `kill -HUP`), los
+  caches locales y los contadores de `GET /admin/cache`.
+- `--max-peticiones N`: cada worker se recicla después de N peticiones (más
+  un desvío al azar, para que no se reinicien todos juntos) y el
+  supervisor lo reemplaza. Acota el crecimiento de memoria.
+
+Uso (desde la raíz del proyecto). La base tiene que estar en la última
+migración: `alembic upgrade head` la crea desde cero sobre una base vacía
+(la revisión a1d4c7e9b250 crea las tablas) o aplica lo que falte.
+    alembic upgrade head
+    python servidor.py --workers 4 --max-peticiones 10000 --preload
+"""
+import argparse
+import glob
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from dotenv import load_dotenv
+from multiprocessing import Pipe
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+from uvicorn import Config
+from uvicorn._subprocess import subprocess_started
+from uvicorn.config import STARTUP_FAILURE
+from uvicorn.supervisors.multiprocess import Process
+
+logger = logging.getLogger("classroom.servidor")
+
+# Como backend/config.py, pero sin importar backend/: las opciones del .env
+# (workers, PROMETHEUS_MULTIPROC_DIR) se necesitan antes
+load_dotenv()
+
+APP = "connections.main:app"
+
+# Conexiones que no se reparten entre los workers: Alembic, psql, otros servicios
+DB_CONEXIONES_RESERVADAS = int(os.getenv("DB_CONEXIONES_RESERVADAS", "10"))
+
+def conexiones_disponibles() -> int | None:
+    """max_connections del servidor (o DB_CONEXIONES_MAX) menos las reservadas."""
+    if os.getenv("DB_CONEXIONES_MAX"):
+        return int(os.getenv("DB_CONEXIONES_MAX")) - DB_CONEXIONES_RESERVADAS
+    from backend.db import DATABASE_URL
+    engine = create_engine(DATABASE_URL, poolclass=NullPool)
+    try:
+        with engine.connect() as conexion:
+            maximo = int(conexion.scalar(text("SHOW max_connections")))
+            superusuario = int(conexion.scalar(text("SHOW superuser_reserved_connections")))
+    except Exception as e:
+        logger.warning(f"No se pudo leer max_connections; se usa el pool configurado: {e}")
+        return None
+    finally:
+        engine.dispose()
+    return maximo - superusuario - DB_CONEXIONES_RESERVADAS
+
+def dimensionar_pools(workers: int):
+    """Ajusta DB_POOL_SIZE/DB_MAX_OVERFLOW de los workers al presupuesto de conexiones."""
+    from backend.conexion import POOL_CONFIG, repartir_conexiones
+    disponibles = conexiones_disponibles()
+    if disponibles is None:
+        return
+    pool = repartir_conexiones(disponibles, workers)
+    # POOL_CONFIG lo heredan los workers por fork; el entorno, los de spawn
+    POOL_CONFIG.update(pool)
+    os.environ["DB_POOL_SIZE"] = str(pool["pool_size"])
+    os.environ["DB_MAX_OVERFLOW"] = str(pool["max_overflow"])
+    maximo = (workers + 1) * 2 * (pool["pool_size"] + pool["max_overflow"])
+    logger.info(f"Pool por worker: {pool} (hasta {maximo} de {disponibles} conexiones disponibles)")
+
+def verificar_estado_por_worker(parser: argparse.ArgumentParser, workers: int):
+    """Con varios workers el logout y la desactivación tienen que verlos todos.
+
+    Sin REVOCACIONES_BACKEND se usa "disco"; con "memoria" explícito no
+    arranca. El resto del estado por worker solo se avisa.
+    """
+    if workers <= 1:
+        return
+    backend = os.getenv("REVOCACIONES_BACKEND")
+    if backend is None:
+        os.environ["REVOCACIONES_BACKEND"] = "disco"
+        logger.info(f"Revocaciones compartidas entre workers en {os.getenv('REVOCACIONES_DIR', 'revocaciones')}/")
+    elif backend == "memoria":
+        parser.error("REVOCACIONES_BACKEND=memoria solo ve las revocaciones (logout, usuarios desactivados) "
+                     "del worker que las recibe: usar REVOCACIONES_BACKEND=disco o --workers 1")
+    logger.warning("PUT /admin/consultas cambia el log de consultas solo en el worker que atiende; "
+                   "para todos: SQL_LOG/SQL_SLOW_MS/SQL_SAMPLE_RATE y kill -HUP")
+
+def limpiar_metricas():
+    """Vacía PROMETHEUS_MULTIPROC_DIR: los archivos de una corrida anterior sumarían de más."""
+    directorio = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+        for archivo in glob.glob(os.path.join(directorio, "*.db")):
+            os.remove(archivo)
+
+def metricas_worker_terminado(pid: int):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid)
+
+class Worker(Process):
+    """Proceso worker de uvicorn creado con el contexto de multiprocessing elegido.
+
+    Reusa el `Process` de uvicorn (healthcheck por pipe, terminate/join);
+    solo cambia cómo se crea el proceso, que uvicorn fija en spawn.
+    """
+
+    def __init__(self, config: Config, sockets: list, contexto):
+        self.config = config
+        self._server = None
+        self.parent_conn, self.child_conn = Pipe()
+        self.process = contexto.Process(target=subprocess_started, kwargs={
+            "config": config, "target": self.target, "sockets": sockets, "stdin_fileno": None,
+        })
+
+class Supervisor:
+    """Mantiene `workers` procesos vivos y atiende las señales del sistema."""
+
+    def __init__(self, config: Config, workers: int, preload: bool):
+        self.config = config
+        self.cantidad = workers
+        self.contexto = multiprocessing.get_context("fork" if preload else "spawn")
+        self.sockets = [config.bind_socket()]
+        self.workers: list[Worker] = []
+        self.salir = threading.Event()
+        self.codigo_salida = 0
+        self.senales = []
+        for senal in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(senal, lambda numero, frame: self.senales.append(numero))
+
+    def _nuevo_worker(self) -> Worker:
+        worker = Worker(self.config, self.sockets, self.contexto)
+        worker.start()
+        return worker
+
+    def _retirar(self, worker: Worker):
+        worker.terminate()
+        worker.join()
+        metricas_worker_terminado(worker.pid)
+
+    def correr(self) -> int:
+        logger.info(f"Supervisor {os.getpid()}: {self.cantidad} workers en "
+                    f"http://{self.config.host}:{self.config.port} ({self.contexto.get_start_method()})")
+        self.workers = [self._nuevo_worker() for _ in range(self.cantidad)]
+        while not self.salir.wait(0.5):
+            self._atender_senales()
+            self._reponer_workers()
+        for worker in self.workers:
+            worker.terminate()
+        for worker in self.workers:
+            worker.join()
+            metricas_worker_terminado(worker.pid)
+        logger.info(f"Supervisor {os.getpid()} detenido")
+        return self.codigo_salida
+
+    def _atender_senales(self):
+        while self.senales:
+            if self.senales.pop(0) == signal.SIGHUP:
+                self.reiniciar_escalonado()
+            else:
+                self.salir.set()
+
+    def reiniciar_escalonado(self):
+        """Reemplaza los workers de a uno; si un reemplazo no arranca, se corta y quedan los viejos."""
+        logger.info("Reinicio escalonado de los workers")
+        for indice, viejo in enumerate(self.workers):
+            if self.salir.is_set():
+                return
+            nuevo = self._nuevo_worker()
+            if not nuevo.wait_until_ready(self.config.timeout_worker_healthcheck, self.salir):
+                nuevo.kill()
+                nuevo.join()
+                logger.error(f"El worker {nuevo.pid} no quedó listo: se mantiene {viejo.pid} y se corta el reinicio")
+                return
+            self._retirar(viejo)
+            self.workers[indice] = nuevo
+            logger.info(f"Worker {viejo.pid} reemplazado por {nuevo.pid}")
+
+    def _reponer_workers(self):
+        for indice, worker in enumerate(self.workers):
+            if self.salir.is_set():
+                return
+            if worker.is_alive(timeout=self.config.timeout_worker_healthcheck):
+                continue
+            worker.kill()  # si está colgado
+            worker.join()
+            metricas_worker_terminado(worker.pid)
+            if worker.exitcode == STARTUP_FAILURE:
+                # Falló antes de atender (migraciones pendientes, error al importar):
+                # reintentarlo fallaría igual
+                logger.error(f"El worker {worker.pid} no pudo arrancar; se detiene el servidor")
+                self.codigo_salida = STARTUP_FAILURE
+                self.salir.set()
+                return
+            motivo = "reciclado" if worker.exitcode == 0 else f"terminó con código {worker.exitcode}"
+            self.workers[indice] = self._nuevo_worker()
+            logger.info(f"Worker {worker.pid} {motivo}: reemplazado por {self.workers[indice].pid}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=os.getenv("SERVIDOR_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVIDOR_PUERTO", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVIDOR_WORKERS") or os.cpu_count() or 1))
+    parser.add_argument("--preload", action="store_true",
+                        default=os.getenv("SERVIDOR_PRELOAD", "false").lower() in ("1", "true", "yes", "si"),
+                        help="importar la aplicación en el supervisor y crear los workers con fork")
+    parser.add_argument("--max-peticiones", type=int, default=int(os.getenv("WORKER_MAX_PETICIONES", "0")),
+                        help="reciclar cada worker después de N peticiones (0: nunca)")
+    parser.add_argument("--apagado", type=float, default=float(os.getenv("WORKER_TIMEOUT_APAGADO", "30")),
+                        help="segundos que un worker espera a las peticiones en curso al apagarse")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    verificar_estado_por_worker(parser, args.workers)
+    # Antes de importar backend/, que ya abre sus archivos de métricas
+    limpiar_metricas()
+    try:
+        dimensionar_pools(args.workers)
+    except ValueError as e:
+        parser.error(f"{e}: bajar --workers o DB_CONEXIONES_RESERVADAS")
+
+    app = APP
+    if args.preload:
+        # Todo lo que se cargue acá lo comparten los workers (copy-on-write).
+        # Ninguna conexión a la base: los motores se crean en cada worker.
+        from connections.main import app, frontend
+        frontend.precomprimir()
+
+    config = Config(
+        app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        limit_max_requests=args.max_peticiones or None,
+        limit_max_requests_jitter=max(args.max_peticiones // 10, 0),
+        timeout_graceful_shutdown=args.apagado,
+    )
+    sys.exit(Supervisor(config, args.workers, args.preload).correr())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Fixtures compartidas. Los tests que usan `cliente` o `base_de_datos` corren
+contra la base configurada en .env (migrada a head) y se saltean si no hay
+Postgres o si la base no está en la última revisión.
+
+Uso (desde la raíz del proyecto):
+    python -m pytest -q
+"""
+import os
+import sys
+import pytest
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.db import motores
+from backend.migraciones import revisiones_head
+
+@pytest.fixture(scope="session")
+def base_de_datos():
+    """Motor sincrónico de la base de pruebas; saltea si no responde o no está migrada."""
+    engine = motores()["engine"]
+    try:
+        with engine.connect() as conexion:
+            aplicadas = {fila[0] for fila in conexion.execute(text("SELECT version_num FROM alembic_version"))}
+    except Exception as e:
+        pytest.skip(f"Postgres no disponible: {e.__class__.__name__}")
+    if aplicadas != revisiones_head():
+        pytest.skip("La base no está en la última migración (alembic upgrade head)")
+    return engine
+
+@pytest.fixture(scope="session")
+def cliente(base_de_datos):
+    """La aplicación completa, con su lifespan, en un solo event loop para toda la sesión."""
+    from fastapi.testclient import TestClient
+    from connections.main import app
+    with TestClient(app) as cliente:
+        yield cliente
@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from backend.almacenamiento import AlmacenArchivos, ArchivoInvalido, ArchivoMultipart
+
+CUERPO = (
+    b'--limite\r\nContent-Disposition: form-data; name="titulo"\r\n\r\nApunte\r\n'
+    b'--limite\r\nContent-Disposition: form-data; name="archivo"; filename="apunte.pdf"\r\n'
+    b'Content-Type: application/pdf\r\n\r\n%PDF-1.7 contenido\r\n--limite--\r\n'
+)
+
+class Pedido:
+    """Lo único que usa ArchivoMultipart del request: headers y stream()."""
+
+    def __init__(self, *chunks):
+        self.headers = {"content-type": "multipart/form-data; boundary=limite"}
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+def leer(*chunks):
+    async def todo():
+        archivo = ArchivoMultipart(Pedido(*chunks))
+        return b"".join([trozo async for trozo in archivo]), archivo
+
+    return asyncio.run(todo())
+
+def test_lee_el_campo_del_archivo():
+    contenido, archivo = leer(CUERPO[:70], CUERPO[70:])
+    assert contenido == b"%PDF-1.7 contenido"
+    assert (archivo.nombre, archivo.tipo) == ("apunte.pdf", "application/pdf")
+
+@pytest.mark.parametrize("corte", [40, 150, len(CUERPO) - 10, len(CUERPO) - 6])
+def test_cuerpo_cortado_es_invalido(corte):
+    with pytest.raises(ArchivoInvalido):
+        leer(CUERPO[:corte])
+
+def test_un_almacen_incompleto_no_se_puede_instanciar():
+    class SoloRecibir(AlmacenArchivos):
+        async def recibir(self, trozos): ...
+
+    with pytest.raises(TypeError, match="descargar"):
+        SoloRecibir()
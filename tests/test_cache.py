@@ -0,0 +1,10 @@
+import pytest
+from backend.cache import TierCompartido
+
+def test_un_tier_compartido_incompleto_no_se_puede_instanciar():
+    class SinInvalidar(TierCompartido):
+        async def obtener(self, clave): return None
+        async def guardar(self, clave, valor, ttl_segundos): ...
+
+    with pytest.raises(TypeError, match="invalidar_prefijo"):
+        SinInvalidar()
@@ -0,0 +1,77 @@
+import asyncio
+import json
+import pytest
+from backend import carga_masiva
+from backend.carga_masiva import FormatoInvalido, leer_filas_json
+
+FILAS = [
+    {"nro_doc": "30111222", "nombre": "Ana", "apellido": "Pérez", "carrera_id": 12, "promedio": -7.25e-1},
+    {"nro_doc": "30111223", "nombre": "Lu \"Ñ\" é", "al_dia": True, "observaciones": None},
+    1234567,
+    [False, "x\\y"],
+]
+
+def leer(*chunks) -> list:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def todas():
+        return [fila async for fila in leer_filas_json(stream())]
+
+    return asyncio.run(todas())
+
+def test_cortes_en_cualquier_byte():
+    cuerpo = json.dumps(FILAS, ensure_ascii=False).encode("utf-8")
+    for corte in range(1, len(cuerpo)):
+        assert leer(cuerpo[:corte], cuerpo[corte:]) == FILAS, corte
+    assert leer(*(cuerpo[i:i + 1] for i in range(len(cuerpo)))) == FILAS
+
+def test_numero_partido_entre_chunks():
+    assert leer(b"[1", b"23, 4", b"5]") == [123, 45]
+    assert leer(b"[1e", b"3, tr", b"ue]") == [1000.0, True]
+
+@pytest.mark.parametrize("cuerpo", [
+    b'[{"nombre": x}]',
+    b'[{"nombre": "Ana"} {"nombre": "Luz"}]',
+    b'[{"nombre": "Ana"},, {"nombre": "Luz"}]',
+    b'[1 2]',
+    b'{"nombre": "Ana"}',
+])
+def test_mal_formado(cuerpo):
+    with pytest.raises(FormatoInvalido):
+        leer(cuerpo)
+
+def test_mal_formado_falla_sin_esperar_mas_datos():
+    leidos = 0
+
+    async def stream():
+        nonlocal leidos
+        yield b'[{"nombre": "Ana"}, {"nombre": nada'
+        # Si el lector esperara más datos, consumiría estos chunks
+        for _ in range(1000):
+            leidos += 1
+            yield b" " * 1024
+
+    async def todas():
+        return [fila async for fila in leer_filas_json(stream())]
+
+    with pytest.raises(FormatoInvalido):
+        asyncio.run(todas())
+    assert leidos == 0
+
+@pytest.mark.parametrize("cuerpo", [b"[", b'[{"nombre": "Ana"}', b'[{"nombre": "Ana"},', b"[12", b"[]]"])
+def test_incompleto_al_terminar(cuerpo):
+    with pytest.raises(FormatoInvalido):
+        leer(cuerpo)
+
+def test_fila_que_no_termina_supera_el_tope(monkeypatch):
+    monkeypatch.setattr(carga_masiva, "CARGA_FILA_MAX_CARACTERES", 1000)
+    with pytest.raises(FormatoInvalido, match="1000"):
+        leer(b'[{"nombre": "', *[b"a" * 100] * 20)
+
+def test_endpoint_responde_400_si_la_fila_supera_el_tope(cliente, monkeypatch):
+    monkeypatch.setattr(carga_masiva, "CARGA_FILA_MAX_CARACTERES", 1000)
+    cuerpo = b'[{"nombre": "' + b"a" * 5000 + b'"}]'
+    respuesta = cliente.post("/alumnos/bulk", content=cuerpo, headers={"Content-Type": "application/json"})
+    assert respuesta.status_code == 400
@@ -0,0 +1,47 @@
+import os
+import warnings
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from backend.compresion import MiddlewareCompresion
+from backend.estaticos import FrontendEstatico
+
+FRONTEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "frontend")
+
+def crear_app(precomprimido: bool):
+    app = FastAPI()
+    frontend = FrontendEstatico(FRONTEND)
+    app.mount("/static", frontend)
+
+    @app.get("/pagina")
+    async def pagina(request: Request):
+        return frontend.pagina("alumnos.html", request)
+
+    app.add_middleware(MiddlewareCompresion)
+    frontend.preparar()
+    if precomprimido:
+        frontend.precomprimir()
+    return app, frontend
+
+def test_el_middleware_no_comprime_estaticos_sin_precomprimir():
+    app, frontend = crear_app(precomprimido=False)
+    cliente = TestClient(app)
+    asset = f"/static/{frontend.versionados['js/alumnos.js']}"
+    for ruta in ("/pagina", asset):
+        respuesta = cliente.get(ruta, headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in respuesta.headers
+        assert not respuesta.headers["etag"].startswith("W/")
+        assert respuesta.headers["vary"] == "Accept-Encoding"
+
+def test_estaticos_precomprimidos_con_un_solo_vary():
+    app, _ = crear_app(precomprimido=True)
+    respuesta = TestClient(app).get("/pagina", headers={"Accept-Encoding": "gzip"})
+    assert respuesta.headers["content-encoding"] == "gzip"
+    assert not respuesta.headers["etag"].startswith("W/")
+    assert respuesta.headers["vary"] == "Accept-Encoding"
+
+def test_paginas_fuera_del_esquema_openapi():
+    from connections.main import app
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        esquema = app.openapi()
+    assert "/alumnos-page" not in esquema["paths"]
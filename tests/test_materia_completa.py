@@ -0,0 +1,76 @@
+"""GET /materias/{id}/completa hace siempre la misma cantidad de consultas.
+
+Cuenta las sentencias que llegan al motor async mientras se resuelve el
+endpoint para una materia con inscriptos, profesores, tareas y materiales, y
+para una vacía. Si alguna relación se cargara de forma perezosa (N+1), la
+primera haría más consultas que la segunda.
+"""
+import uuid
+import pytest
+from datetime import date
+from sqlalchemy import delete, event
+from sqlalchemy.orm import Session
+from backend.db import motores
+from backend.modelos import AlumnoDB, MateriaDB, MaterialDB, ProfesorDB, TareaDB, materia_alumno, materia_profesor
+
+# ETag (1 consulta de versiones) + materia/previa/inscriptos + profesores + tareas + materiales
+CONSULTAS_ESPERADAS = 5
+
+@pytest.fixture
+def materias(base_de_datos):
+    """Una materia con 20 inscriptos, 3 profesores, tareas y materiales, y una sin nada."""
+    prefijo = f"test-{uuid.uuid4().hex[:8]}"
+    with Session(base_de_datos) as db:
+        previa = MateriaDB(nombre="Previa", codigo=f"{prefijo}-previa")
+        llena = MateriaDB(nombre="Llena", codigo=f"{prefijo}-llena", materia_previa=previa)
+        vacia = MateriaDB(nombre="Vacía", codigo=f"{prefijo}-vacia")
+        llena.alumnos = [
+            AlumnoDB(nro_doc=f"{prefijo}-{i}", nombre="Alumno", apellido=str(i), mail=f"{prefijo}-{i}@test.local")
+            for i in range(20)
+        ]
+        llena.profesores = [ProfesorDB(nombre="Profesor", apellido=str(i)) for i in range(3)]
+        db.add_all([previa, llena, vacia])
+        db.flush()
+        db.add_all([TareaDB(titulo=f"Tarea {i}", materia_id=llena.id, fecha_entrega=date(2025, 3, i + 1)) for i in range(5)])
+        db.add_all([MaterialDB(titulo=f"Material {i}", materia_id=llena.id) for i in range(5)])
+        db.commit()
+        ids = {"llena": llena.id, "vacia": vacia.id, "previa": previa.id}
+        alumnos = [alumno.id for alumno in llena.alumnos]
+        profesores = [profesor.id for profesor in llena.profesores]
+
+    yield ids
+
+    with Session(base_de_datos) as db:
+        materias_ids = list(ids.values())
+        db.execute(delete(materia_alumno).where(materia_alumno.c.materia_id.in_(materias_ids)))
+        db.execute(delete(materia_profesor).where(materia_profesor.c.materia_id.in_(materias_ids)))
+        db.execute(delete(TareaDB).where(TareaDB.materia_id.in_(materias_ids)))
+        db.execute(delete(MaterialDB).where(MaterialDB.materia_id.in_(materias_ids)))
+        db.execute(delete(AlumnoDB).where(AlumnoDB.id.in_(alumnos)))
+        db.execute(delete(ProfesorDB).where(ProfesorDB.id.in_(profesores)))
+        db.execute(delete(MateriaDB).where(MateriaDB.id.in_([ids["llena"], ids["vacia"]])))
+        db.execute(delete(MateriaDB).where(MateriaDB.id == ids["previa"]))
+        db.commit()
+
+@pytest.fixture
+def consultas():
+    """Sentencias que ejecuta el motor async de la aplicación mientras dura el test."""
+    ejecutadas = []
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        ejecutadas.append(statement)
+    motor = motores()["async_engine"].sync_engine
+    event.listen(motor, "before_cursor_execute", contar)
+    yield ejecutadas
+    event.remove(motor, "before_cursor_execute", contar)
+
+@pytest.mark.parametrize("materia", ["llena", "vacia"])
+def test_materia_completa_sin_n_mas_1(cliente, materias, consultas, materia):
+    consultas.clear()
+    respuesta = cliente.get(f"/materias/{materias[materia]}/completa")
+    assert respuesta.status_code == 200
+    datos = respuesta.json()
+    if materia == "llena":
+        assert datos["inscriptos"] == 20
+        assert len(datos["profesores"]) == 3
+        assert datos["materia_previa"]["id"] == materias["previa"]
+    assert len(consultas) == CONSULTAS_ESPERADAS, consultas
@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from backend.modelos import MaterialDB
+
+@pytest.fixture
+def material(base_de_datos):
+    """Material con un archivo ya subido (el contenido no hace falta: el PUT no lo toca)."""
+    with Session(base_de_datos) as db:
+        material = MaterialDB(titulo="Apunte", descripcion="Unidad 1", hash_archivo="f" * 64, tamanio=10,
+                              nombre_archivo="apunte.pdf", archivo="/materiales/0/archivo")
+        db.add(material)
+        db.commit()
+        material_id = material.id
+    yield material_id
+    with Session(base_de_datos) as db:
+        db.execute(delete(MaterialDB).where(MaterialDB.id == material_id))
+        db.commit()
+
+def test_actualizar_solo_el_titulo_conserva_el_archivo(cliente, material):
+    respuesta = cliente.put(f"/materiales/{material}", json={"titulo": "Apunte corregido"})
+    assert respuesta.status_code == 200
+    datos = respuesta.json()
+    assert datos["titulo"] == "Apunte corregido"
+    assert datos["descripcion"] == "Unidad 1"
+    assert datos["archivo"] == "/materiales/0/archivo"
+    assert datos["hash_archivo"] == "f" * 64
+
+def test_el_enlace_de_un_archivo_subido_no_se_pisa(cliente, material):
+    respuesta = cliente.put(f"/materiales/{material}", json={"titulo": "Apunte", "archivo": None})
+    assert respuesta.status_code == 200
+    assert respuesta.json()["archivo"] == "/materiales/0/archivo"
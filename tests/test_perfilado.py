@@ -0,0 +1,55 @@
+import fastapi.routing
+import os
+import re
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from backend import perfilado
+
+class Fila(BaseModel):
+    id: int
+    nombre: str
+
+def crear_app(monkeypatch, tmp_path):
+    monkeypatch.setattr(perfilado, "PERFILADO_TOKEN", "secreto")
+    monkeypatch.setattr(perfilado, "PERFILADO_DIR", str(tmp_path))
+    router = APIRouter(route_class=perfilado.RutaPerfilada)
+
+    @router.get("/filas", response_model=list[Fila])
+    async def filas():
+        return [{"id": i, "nombre": f"Fila {i}"} for i in range(20000)]
+
+    @router.get("/sync", response_model=Fila)
+    def sync():
+        return {"id": 1, "nombre": "Una"}
+
+    app = FastAPI()
+    app.include_router(router)
+    perfilado.instalar(app)
+    return app
+
+def tiempo(respuesta, nombre: str) -> float:
+    return float(re.search(rf"{nombre};dur=([\d.]+)", respuesta.headers["server-timing"]).group(1))
+
+def test_mide_la_serializacion_sin_tocar_fastapi(monkeypatch, tmp_path):
+    original = fastapi.routing.serialize_response
+    cliente = TestClient(crear_app(monkeypatch, tmp_path))
+    assert fastapi.routing.serialize_response is original
+
+    respuesta = cliente.get("/filas", headers={"X-Perfilado": "secreto"})
+    assert respuesta.status_code == 200 and len(respuesta.json()) == 20000
+    assert 0 < tiempo(respuesta, "serializacion") <= tiempo(respuesta, "total")
+
+    respuesta = cliente.get("/sync", headers={"X-Perfilado": "secreto"})
+    assert respuesta.json() == {"id": 1, "nombre": "Una"}
+    assert "serializacion" in respuesta.headers["server-timing"]
+
+    assert "server-timing" not in cliente.get("/sync").headers
+
+def test_modo_disco_guarda_el_perfil(monkeypatch, tmp_path):
+    cliente = TestClient(crear_app(monkeypatch, tmp_path))
+    respuesta = cliente.get("/filas", headers={"X-Perfilado": "secreto", "X-Perfilado-Modo": "disco"})
+    assert respuesta.status_code == 200
+    archivo = respuesta.headers["x-perfil-archivo"]
+    assert os.path.dirname(archivo) == str(tmp_path)
+    assert os.path.exists(archivo)
@@ -0,0 +1,93 @@
+"""Ninguna consulta frecuente de los routers hace Seq Scan sobre tablas grandes.
+
+Dentro de una transacción que al final se descarta, siembra un volumen grande
+de datos (PLANES_ALUMNOS alumnos, 200.000 por defecto), corre ANALYZE y pide
+`EXPLAIN` de las sentencias que arman los endpoints, construidas con las
+mismas funciones que usan los routers. Falla si alguna se resuelve con un Seq
+Scan sobre las tablas vigiladas. La base queda como estaba.
+
+Conviene sumar acá cada filtro o consulta nueva de los routers.
+"""
+import json
+import os
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import select
+from sqlalchemy.orm import with_parent
+from backend.modelos import AlumnoDB, MateriaDB, MaterialDB, ProfesorDB, TareaDB, UsuarioDB
+from backend.paginacion import LIMITE_POR_DEFECTO, Paginacion, consulta_pagina
+from backend.serializacion import seleccionar
+from benchmarks.datos import sembrar
+from connections.alumnos import AlumnoOut, filtrar_alumnos
+from connections.dashboard import consulta_proximas_tareas
+from connections.materiales import MaterialOut, consulta_referencias, filtrar_materiales
+from connections.materias import consulta_materia_completa, inscriptos_de, recientes
+from connections.tareas import TareaOut, consulta_vencimientos, filtrar_tareas
+
+PLANES_ALUMNOS = int(os.getenv("PLANES_ALUMNOS", "200000"))
+
+# Tablas que crecen con el uso: sobre estas un Seq Scan es una regresión
+VIGILADAS = {"alumnos", "tareas", "materiales", "profesores", "materia_alumno", "materia_profesor"}
+
+HOY = date(2025, 3, 1)
+
+def pagina(stmt, columna_id, after=None):
+    return consulta_pagina(stmt, columna_id, Paginacion(limit=LIMITE_POR_DEFECTO, after=after))
+
+# (nombre, función de los ids sembrados -> sentencia)
+CONSULTAS = [
+    ("alumnos: primera página", lambda ids: pagina(seleccionar(AlumnoDB, AlumnoOut), AlumnoDB.id)),
+    ("alumnos: página con cursor", lambda ids: pagina(seleccionar(AlumnoDB, AlumnoOut), AlumnoDB.id, ids["alumno"] + 50000)),
+    ("alumnos por cohorte", lambda ids: pagina(filtrar_alumnos(seleccionar(AlumnoDB, AlumnoOut), cohorte="2020"), AlumnoDB.id)),
+    ("alumnos por carrera", lambda ids: pagina(filtrar_alumnos(seleccionar(AlumnoDB, AlumnoOut), carrera_id=7), AlumnoDB.id)),
+    ("tareas por materia", lambda ids: pagina(filtrar_tareas(seleccionar(TareaDB, TareaOut), materia_id=ids["materia"]), TareaDB.id)),
+    ("tareas por profesor", lambda ids: pagina(filtrar_tareas(seleccionar(TareaDB, TareaOut), profesor_id=ids["profesor"]), TareaDB.id)),
+    ("tareas: vencimientos", lambda ids: consulta_vencimientos(HOY, HOY + timedelta(days=7), None, LIMITE_POR_DEFECTO)),
+    ("tareas: próximas por materia", lambda ids: consulta_vencimientos(HOY, HOY + timedelta(days=30), ids["materia"], LIMITE_POR_DEFECTO)),
+    ("dashboard: próximas tareas", lambda ids: consulta_proximas_tareas(HOY, 5)),
+    ("materiales por materia", lambda ids: pagina(filtrar_materiales(seleccionar(MaterialDB, MaterialOut), materia_id=ids["materia"]), MaterialDB.id)),
+    ("materiales por profesor", lambda ids: pagina(filtrar_materiales(seleccionar(MaterialDB, MaterialOut), profesor_id=ids["profesor"]), MaterialDB.id)),
+    ("materiales con un archivo", lambda ids: consulta_referencias("0" * 64)),
+    ("alumnos de una materia", lambda ids: pagina(inscriptos_de(seleccionar(AlumnoDB, AlumnoOut), ids["materia"]), AlumnoDB.id)),
+    ("materia completa", lambda ids: consulta_materia_completa(ids["materia"])),
+    ("materia completa: tareas", lambda ids: recientes(TareaDB, ids["materia"])),
+    ("materia completa: materiales", lambda ids: recientes(MaterialDB, ids["materia"])),
+    # Los mismos criterios que usa el ORM al cargar cada relación
+    ("profesores de una materia", lambda ids: select(ProfesorDB).where(with_parent(MateriaDB(id=ids["materia"]), MateriaDB.profesores))),
+    ("materias de un alumno", lambda ids: select(MateriaDB).where(with_parent(AlumnoDB(id=ids["alumno"]), AlumnoDB.materias))),
+    ("materias de un profesor", lambda ids: select(MateriaDB).where(with_parent(ProfesorDB(id=ids["profesor"]), ProfesorDB.materias))),
+    ("profesores de un usuario", lambda ids: select(ProfesorDB).where(with_parent(UsuarioDB(id=ids["usuario"]), UsuarioDB.profesores))),
+]
+
+def seq_scans(nodo: dict) -> list:
+    """Tablas vigiladas que aparecen con Seq Scan en el plan."""
+    encontrados = []
+    if nodo.get("Node Type") == "Seq Scan" and nodo.get("Relation Name") in VIGILADAS:
+        encontrados.append(nodo["Relation Name"])
+    for hijo in nodo.get("Plans", []):
+        encontrados.extend(seq_scans(hijo))
+    return encontrados
+
+def explicar(conn, stmt) -> dict:
+    compilada = stmt.compile(dialect=conn.dialect)
+    fila = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compilada}", compilada.params).scalar()
+    plan = fila if isinstance(fila, list) else json.loads(fila)
+    return plan[0]["Plan"]
+
+@pytest.fixture(scope="module")
+def sembrada(base_de_datos):
+    """Conexión con el dataset sembrado en una transacción que se descarta al final."""
+    with base_de_datos.connect() as conn:
+        transaccion = conn.begin()
+        try:
+            # Prefijo propio: no choca con un dataset de benchmarks.datos ya cargado
+            ids = sembrar(conn, PLANES_ALUMNOS, prefijo="plan")
+            yield conn, ids
+        finally:
+            transaccion.rollback()
+
+@pytest.mark.parametrize("nombre, consulta", CONSULTAS, ids=[nombre for nombre, _ in CONSULTAS])
+def test_sin_seq_scan(sembrada, nombre, consulta):
+    conn, ids = sembrada
+    plan = explicar(conn, consulta(ids))
+    assert not seq_scans(plan), f"{nombre}: Seq Scan en {', '.join(sorted(set(seq_scans(plan))))}"
@@ -0,0 +1,31 @@
+import pytest
+import time
+from backend.revocaciones import AlmacenRevocaciones, RevocacionesEnDisco
+
+def test_revocaciones_en_disco_las_ven_todos_los_workers(tmp_path):
+    # Dos instancias sobre el mismo directorio: como dos workers de servidor.py
+    uno, otro = RevocacionesEnDisco(str(tmp_path)), RevocacionesEnDisco(str(tmp_path))
+    ahora = time.time()
+
+    uno.revocar_token("abc", ahora + 60)
+    assert otro.esta_revocado("abc", 1, ahora)
+    assert not otro.esta_revocado("def", 1, ahora)
+
+    uno.revocar_usuario(2, ahora)
+    assert otro.esta_revocado("def", 2, ahora - 10)
+    assert not otro.esta_revocado("def", 2, ahora + 10)
+
+def test_revocaciones_en_disco_purga_los_tokens_vencidos(tmp_path):
+    almacen = RevocacionesEnDisco(str(tmp_path))
+    almacen.revocar_token("vencido", time.time() - 1)
+    almacen.revocar_token("vigente", time.time() + 60)
+    assert not almacen.esta_revocado("vencido", 1, 0)
+    assert almacen.esta_revocado("vigente", 1, 0)
+
+def test_un_backend_incompleto_no_se_puede_instanciar():
+    class SinUsuarios(AlmacenRevocaciones):
+        def revocar_token(self, digest, expira): ...
+        def esta_revocado(self, digest, user_id, emitido): return False
+
+    with pytest.raises(TypeError, match="revocar_usuario"):
+        SinUsuarios()
@@ -0,0 +1,33 @@
+from datetime import date
+import connections.tareas
+
+class Hoy(date):
+    """`date` con un today() fijo, para simular el cambio de día."""
+    fecha = date(2025, 3, 10)
+
+    @classmethod
+    def today(cls):
+        return cls.fecha
+
+def test_etag_de_proximas_cambia_con_la_fecha(cliente, monkeypatch):
+    monkeypatch.setattr(connections.tareas, "date", Hoy)
+    ruta = "/tareas/materia/1/proximas?dias=7"
+
+    monkeypatch.setattr(Hoy, "fecha", date(2025, 3, 10))
+    ayer = cliente.get(ruta)
+    assert ayer.status_code == 200
+    assert cliente.get(ruta, headers={"If-None-Match": ayer.headers["etag"]}).status_code == 304
+
+    monkeypatch.setattr(Hoy, "fecha", date(2025, 3, 11))
+    hoy = cliente.get(ruta, headers={"If-None-Match": ayer.headers["etag"]})
+    assert hoy.status_code == 200
+    assert hoy.headers["etag"] != ayer.headers["etag"]
+
+def test_etag_sin_variante_no_depende_de_la_fecha(cliente, monkeypatch):
+    monkeypatch.setattr(connections.tareas, "date", Hoy)
+    ruta = "/tareas/materia/1"
+
+    monkeypatch.setattr(Hoy, "fecha", date(2025, 3, 10))
+    antes = cliente.get(ruta).headers["etag"]
+    monkeypatch.setattr(Hoy, "fecha", date(2025, 3, 11))
+    assert cliente.get(ruta).headers["etag"] == antes